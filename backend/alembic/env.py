@@ -1,3 +1,4 @@
+import re
 from logging.config import fileConfig
 
 from sqlalchemy import pool
@@ -15,6 +16,15 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+# Partitions of cost_records are created at runtime (app.crud.cost_partition)
+PARTITION_NAME = re.compile(r"cost_records_(y\d{4}m\d{2}|default)")
+
+
+def include_name(name, type_, parent_names) -> bool:
+    if type_ == "table":
+        return not PARTITION_NAME.fullmatch(name)
+    return True
+
 
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
@@ -23,6 +33,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
@@ -39,6 +50,7 @@ def run_migrations_online() -> None:
         context.configure(
             connection=connection,
             target_metadata=target_metadata,
+            include_name=include_name,
         )
 
         with context.begin_transaction():
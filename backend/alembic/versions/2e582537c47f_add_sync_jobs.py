@@ -0,0 +1,46 @@
+"""add_sync_jobs
+
+Revision ID: 2e582537c47f
+Revises: c3105a4f07fd
+Create Date: 2026-10-18 13:58:26.604412
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e582537c47f'
+down_revision: str | None = 'c3105a4f07fd'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table('sync_jobs',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('provider_id', sa.UUID(), nullable=False),
+    sa.Column('status', sa.Enum('QUEUED', 'RUNNING', 'SUCCEEDED', 'FAILED', name='syncjobstatus'), nullable=False),
+    sa.Column('full', sa.Boolean(), nullable=False),
+    sa.Column('rows_fetched', sa.Integer(), nullable=False),
+    sa.Column('rows_written', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['provider_id'], ['providers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sync_jobs_provider_id'), 'sync_jobs', ['provider_id'], unique=False)
+    op.create_index('ix_sync_jobs_provider_id_active', 'sync_jobs', ['provider_id'], unique=True, postgresql_where=sa.text("status IN ('QUEUED', 'RUNNING')"))
+    op.execute("ALTER TABLE sync_jobs ENABLE ROW LEVEL SECURITY")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sync_jobs_provider_id_active', table_name='sync_jobs', postgresql_where=sa.text("status IN ('QUEUED', 'RUNNING')"))
+    op.drop_index(op.f('ix_sync_jobs_provider_id'), table_name='sync_jobs')
+    op.drop_table('sync_jobs')
+    op.execute("DROP TYPE syncjobstatus")
@@ -0,0 +1,71 @@
+"""compact_cost_record_storage
+
+Revision ID: 2fefad8e593e
+Revises: 94c916d304f9
+Create Date: 2026-10-18 14:41:07.352916
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2fefad8e593e'
+down_revision: str | None = '94c916d304f9'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # All connectors so far report USD, so the default doubles as the backfill
+    op.add_column('cost_records', sa.Column('currency', sa.String(length=3), server_default='USD', nullable=False))
+    # The amount keys duplicate the amount and currency columns and are dropped from
+    # stored payloads. The text column was never validated, so payloads that are not
+    # JSON objects are kept under a key of their own rather than failing the migration.
+    op.execute(
+        """
+        CREATE FUNCTION pg_temp.compact_metadata(metadata text) RETURNS jsonb
+        LANGUAGE plpgsql IMMUTABLE STRICT AS $$
+        DECLARE
+            parsed jsonb;
+        BEGIN
+            BEGIN
+                parsed := metadata::jsonb;
+            EXCEPTION WHEN invalid_text_representation THEN
+                RETURN jsonb_build_object('raw', metadata);
+            END;
+            IF jsonb_typeof(parsed) = 'object' THEN
+                RETURN parsed - 'object' - 'amount' - 'currency';
+            END IF;
+            RETURN jsonb_build_object('value', parsed);
+        END
+        $$
+        """
+    )
+    # One statement, so every partition is rewritten once for both columns
+    op.execute(
+        """
+        ALTER TABLE cost_records
+            ALTER COLUMN amount TYPE numeric(18, 6) USING amount::numeric(18, 6),
+            ALTER COLUMN metadata_json TYPE jsonb
+                USING pg_temp.compact_metadata(metadata_json)
+        """
+    )
+    op.execute('DROP FUNCTION pg_temp.compact_metadata(text)')
+    op.execute('ALTER TABLE cost_rollups_daily ALTER COLUMN amount TYPE numeric(18, 6)')
+    op.execute('ALTER TABLE cost_rollups_monthly ALTER COLUMN amount TYPE numeric(18, 6)')
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE cost_rollups_monthly ALTER COLUMN amount TYPE double precision')
+    op.execute('ALTER TABLE cost_rollups_daily ALTER COLUMN amount TYPE double precision')
+    op.execute(
+        """
+        ALTER TABLE cost_records
+            ALTER COLUMN amount TYPE double precision,
+            ALTER COLUMN metadata_json TYPE text
+        """
+    )
+    op.drop_column('cost_records', 'currency')
@@ -0,0 +1,75 @@
+"""add_alerts
+
+Revision ID: 3ea079ac34b8
+Revises: 2fefad8e593e
+Create Date: 2026-10-18 16:03:52.118406
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3ea079ac34b8'
+down_revision: str | None = '2fefad8e593e'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table('alerts',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('provider_id', sa.UUID(), nullable=True),
+    sa.Column('service', sa.String(length=100), nullable=True),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('threshold', sa.Numeric(precision=18, scale=6), nullable=False),
+    sa.Column('currency', sa.String(length=3), server_default='USD', nullable=False),
+    sa.Column('period', sa.Enum('DAY', 'MONTH', name='alertperiod'), nullable=False),
+    sa.Column('notification_type', sa.Enum('EMAIL', 'WEBHOOK', name='notificationtype'), nullable=False),
+    sa.Column('destination', sa.Text(), nullable=False),
+    sa.Column('enabled', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['provider_id'], ['providers.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user_profiles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_alerts_provider_id'), 'alerts', ['provider_id'], unique=False)
+    op.create_index(op.f('ix_alerts_user_id'), 'alerts', ['user_id'], unique=False)
+    op.create_table('alert_events',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('alert_id', sa.UUID(), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('total', sa.Numeric(precision=18, scale=6), nullable=False),
+    sa.Column('threshold', sa.Numeric(precision=18, scale=6), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['alert_id'], ['alerts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_alert_events_alert_id'), 'alert_events', ['alert_id'], unique=False)
+    op.create_table('alert_states',
+    sa.Column('alert_id', sa.UUID(), nullable=False),
+    sa.Column('period_start', sa.Date(), nullable=False),
+    sa.Column('total', sa.Numeric(precision=18, scale=6), nullable=False),
+    sa.Column('fired_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['alert_id'], ['alerts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('alert_id', 'period_start')
+    )
+    op.execute("ALTER TABLE alerts ENABLE ROW LEVEL SECURITY")
+    op.execute("ALTER TABLE alert_states ENABLE ROW LEVEL SECURITY")
+    op.execute("ALTER TABLE alert_events ENABLE ROW LEVEL SECURITY")
+
+
+def downgrade() -> None:
+    op.drop_table('alert_states')
+    op.drop_index(op.f('ix_alert_events_alert_id'), table_name='alert_events')
+    op.drop_table('alert_events')
+    op.drop_index(op.f('ix_alerts_user_id'), table_name='alerts')
+    op.drop_index(op.f('ix_alerts_provider_id'), table_name='alerts')
+    op.drop_table('alerts')
+    op.execute("DROP TYPE notificationtype")
+    op.execute("DROP TYPE alertperiod")
@@ -0,0 +1,28 @@
+"""add_provider_sync_leases
+
+Revision ID: 5b8e2c7d1a94
+Revises: d3d799b65045
+Create Date: 2026-10-18 21:12:40.318227
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b8e2c7d1a94'
+down_revision: str | None = 'd3d799b65045'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column('provider_sync_states', sa.Column('lease_owner', sa.UUID(), nullable=True))
+    op.add_column('provider_sync_states', sa.Column('leased_until', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('provider_sync_states', 'leased_until')
+    op.drop_column('provider_sync_states', 'lease_owner')
@@ -0,0 +1,80 @@
+"""add_composite_indexes_for_cost_queries
+
+Revision ID: 7efe6260922c
+Revises: 98105fb79c97
+Create Date: 2026-10-18 10:41:07.294518
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7efe6260922c'
+down_revision: str | None = '98105fb79c97'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Build concurrently so large tables stay writable while the indexes are created
+    with op.get_context().autocommit_block():
+        # Matches the list ordering (keyset on period_start, id) and covers the
+        # columns the aggregate queries read, so both can use index-only scans
+        op.create_index(
+            "ix_cost_records_provider_id_period_start",
+            "cost_records",
+            ["provider_id", sa.text("period_start DESC"), sa.text("id DESC")],
+            postgresql_include=["service", "amount"],
+            postgresql_concurrently=True,
+        )
+        # Leading column of the index above, so this one only costs writes
+        op.drop_index(
+            "ix_cost_records_provider_id",
+            table_name="cost_records",
+            postgresql_concurrently=True,
+        )
+
+        for table, bucket in (("cost_rollups_daily", "day"), ("cost_rollups_monthly", "month")):
+            op.create_index(
+                f"ix_{table}_provider_id_{bucket}_covering",
+                table,
+                ["provider_id", bucket],
+                postgresql_include=["service", "amount", "record_count"],
+                postgresql_concurrently=True,
+            )
+            op.drop_index(
+                f"ix_{table}_provider_id_{bucket}",
+                table_name=table,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for table, bucket in (("cost_rollups_daily", "day"), ("cost_rollups_monthly", "month")):
+            op.create_index(
+                f"ix_{table}_provider_id_{bucket}",
+                table,
+                ["provider_id", bucket],
+                postgresql_concurrently=True,
+            )
+            op.drop_index(
+                f"ix_{table}_provider_id_{bucket}_covering",
+                table_name=table,
+                postgresql_concurrently=True,
+            )
+
+        op.create_index(
+            "ix_cost_records_provider_id",
+            "cost_records",
+            ["provider_id"],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_cost_records_provider_id_period_start",
+            table_name="cost_records",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,26 @@
+"""add_provider_data_version
+
+Revision ID: 8c41f0d2b7e3
+Revises: 5b8e2c7d1a94
+Create Date: 2026-10-18 22:03:51.604417
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41f0d2b7e3'
+down_revision: str | None = '5b8e2c7d1a94'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.add_column('providers', sa.Column('data_version', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('providers', 'data_version')
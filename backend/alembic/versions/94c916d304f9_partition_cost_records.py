@@ -0,0 +1,141 @@
+"""partition_cost_records
+
+Revision ID: 94c916d304f9
+Revises: 2e582537c47f
+Create Date: 2026-10-18 14:20:44.187630
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '94c916d304f9'
+down_revision: str | None = '2e582537c47f'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+COLUMNS = (
+    "id, provider_id, amount, service, period_start, period_end, metadata_json, "
+    "created_at, content_hash"
+)
+# Monthly partitions are created ahead of time; the app's maintenance keeps this going
+MONTHS_AHEAD = 3
+
+
+def _create_table() -> None:
+    op.create_table('cost_records',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('provider_id', sa.UUID(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('service', sa.String(length=100), nullable=False),
+    sa.Column('period_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('period_end', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('metadata_json', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('content_hash', sa.LargeBinary(), nullable=True),
+    sa.ForeignKeyConstraint(['provider_id'], ['providers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id', 'period_start'),
+    postgresql_partition_by='RANGE (period_start)',
+    )
+
+
+def _create_indexes() -> None:
+    op.create_index(
+        'ix_cost_records_provider_id_period_start',
+        'cost_records',
+        ['provider_id', sa.text('period_start DESC'), sa.text('id DESC')],
+        postgresql_include=['service', 'amount'],
+    )
+    op.create_index(
+        'ix_cost_records_natural_key',
+        'cost_records',
+        ['provider_id', 'service', 'period_start', 'period_end'],
+        unique=True,
+    )
+
+
+def _rename_old_table() -> None:
+    op.rename_table('cost_records', 'cost_records_old')
+    op.execute("ALTER INDEX cost_records_pkey RENAME TO cost_records_old_pkey")
+    op.execute(
+        "ALTER INDEX ix_cost_records_provider_id_period_start "
+        "RENAME TO ix_cost_records_old_provider_id_period_start"
+    )
+    op.execute("ALTER INDEX ix_cost_records_natural_key RENAME TO ix_cost_records_old_natural_key")
+
+
+def upgrade() -> None:
+    # Rebuild as a table partitioned by month of period_start and copy the rows over.
+    # This rewrites cost_records under an exclusive lock, so run it in a quiet period.
+    _rename_old_table()
+    _create_table()
+    op.execute("ALTER TABLE cost_records ENABLE ROW LEVEL SECURITY")
+
+    # A partition for every month with data and the next few, plus a default partition
+    # that catches anything else until maintenance gives it a partition of its own
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    least(
+                        (SELECT min(date_trunc('month', period_start AT TIME ZONE 'UTC'))
+                         FROM cost_records_old),
+                        date_trunc('month', now() AT TIME ZONE 'UTC')
+                    ),
+                    date_trunc('month', now() AT TIME ZONE 'UTC')
+                        + interval '{MONTHS_AHEAD} months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF cost_records FOR VALUES FROM (%L) TO (%L)',
+                    'cost_records_y' || to_char(month, 'YYYY"m"MM'),
+                    month::text || ' 00:00:00+00',
+                    (month + interval '1 month')::date::text || ' 00:00:00+00'
+                );
+                EXECUTE format(
+                    'ALTER TABLE %I ENABLE ROW LEVEL SECURITY',
+                    'cost_records_y' || to_char(month, 'YYYY"m"MM')
+                );
+            END LOOP;
+        END
+        $$
+        """
+    )
+    op.execute("CREATE TABLE cost_records_default PARTITION OF cost_records DEFAULT")
+    op.execute("ALTER TABLE cost_records_default ENABLE ROW LEVEL SECURITY")
+
+    # Indexes are built once per partition after the copy, which beats maintaining them
+    op.execute(f"INSERT INTO cost_records ({COLUMNS}) SELECT {COLUMNS} FROM cost_records_old")
+    _create_indexes()
+    op.drop_table('cost_records_old')
+
+
+def downgrade() -> None:
+    _rename_old_table()
+    op.create_table('cost_records',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('provider_id', sa.UUID(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('service', sa.String(length=100), nullable=False),
+    sa.Column('period_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('period_end', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('metadata_json', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('content_hash', sa.LargeBinary(), nullable=True),
+    sa.ForeignKeyConstraint(['provider_id'], ['providers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    )
+    op.execute("ALTER TABLE cost_records ENABLE ROW LEVEL SECURITY")
+    op.execute(f"INSERT INTO cost_records ({COLUMNS}) SELECT {COLUMNS} FROM cost_records_old")
+    _create_indexes()
+    # Drops every partition with it
+    op.drop_table('cost_records_old')
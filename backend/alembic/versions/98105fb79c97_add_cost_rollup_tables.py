@@ -0,0 +1,68 @@
+"""add_cost_rollup_tables
+
+Revision ID: 98105fb79c97
+Revises: d46d9a347500
+Create Date: 2026-10-18 09:12:40.518204
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '98105fb79c97'
+down_revision: str | None = 'd46d9a347500'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table('cost_rollups_daily',
+    sa.Column('provider_id', sa.UUID(), nullable=False),
+    sa.Column('service', sa.String(length=100), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('record_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['provider_id'], ['providers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('provider_id', 'service', 'day')
+    )
+    op.create_index('ix_cost_rollups_daily_provider_id_day', 'cost_rollups_daily', ['provider_id', 'day'])
+    op.create_table('cost_rollups_monthly',
+    sa.Column('provider_id', sa.UUID(), nullable=False),
+    sa.Column('service', sa.String(length=100), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('record_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['provider_id'], ['providers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('provider_id', 'service', 'month')
+    )
+    op.create_index('ix_cost_rollups_monthly_provider_id_month', 'cost_rollups_monthly', ['provider_id', 'month'])
+    op.execute("ALTER TABLE cost_rollups_daily ENABLE ROW LEVEL SECURITY")
+    op.execute("ALTER TABLE cost_rollups_monthly ENABLE ROW LEVEL SECURITY")
+
+    # Backfill from existing cost records
+    op.execute(
+        """
+        INSERT INTO cost_rollups_daily (provider_id, service, day, amount, record_count)
+        SELECT provider_id, service, (period_start AT TIME ZONE 'UTC')::date, SUM(amount), COUNT(*)
+        FROM cost_records
+        GROUP BY 1, 2, 3
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO cost_rollups_monthly (provider_id, service, month, amount, record_count)
+        SELECT provider_id, service, date_trunc('month', day)::date, SUM(amount), SUM(record_count)
+        FROM cost_rollups_daily
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cost_rollups_monthly_provider_id_month', table_name='cost_rollups_monthly')
+    op.drop_table('cost_rollups_monthly')
+    op.drop_index('ix_cost_rollups_daily_provider_id_day', table_name='cost_rollups_daily')
+    op.drop_table('cost_rollups_daily')
@@ -0,0 +1,43 @@
+"""add_provider_sync_states
+
+Revision ID: c3105a4f07fd
+Revises: fc051d48b6f0
+Create Date: 2026-10-18 13:41:07.215083
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3105a4f07fd'
+down_revision: str | None = 'fc051d48b6f0'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table('provider_sync_states',
+    sa.Column('provider_id', sa.UUID(), nullable=False),
+    sa.Column('synced_through', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('cursor', sa.Text(), nullable=True),
+    sa.Column('etag', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['provider_id'], ['providers.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('provider_id')
+    )
+    op.execute("ALTER TABLE provider_sync_states ENABLE ROW LEVEL SECURITY")
+
+    # Providers synced before this table existed resume from their last sync
+    op.execute(
+        """
+        INSERT INTO provider_sync_states (provider_id, synced_through)
+        SELECT id, last_sync_at FROM providers WHERE last_sync_at IS NOT NULL
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('provider_sync_states')
@@ -0,0 +1,47 @@
+"""add_notification_outbox
+
+Revision ID: d3d799b65045
+Revises: 3ea079ac34b8
+Create Date: 2026-10-18 17:26:11.504873
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3d799b65045'
+down_revision: str | None = '3ea079ac34b8'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table('notifications',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('alert_event_id', sa.UUID(), nullable=False),
+    sa.Column('notification_type', postgresql.ENUM('EMAIL', 'WEBHOOK', name='notificationtype', create_type=False), nullable=False),
+    sa.Column('destination', sa.Text(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('status', sa.Enum('PENDING', 'SENT', 'DEAD', name='notificationstatus'), server_default='PENDING', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['alert_event_id'], ['alert_events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notifications_alert_event_id'), 'notifications', ['alert_event_id'], unique=False)
+    op.create_index('ix_notifications_next_attempt_at_pending', 'notifications', ['next_attempt_at'], unique=False, postgresql_where=sa.text("status = 'PENDING'"))
+    op.execute("ALTER TABLE notifications ENABLE ROW LEVEL SECURITY")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_next_attempt_at_pending', table_name='notifications', postgresql_where=sa.text("status = 'PENDING'"))
+    op.drop_index(op.f('ix_notifications_alert_event_id'), table_name='notifications')
+    op.drop_table('notifications')
+    op.execute("DROP TYPE notificationstatus")
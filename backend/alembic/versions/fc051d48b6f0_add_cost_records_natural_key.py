@@ -0,0 +1,69 @@
+"""add_cost_records_natural_key
+
+Revision ID: fc051d48b6f0
+Revises: 7efe6260922c
+Create Date: 2026-10-18 13:02:51.830417
+
+"""
+from collections.abc import Sequence
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fc051d48b6f0'
+down_revision: str | None = '7efe6260922c'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # Existing rows keep a NULL hash and are rewritten once on their next re-sync
+    op.add_column('cost_records', sa.Column('content_hash', sa.LargeBinary(), nullable=True))
+
+    # Keep the most recently written row of every duplicated natural key
+    op.execute(
+        """
+        DELETE FROM cost_records c
+        USING (
+            SELECT id, row_number() OVER (
+                PARTITION BY provider_id, service, period_start, period_end
+                ORDER BY created_at DESC, id DESC
+            ) AS rank
+            FROM cost_records
+        ) d
+        WHERE c.id = d.id AND d.rank > 1
+        """
+    )
+    op.create_index(
+        'ix_cost_records_natural_key',
+        'cost_records',
+        ['provider_id', 'service', 'period_start', 'period_end'],
+        unique=True,
+    )
+
+    # Rebuild the rollups in case duplicates were removed
+    op.execute("DELETE FROM cost_rollups_daily")
+    op.execute("DELETE FROM cost_rollups_monthly")
+    op.execute(
+        """
+        INSERT INTO cost_rollups_daily (provider_id, service, day, amount, record_count)
+        SELECT provider_id, service, (period_start AT TIME ZONE 'UTC')::date, SUM(amount), COUNT(*)
+        FROM cost_records
+        GROUP BY 1, 2, 3
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO cost_rollups_monthly (provider_id, service, month, amount, record_count)
+        SELECT provider_id, service, date_trunc('month', day)::date, SUM(amount), SUM(record_count)
+        FROM cost_rollups_daily
+        GROUP BY 1, 2, 3
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cost_records_natural_key', table_name='cost_records')
+    op.drop_column('cost_records', 'content_hash')
@@ -1,29 +1,50 @@
+import hashlib
+import secrets
 import uuid
 from collections.abc import AsyncGenerator
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db import AsyncSessionLocal
+from app.core.config import settings
+from app.core.db import AsyncReadSessionLocal, AsyncSessionLocal
+from app.core.instrumentation import timed
 from app.core.security import verify_token
+from app.crud import cost_aggregate
+from app.crud import provider as provider_crud
 from app.crud import user as user_crud
 from app.models.user import UserProfile
 
 security = HTTPBearer()
 
+# Clients may keep responses but must revalidate them; shared caches must not store them
+CACHE_CONTROL = "private, no-cache"
+
 
 async def get_db() -> AsyncGenerator[AsyncSession]:
     async with AsyncSessionLocal() as session:
         yield session
 
 
-def get_current_user(
+async def get_read_db() -> AsyncGenerator[AsyncSession]:
+    """Session on the read replica, or on the primary when none is configured."""
+    async with AsyncReadSessionLocal() as session:
+        yield session
+
+
+async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
 ) -> dict:
-    """Get the current authenticated user from the JWT token."""
-    payload = verify_token(credentials.credentials)
+    """Get the current authenticated user from the JWT token.
+
+    Verification uses in-memory keys and cached results, so this runs on the event loop
+    rather than in the thread pool. Only a token with an unknown key id waits for the
+    signing keys to be fetched.
+    """
+    with timed("auth"):
+        payload = await verify_token(credentials.credentials)
     user_id = payload.get("sub")
     if not user_id:
         raise HTTPException(
@@ -43,9 +64,75 @@ async def get_current_user_profile(
 ) -> UserProfile:
     """Get or create the user profile for the authenticated user."""
     auth_user_id = uuid.UUID(current_user["id"])
-    return await user_crud.get_or_create(db, auth_user_id)
+    with timed("profile"):
+        return await user_crud.get_or_create(db, auth_user_id)
+
+
+def require_metrics_token(request: Request) -> None:
+    """Reject requests without METRICS_TOKEN as a bearer token, and every request when it
+    is unset. Guards operational endpoints that expose traffic and database load."""
+    authorization = request.headers.get("Authorization", "")
+    if not settings.METRICS_TOKEN or not secrets.compare_digest(
+        authorization.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+        )
 
 
 SessionDep = Annotated[AsyncSession, Depends(get_db)]
+ReadSessionDep = Annotated[AsyncSession, Depends(get_read_db)]
 CurrentUser = Annotated[dict, Depends(get_current_user)]
 CurrentUserProfile = Annotated[UserProfile, Depends(get_current_user_profile)]
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison: the W/ prefix is ignored on both sides
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+async def _check_data_etag(
+    request: Request, response: Response, db: AsyncSession, user_profile: UserProfile
+) -> None:
+    version = await provider_crud.get_data_version(db, user_profile.id)
+    today = cost_aggregate.resolve_period(user_profile.timezone).end.date()
+    key = f"{user_profile.id}:{user_profile.timezone}:{today}:{version}"
+    etag = f'W/"{hashlib.blake2b(key.encode(), digest_size=12).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+
+async def check_data_etag(
+    request: Request,
+    response: Response,
+    db: ReadSessionDep,
+    user_profile: CurrentUserProfile,
+) -> None:
+    """Tag the response with a weak ETag for the user's current provider and cost data.
+
+    Raises 304 Not Modified when `If-None-Match` already holds the tag, so the route never
+    runs its query. The tag also covers the user's timezone and local date, which move
+    the default windows of the aggregate endpoints.
+
+    The data version is read on the request's replica session, so use this on routes
+    that read through `ReadSessionDep`; a lagging replica then tags the data it serves.
+    """
+    await _check_data_etag(request, response, db, user_profile)
+
+
+async def check_primary_data_etag(
+    request: Request,
+    response: Response,
+    db: SessionDep,
+    user_profile: CurrentUserProfile,
+) -> None:
+    """`check_data_etag` for routes that read through `SessionDep`, from the primary."""
+    await _check_data_etag(request, response, db, user_profile)
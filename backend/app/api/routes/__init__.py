@@ -1,9 +1,10 @@
 from fastapi import APIRouter
 
-from app.api.routes import costs, health, providers, users
+from app.api.routes import alerts, costs, health, providers, users
 
 api_router = APIRouter()
 api_router.include_router(health.router, tags=["health"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
 api_router.include_router(providers.router, prefix="/providers", tags=["providers"])
 api_router.include_router(costs.router, prefix="/costs", tags=["costs"])
+api_router.include_router(alerts.router, prefix="/alerts", tags=["alerts"])
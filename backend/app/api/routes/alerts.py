@@ -0,0 +1,136 @@
+import uuid
+
+import httpx
+from fastapi import APIRouter, HTTPException, status
+
+from app.api.deps import CurrentUserProfile, SessionDep
+from app.core.network import resolve_public_host
+from app.crud import alert as alert_crud
+from app.crud import provider as provider_crud
+from app.models.alert import NotificationType
+from app.schemas.alert import (
+    AlertCreate,
+    AlertEventResponse,
+    AlertResponse,
+    AlertUpdate,
+    validate_destination,
+)
+
+router = APIRouter()
+
+
+async def _check_webhook_host(notification_type: NotificationType, destination: str) -> None:
+    """Reject a webhook whose host resolves to a local or private address right away,
+    rather than only dead-lettering its notifications later.
+    """
+    if notification_type != NotificationType.WEBHOOK:
+        return
+    try:
+        await resolve_public_host(httpx.URL(destination))
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Webhook destination: {e}",
+        ) from None
+
+
+@router.get("", response_model=list[AlertResponse])
+async def list_alerts(
+    db: SessionDep,
+    user_profile: CurrentUserProfile,
+):
+    """List all alerts for the current user."""
+    return await alert_crud.get_by_user(db, user_profile.id)
+
+
+@router.post("", response_model=AlertResponse, status_code=status.HTTP_201_CREATED)
+async def create_alert(
+    db: SessionDep,
+    user_profile: CurrentUserProfile,
+    alert_in: AlertCreate,
+):
+    """Create a spend alert, for one provider or across all of them."""
+    if alert_in.provider_id:
+        provider = await provider_crud.get(db, alert_in.provider_id)
+        if not provider or provider.user_id != user_profile.id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Provider not found",
+            )
+    await _check_webhook_host(alert_in.notification_type, alert_in.destination)
+    return await alert_crud.create(db, user_profile.id, alert_in)
+
+
+@router.get("/{alert_id}", response_model=AlertResponse)
+async def get_alert(
+    db: SessionDep,
+    user_profile: CurrentUserProfile,
+    alert_id: uuid.UUID,
+):
+    """Get a specific alert by ID."""
+    alert = await alert_crud.get(db, alert_id)
+    if not alert or alert.user_id != user_profile.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alert not found",
+        )
+    return alert
+
+
+@router.patch("/{alert_id}", response_model=AlertResponse)
+async def update_alert(
+    db: SessionDep,
+    user_profile: CurrentUserProfile,
+    alert_id: uuid.UUID,
+    alert_in: AlertUpdate,
+):
+    """Update an alert. Changing its service, threshold or period restarts its totals."""
+    alert = await alert_crud.get(db, alert_id)
+    if not alert or alert.user_id != user_profile.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alert not found",
+        )
+    notification_type = alert_in.notification_type or alert.notification_type
+    destination = alert_in.destination or alert.destination
+    try:
+        validate_destination(notification_type, destination)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=str(e),
+        ) from None
+    await _check_webhook_host(notification_type, destination)
+    return await alert_crud.update(db, alert, alert_in)
+
+
+@router.delete("/{alert_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_alert(
+    db: SessionDep,
+    user_profile: CurrentUserProfile,
+    alert_id: uuid.UUID,
+):
+    """Delete an alert and its history."""
+    alert = await alert_crud.get(db, alert_id)
+    if not alert or alert.user_id != user_profile.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alert not found",
+        )
+    await alert_crud.delete(db, alert)
+
+
+@router.get("/{alert_id}/events", response_model=list[AlertEventResponse])
+async def list_alert_events(
+    db: SessionDep,
+    user_profile: CurrentUserProfile,
+    alert_id: uuid.UUID,
+):
+    """List the threshold crossings of an alert, newest first."""
+    alert = await alert_crud.get(db, alert_id)
+    if not alert or alert.user_id != user_profile.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Alert not found",
+        )
+    return await alert_crud.get_events(db, alert.id)
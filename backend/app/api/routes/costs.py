@@ -1,31 +1,266 @@
+import enum
 import uuid
-from datetime import datetime
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 
-from app.api.deps import CurrentUserProfile, SessionDep
+from app.api.deps import CurrentUserProfile, ReadSessionDep, check_data_etag
+from app.core.db import AsyncReadSessionLocal
+from app.core.instrumentation import timed
 from app.crud import cost as cost_crud
+from app.crud import cost_aggregate, cost_export, cost_forecast
 from app.models.provider import ProviderType
-from app.schemas.cost import CostFilters, CostRecordResponse
+from app.models.user import UserProfile
+from app.schemas.cost import (
+    CostByProvider,
+    CostByService,
+    CostCursor,
+    CostFilters,
+    CostForecast,
+    CostGranularity,
+    CostPeriod,
+    CostRecordColumns,
+    CostRecordResponse,
+    CostRecordRow,
+    CostSummary,
+    CostTimelinePoint,
+)
 
 router = APIRouter()
 
 
-@router.get("", response_model=list[CostRecordResponse])
-async def list_costs(
-    db: SessionDep,
-    user_profile: CurrentUserProfile,
+class CostFormat(enum.StrEnum):
+    JSON = "json"
+    NDJSON = "ndjson"
+    # One array per field instead of one object per record
+    COLUMNAR = "columnar"
+
+
+class ExportFormat(enum.StrEnum):
+    CSV = "csv"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv",
+    ExportFormat.PARQUET: "application/vnd.apache.parquet",
+    ExportFormat.ARROW: "application/vnd.apache.arrow.stream",
+}
+
+
+# Rows are serialized straight from the selected columns, skipping response validation
+_row_adapter = TypeAdapter(CostRecordRow)
+_rows_adapter = TypeAdapter(list[CostRecordRow])
+_columns_adapter = TypeAdapter(CostRecordColumns)
+
+
+def get_cost_filters(
     provider_id: Annotated[uuid.UUID | None, Query()] = None,
     provider_type: Annotated[ProviderType | None, Query()] = None,
     start_date: Annotated[datetime | None, Query()] = None,
     end_date: Annotated[datetime | None, Query()] = None,
-):
-    """List cost records for the current user with optional filters."""
-    filters = CostFilters(
+) -> CostFilters:
+    return CostFilters(
         provider_id=provider_id,
         provider_type=provider_type,
         start_date=start_date,
         end_date=end_date,
     )
-    return await cost_crud.get_by_user(db, user_profile.id, filters)
+
+
+CostFiltersDep = Annotated[CostFilters, Depends(get_cost_filters)]
+
+
+async def _stream_ndjson(
+    user_id: uuid.UUID, filters: CostFilters, cursor: CostCursor | None
+) -> AsyncIterator[bytes]:
+    # The stream outlives the request dependencies, so it holds its own session
+    async with AsyncReadSessionLocal() as db:
+        async for row in cost_crud.stream_by_user(db, user_id, filters, cursor=cursor):
+            yield _row_adapter.dump_json(row._asdict()) + b"\n"
+
+
+async def _stream_export(
+    user_id: uuid.UUID, filters: CostFilters, format: ExportFormat
+) -> AsyncIterator[bytes]:
+    async with AsyncReadSessionLocal() as db:
+        if format == ExportFormat.CSV:
+            chunks = cost_export.stream_csv(db, user_id, filters)
+        else:
+            chunks = cost_export.stream_arrow(
+                db, user_id, filters, parquet=format == ExportFormat.PARQUET
+            )
+        async for chunk in chunks:
+            yield chunk
+
+
+@router.get(
+    "",
+    response_model=list[CostRecordResponse],
+    dependencies=[Depends(check_data_etag)],
+)
+async def list_costs(
+    db: ReadSessionDep,
+    user_profile: CurrentUserProfile,
+    filters: CostFiltersDep,
+    response: Response,
+    cursor: Annotated[str | None, Query()] = None,
+    limit: Annotated[int, Query(ge=1, le=cost_crud.MAX_PAGE_SIZE)] = cost_crud.DEFAULT_PAGE_SIZE,
+    format: Annotated[CostFormat, Query()] = CostFormat.JSON,
+):
+    """List cost records for the current user with optional filters.
+
+    Results are ordered newest first and paginated by keyset: when more rows exist, the
+    `X-Next-Cursor` response header holds the `cursor` value for the next page. With
+    `format=ndjson` every matching row after `cursor` is streamed, one JSON object per line.
+    `format=columnar` returns the page as one array per field. Responses carry a weak
+    ETag; a matching `If-None-Match` gets 304 Not Modified.
+    """
+    try:
+        position = CostCursor.decode(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        ) from None
+
+    if format == CostFormat.NDJSON:
+        return StreamingResponse(
+            _stream_ndjson(user_profile.id, filters, position),
+            media_type="application/x-ndjson",
+            headers=response.headers,
+        )
+
+    rows, next_cursor = await cost_crud.get_page(
+        db, user_profile.id, filters, limit=limit, cursor=position
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor.encode()
+    with timed("serialize"):
+        if format == CostFormat.COLUMNAR:
+            columns = {
+                name: [getattr(row, name) for row in rows] for name in CostRecordRow.__annotations__
+            }
+            content = _columns_adapter.dump_json(columns)
+        else:
+            content = _rows_adapter.dump_json([row._asdict() for row in rows])
+    return Response(content, media_type="application/json", headers=response.headers)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}}},
+)
+async def export_costs(
+    user_profile: CurrentUserProfile,
+    filters: CostFiltersDep,
+    format: Annotated[ExportFormat, Query()] = ExportFormat.CSV,
+):
+    """Download every matching cost record as CSV, Parquet or an Arrow IPC stream.
+
+    The file is streamed in chunks as Postgres produces the rows, newest first.
+    """
+    filename = f"costs-{datetime.now(UTC):%Y%m%d}.{format.value}"
+    return StreamingResponse(
+        _stream_export(user_profile.id, filters, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _period(user_profile: UserProfile, filters: CostFilters) -> CostPeriod:
+    try:
+        return cost_aggregate.resolve_period(
+            user_profile.timezone, filters.start_date, filters.end_date
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from None
+
+
+@router.get(
+    "/summary",
+    response_model=CostSummary,
+    dependencies=[Depends(check_data_etag)],
+)
+async def get_cost_summary(
+    db: ReadSessionDep,
+    user_profile: CurrentUserProfile,
+    filters: CostFiltersDep,
+):
+    """Total spend for the period (default: month to date) against the preceding period."""
+    period = _period(user_profile, filters)
+    return await cost_aggregate.get_summary(db, user_profile.id, period, filters)
+
+
+@router.get(
+    "/by-provider",
+    response_model=list[CostByProvider],
+    dependencies=[Depends(check_data_etag)],
+)
+async def get_costs_by_provider(
+    db: ReadSessionDep,
+    user_profile: CurrentUserProfile,
+    filters: CostFiltersDep,
+):
+    """Spend per provider for the period, highest first."""
+    period = _period(user_profile, filters)
+    return await cost_aggregate.get_by_provider(db, user_profile.id, period, filters)
+
+
+@router.get(
+    "/by-service",
+    response_model=list[CostByService],
+    dependencies=[Depends(check_data_etag)],
+)
+async def get_costs_by_service(
+    db: ReadSessionDep,
+    user_profile: CurrentUserProfile,
+    filters: CostFiltersDep,
+):
+    """Spend per service for the period, highest first."""
+    period = _period(user_profile, filters)
+    return await cost_aggregate.get_by_service(db, user_profile.id, period, filters)
+
+
+@router.get(
+    "/timeline",
+    response_model=list[CostTimelinePoint],
+    dependencies=[Depends(check_data_etag)],
+)
+async def get_cost_timeline(
+    db: ReadSessionDep,
+    user_profile: CurrentUserProfile,
+    filters: CostFiltersDep,
+    granularity: Annotated[CostGranularity, Query()] = CostGranularity.DAY,
+):
+    """Spend over time, bucketed by day, week or month in the user's timezone."""
+    period = _period(user_profile, filters)
+    return await cost_aggregate.get_timeline(db, user_profile.id, period, filters, granularity)
+
+
+@router.get(
+    "/forecast",
+    response_model=CostForecast,
+    dependencies=[Depends(check_data_etag)],
+)
+async def get_cost_forecast(
+    db: ReadSessionDep,
+    user_profile: CurrentUserProfile,
+    response: Response,
+):
+    """Month-end projection and anomaly flags for every provider and service.
+
+    Projections follow each series' weekday pattern and recent trend over UTC days. A
+    series is flagged when its latest complete day jumps well above the four weeks
+    before it.
+    """
+    forecast = await cost_forecast.get_forecast(db, user_profile.id)
+    return Response(
+        forecast.model_dump_json(), media_type="application/json", headers=response.headers
+    )
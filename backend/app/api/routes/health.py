@@ -1,6 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from app.api.deps import CurrentUser
+from app.api.deps import CurrentUser, require_metrics_token
+from app.core.db import engine, pool_stats, read_engine
 
 router = APIRouter()
 
@@ -13,3 +14,15 @@ def health_check():
 @router.get("/health/protected")
 def protected_health_check(current_user: CurrentUser):
     return {"status": "healthy", "user_id": current_user["id"]}
+
+
+@router.get("/health/db", dependencies=[Depends(require_metrics_token)])
+def database_pool_health():
+    """Connection pool usage, for tuning pool size per deployment.
+
+    Needs METRICS_TOKEN as a bearer token, like /metrics.
+    """
+    stats = {"status": "healthy", "pool": pool_stats(engine)}
+    if read_engine is not engine:
+        stats["read_pool"] = pool_stats(read_engine)
+    return stats
@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, Response
+
+from app.api.deps import require_metrics_token
+from app.core.db import engine, pool_stats, read_engine
+from app.core.metrics import CONTENT_TYPE, Gauge, registry
+
+router = APIRouter()
+
+POOL_CONNECTIONS = registry.register(
+    Gauge("db_pool_connections", "Pooled database connections by state.", ("pool", "state"))
+)
+
+
+def _update_pool_gauges() -> None:
+    pools = {"primary": engine}
+    if read_engine is not engine:
+        pools["read"] = read_engine
+    for name, pool_engine in pools.items():
+        stats = pool_stats(pool_engine)
+        for state in ("checked_in", "checked_out", "overflow"):
+            POOL_CONNECTIONS.set(name, state, value=stats[state])
+
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+def metrics():
+    """Request, database and pool metrics in Prometheus text format."""
+    _update_pool_gauges()
+    return Response(registry.render(), media_type=CONTENT_TYPE)
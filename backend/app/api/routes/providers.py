@@ -1,17 +1,31 @@
 import uuid
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 
-from app.api.deps import CurrentUserProfile, SessionDep
+from app.api.deps import (
+    CurrentUserProfile,
+    ReadSessionDep,
+    SessionDep,
+    check_data_etag,
+    check_primary_data_etag,
+)
+from app.connectors import CONNECTORS
 from app.crud import provider as provider_crud
+from app.crud import sync_job as sync_job_crud
 from app.schemas.provider import ProviderCreate, ProviderResponse, ProviderUpdate
+from app.schemas.sync import SyncJobResponse
+from app.sync.jobs import job_queue
 
 router = APIRouter()
 
 
-@router.get("", response_model=list[ProviderResponse])
+@router.get(
+    "",
+    response_model=list[ProviderResponse],
+    dependencies=[Depends(check_data_etag)],
+)
 async def list_providers(
-    db: SessionDep,
+    db: ReadSessionDep,
     user_profile: CurrentUserProfile,
 ):
     """List all providers for the current user."""
@@ -28,7 +42,11 @@ async def create_provider(
     return await provider_crud.create(db, user_profile.id, provider_in)
 
 
-@router.get("/{provider_id}", response_model=ProviderResponse)
+@router.get(
+    "/{provider_id}",
+    response_model=ProviderResponse,
+    dependencies=[Depends(check_primary_data_etag)],
+)
 async def get_provider(
     db: SessionDep,
     user_profile: CurrentUserProfile,
@@ -75,3 +93,59 @@ async def delete_provider(
             detail="Provider not found",
         )
     await provider_crud.delete(db, provider)
+
+
+@router.post(
+    "/{provider_id}/sync",
+    response_model=SyncJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def sync_provider(
+    db: SessionDep,
+    user_profile: CurrentUserProfile,
+    provider_id: uuid.UUID,
+    full: bool = False,
+):
+    """Queue a sync of the provider and return the job without waiting for it.
+
+    If a sync of this provider is already queued or running, that job is returned
+    instead of starting another. `full` re-fetches the whole history.
+    """
+    provider = await provider_crud.get(db, provider_id)
+    if not provider or provider.user_id != user_profile.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Provider not found",
+        )
+    if provider.type not in CONNECTORS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Sync is not supported for this provider type yet",
+        )
+    job, created = await sync_job_crud.get_or_create_active(db, provider.id, full=full)
+    if created:
+        job_queue.submit(job.id)
+    return job
+
+
+@router.get("/{provider_id}/sync/{job_id}", response_model=SyncJobResponse)
+async def get_sync_job(
+    db: SessionDep,
+    user_profile: CurrentUserProfile,
+    provider_id: uuid.UUID,
+    job_id: uuid.UUID,
+):
+    """Get the status and progress of a sync job."""
+    provider = await provider_crud.get(db, provider_id)
+    job = await sync_job_crud.get(db, job_id)
+    if (
+        not provider
+        or provider.user_id != user_profile.id
+        or not job
+        or job.provider_id != provider.id
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Sync job not found",
+        )
+    return job
@@ -0,0 +1,17 @@
+from app.connectors.anthropic import AnthropicConnector
+from app.connectors.base import BaseConnector, ConnectorError  # noqa: F401
+from app.connectors.openai import OpenAIConnector
+from app.models.provider import ProviderType
+
+CONNECTORS: dict[ProviderType, type[BaseConnector]] = {
+    ProviderType.OPENAI: OpenAIConnector,
+    ProviderType.ANTHROPIC: AnthropicConnector,
+}
+
+
+def get_connector_class(provider_type: ProviderType) -> type[BaseConnector]:
+    """Return the connector for a provider type. Raises ConnectorError if none exists yet."""
+    try:
+        return CONNECTORS[provider_type]
+    except KeyError:
+        raise ConnectorError(f"No connector for provider type {provider_type}") from None
@@ -0,0 +1,59 @@
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.connectors.base import BaseConnector
+from app.models.provider import ProviderType
+from app.schemas.cost import CostRecordCreate
+
+
+class AnthropicConnector(BaseConnector):
+    """Daily costs per description from the Admin API cost report (needs an admin key)."""
+
+    provider_type = ProviderType.ANTHROPIC
+    base_url = "https://api.anthropic.com/v1"
+    window = timedelta(days=31)
+
+    async def fetch_window(
+        self, start: datetime, end: datetime
+    ) -> AsyncIterator[list[CostRecordCreate]]:
+        headers = {
+            "x-api-key": self.credentials["api_key"],
+            "anthropic-version": "2023-06-01",
+        }
+        params: dict = {
+            "starting_at": start.isoformat(),
+            "ending_at": end.isoformat(),
+            "group_by[]": ["description"],
+            "limit": 31,
+        }
+
+        while True:
+            response = await self.request(
+                "GET", "/organizations/cost_report", params=params, headers=headers
+            )
+            page = response.json()
+            batch = [
+                CostRecordCreate(
+                    provider_id=self.provider_id,
+                    # Reported in cents as a decimal string
+                    amount=Decimal(result["amount"]) / 100,
+                    currency=result.get("currency") or "USD",
+                    service=(result.get("description") or result.get("cost_type") or "total")[:100],
+                    period_start=datetime.fromisoformat(bucket["starting_at"]),
+                    period_end=datetime.fromisoformat(bucket["ending_at"]),
+                    # The amount already has columns of its own
+                    metadata_json={
+                        key: value
+                        for key, value in result.items()
+                        if key not in ("amount", "currency")
+                    },
+                )
+                for bucket in page["data"]
+                for result in bucket["results"]
+            ]
+            if batch:
+                yield batch
+            if not page.get("has_more"):
+                break
+            params["page"] = page["next_page"]
@@ -0,0 +1,133 @@
+import asyncio
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Iterator
+from datetime import datetime, timedelta
+from typing import ClassVar
+
+import httpx
+
+from app.connectors.http import get_http_client
+from app.models.provider import ProviderType
+from app.schemas.cost import CostRecordCreate
+
+# Attempts per request when the provider answers 429 or 5xx
+MAX_ATTEMPTS = 4
+
+
+class ConnectorError(Exception):
+    """A provider API call failed."""
+
+
+class BaseConnector(ABC):
+    """Fetches cost data for one provider connection.
+
+    Subclasses implement `fetch_window` for a single date window, following the API's
+    own pagination. `fetch` splits a date range into windows and runs them concurrently,
+    at most `max_concurrency` requests at a time per connection, yielding batches as
+    soon as they are parsed so the caller can write them while other pages download.
+
+    `cursor` and `etag` carry a provider's change token between syncs. Connectors for APIs
+    that hand one out read it to ask only for changes and update it as they go; the sync
+    runner saves the values left after a successful sync.
+    """
+
+    provider_type: ClassVar[ProviderType]
+    base_url: ClassVar[str]
+    # Concurrent in-flight requests per provider connection
+    max_concurrency: ClassVar[int] = 4
+    # Width of the date windows fetched in parallel
+    window: ClassVar[timedelta] = timedelta(days=30)
+
+    def __init__(
+        self,
+        provider_id: uuid.UUID,
+        credentials: dict,
+        *,
+        client: httpx.AsyncClient | None = None,
+        base_url: str | None = None,
+        cursor: str | None = None,
+        etag: str | None = None,
+    ):
+        self.provider_id = provider_id
+        self.credentials = credentials
+        self.client = client or get_http_client()
+        self.base_url = base_url or self.base_url
+        self.cursor = cursor
+        self.etag = etag
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    @abstractmethod
+    def fetch_window(self, start: datetime, end: datetime) -> AsyncIterator[list[CostRecordCreate]]:
+        """Yield cost record batches for [start, end)."""
+
+    async def request(self, method: str, path: str, **kwargs) -> httpx.Response:
+        """Send a request to the provider API, retrying rate limits and server errors."""
+        for attempt in range(MAX_ATTEMPTS):
+            async with self._semaphore:
+                try:
+                    response = await self.client.request(method, f"{self.base_url}{path}", **kwargs)
+                except httpx.HTTPError as exc:
+                    raise ConnectorError(f"{self.provider_type} request failed: {exc}") from exc
+            if response.status_code != 429 and response.status_code < 500:
+                break
+            if attempt < MAX_ATTEMPTS - 1:
+                await asyncio.sleep(_retry_delay(response, attempt))
+
+        if response.is_error:
+            raise ConnectorError(
+                f"{self.provider_type} API returned {response.status_code}: {response.text[:200]}"
+            )
+        return response
+
+    async def fetch(self, start: datetime, end: datetime) -> AsyncIterator[list[CostRecordCreate]]:
+        """Yield cost record batches for [start, end), fetching windows concurrently."""
+        done = object()
+        # Bounded, so fast downloads wait for the consumer instead of piling up in memory
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency * 2)
+
+        async def drain(window_start: datetime, window_end: datetime) -> None:
+            async for batch in self.fetch_window(window_start, window_end):
+                await queue.put(batch)
+
+        async def produce() -> None:
+            tasks = [asyncio.create_task(drain(*window)) for window in self._windows(start, end)]
+            try:
+                await asyncio.gather(*tasks)
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                # The consumer may be gone, so never wait for room: the batches still
+                # queued are dropped in favour of the error, which `await producer` raises
+                while queue.full():
+                    queue.get_nowait()
+                queue.put_nowait(done)
+                raise
+            await queue.put(done)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (batch := await queue.get()) is not done:
+                yield batch
+            await producer
+        finally:
+            producer.cancel()
+
+    async def records(self, start: datetime, end: datetime) -> AsyncIterator[CostRecordCreate]:
+        """Like `fetch`, one record at a time, e.g. to feed `cost_crud.upsert_many`."""
+        async for batch in self.fetch(start, end):
+            for record in batch:
+                yield record
+
+    def _windows(self, start: datetime, end: datetime) -> Iterator[tuple[datetime, datetime]]:
+        while start < end:
+            window_end = min(start + self.window, end)
+            yield start, window_end
+            start = window_end
+
+
+def _retry_delay(response: httpx.Response, attempt: int) -> float:
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), 60.0)
+    return 0.5 * 2**attempt
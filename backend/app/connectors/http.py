@@ -0,0 +1,37 @@
+import importlib.util
+
+import httpx
+
+from app.core.config import settings
+
+# HTTP/2 needs the optional h2 package (installed with httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_client: httpx.AsyncClient | None = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide HTTP client shared by all connectors.
+
+    One client means one connection pool, so keep-alive connections (and HTTP/2 streams)
+    to each provider API are reused across syncs instead of being re-established.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=settings.CONNECTOR_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.CONNECTOR_MAX_CONNECTIONS,
+                keepalive_expiry=60,
+            ),
+            timeout=httpx.Timeout(settings.CONNECTOR_TIMEOUT_SECONDS, connect=10),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,56 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+
+
+class TTLCache[K, V]:
+    """A bounded in-process LRU cache whose entries expire after a time to live.
+
+    Not shared between processes or replicas, so only cache values for which a
+    short-lived stale copy is acceptable. Safe within one event loop. `on_evict` is
+    called with every value that leaves the cache, whether expired, pushed out,
+    replaced or removed.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, on_evict: Callable[[V], None] | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def get(self, key: K) -> V | None:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            self.pop(key)
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Store a value, optionally with a shorter time to live than the default."""
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        previous = self._data.pop(key, None)
+        if previous is not None and previous[1] is not value:
+            self._evicted(previous[1])
+        self._data[key] = (time.monotonic() + ttl, value)
+        while len(self._data) > self.maxsize:
+            self._evicted(self._data.popitem(last=False)[1][1])
+
+    def pop(self, key: K) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._evicted(entry[1])
+
+    def clear(self) -> None:
+        while self._data:
+            self._evicted(self._data.popitem()[1][1])
+
+    def _evicted(self, value: V) -> None:
+        if self.on_evict:
+            self.on_evict(value)
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -17,9 +17,118 @@ class Settings(BaseSettings):
 
     # Database (Supabase PostgreSQL connection string)
     DATABASE_URL: str
+    # Optional read replica for read-only endpoints; they use DATABASE_URL when unset
+    DATABASE_READ_URL: str | None = None
+
+    # Connection pool, per process. Keep DB_POOL_SIZE + DB_MAX_OVERFLOW times the number of
+    # processes within the pooler's client limit.
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Costs a round trip per checkout; enable if idle connections get dropped under us
+    DB_POOL_PRE_PING: bool = False
+    # 0 disables. Sent as a startup option; poolers that reject startup options need it
+    # set on the database role instead (ALTER ROLE ... SET statement_timeout)
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    # Executions before psycopg prepares a statement server-side. None disables prepared
+    # statements, which transaction-mode poolers (Supabase port 6543) require; on a direct
+    # connection psycopg's default of 5 is faster.
+    DB_PREPARE_THRESHOLD: int | None = None
+
+    # Request and database instrumentation (see app/core/instrumentation.py). It is served
+    # in Prometheus text format at /metrics only when METRICS_TOKEN is set, and scrapes
+    # must send that token as a bearer token. The pool stats at /health/db need it too
+    METRICS_ENABLED: bool = True
+    METRICS_TOKEN: str | None = None
+    # Adds each response's auth, profile, database and total times as a Server-Timing header
+    SERVER_TIMING_ENABLED: bool = True
+    # Requests running more queries than this are logged as likely N+1 patterns; 0 disables
+    REQUEST_QUERY_BUDGET: int = 20
+    # Statements slower than this are logged by fingerprint; 0 disables
+    DB_SLOW_QUERY_MS: float = 250.0
 
     # Encryption key for credentials (generate with: python -c "from cryptography.fernet import Fernet; print(Fernet.generate_key().decode())")
     ENCRYPTION_KEY: str
+    # Comma-separated keys that were replaced by ENCRYPTION_KEY and are still accepted for
+    # decryption until `python -m app.scripts.rotate_credentials` has re-encrypted everything
+    ENCRYPTION_OLD_KEYS: str = ""
+    # Per-process cache of decrypted provider credentials for sync workers
+    CREDENTIALS_CACHE_SIZE: int = 10000
+    CREDENTIALS_CACHE_TTL_SECONDS: float = 600.0
+
+    # Supabase signing keys are refreshed in the background at the JWKS max-age, falling
+    # back to JWKS_REFRESH_SECONDS; JWKS_MIN_REFRESH_SECONDS rate-limits refreshes
+    JWKS_REFRESH_SECONDS: float = 600.0
+    JWKS_MIN_REFRESH_SECONDS: float = 5.0
+    # Per-process cache of verified tokens, capped at each token's expiry
+    VERIFIED_TOKEN_CACHE_SIZE: int = 10000
+    VERIFIED_TOKEN_CACHE_TTL_SECONDS: float = 300.0
+
+    # Per-process cache of user profiles looked up on every authenticated request
+    USER_PROFILE_CACHE_SIZE: int = 10000
+    USER_PROFILE_CACHE_TTL_SECONDS: float = 60.0
+
+    # cost_records partitions are created this many months ahead; partitions older than
+    # COST_RETENTION_MONTHS are dropped (0 keeps everything)
+    COST_PARTITION_MONTHS_AHEAD: int = 3
+    COST_RETENTION_MONTHS: int = 0
+
+    # Rows per COPY batch when bulk-loading cost records
+    COST_INGEST_BATCH_SIZE: int = 5000
+
+    # Bytes of CSV buffered per chunk of a cost export; Parquet and Arrow exports encode
+    # each chunk as one record batch (row group)
+    COST_EXPORT_CHUNK_BYTES: int = 8 * 1024 * 1024
+
+    # Per-process cache of spend forecasts; entries are also replaced after every sync
+    COST_FORECAST_CACHE_SIZE: int = 10000
+    COST_FORECAST_CACHE_TTL_SECONDS: float = 3600.0
+
+    # Shared HTTP client used by provider connectors
+    CONNECTOR_MAX_CONNECTIONS: int = 100
+    CONNECTOR_TIMEOUT_SECONDS: float = 30.0
+
+    # Background provider sync (see app/sync/scheduler.py)
+    SYNC_SCHEDULER_ENABLED: bool = False
+    SYNC_WORKERS: int = 4
+    SYNC_INTERVAL_MINUTES: int = 360
+    SYNC_ERROR_RETRY_MINUTES: int = 30
+    SYNC_POLL_SECONDS: int = 60
+    SYNC_JITTER_SECONDS: int = 300
+    # History fetched on a first or full sync, and the days re-fetched before the last
+    # synced point on incremental syncs to pick up late adjustments
+    SYNC_HISTORY_DAYS: int = 90
+    SYNC_OVERLAP_DAYS: int = 3
+    # A running sync renews its provider's lease with every batch it writes; a lease not
+    # renewed for this long belongs to a dead worker and is taken over
+    SYNC_LEASE_SECONDS: float = 600.0
+
+    # Manually requested syncs (POST /providers/{id}/sync)
+    SYNC_JOB_WORKERS: int = 2
+    SYNC_JOB_PROGRESS_SECONDS: float = 2.0
+    # The process holding a queued or running job touches it every SYNC_JOB_PROGRESS_SECONDS;
+    # an active job untouched for this long lost its process and is failed
+    SYNC_JOB_ORPHAN_SECONDS: float = 60.0
+
+    # Alert notifications (see app/notifications/dispatcher.py). Email needs a Resend API
+    # key and a sender on a domain verified with Resend.
+    RESEND_API_KEY: str | None = None
+    RESEND_API_URL: str = "https://api.resend.com"
+    NOTIFICATION_EMAIL_FROM: str | None = None
+    NOTIFICATION_DISPATCHER_ENABLED: bool = True
+    NOTIFICATION_WORKERS: int = 8
+    NOTIFICATION_POLL_SECONDS: float = 5.0
+    # Notifications claimed per poll; Resend accepts at most 100 emails per batch request
+    NOTIFICATION_BATCH_SIZE: int = 100
+    NOTIFICATION_TIMEOUT_SECONDS: float = 10.0
+    # Sends per destination (webhook host or email address) per minute, per process
+    NOTIFICATION_RATE_PER_MINUTE: int = 10
+    # Failed sends are retried after NOTIFICATION_RETRY_BASE_SECONDS, doubling up to
+    # NOTIFICATION_RETRY_MAX_SECONDS, and dead-lettered after NOTIFICATION_MAX_ATTEMPTS
+    NOTIFICATION_MAX_ATTEMPTS: int = 8
+    NOTIFICATION_RETRY_BASE_SECONDS: float = 30.0
+    NOTIFICATION_RETRY_MAX_SECONDS: float = 3600.0
 
 
 settings = Settings()
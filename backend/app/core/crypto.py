@@ -1,12 +1,23 @@
+import hashlib
 import json
+import threading
+import uuid
+from collections.abc import Iterable
+from functools import cache
 
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 
-def get_fernet() -> Fernet:
-    return Fernet(settings.ENCRYPTION_KEY.encode())
+@cache
+def get_fernet() -> MultiFernet:
+    """The process-wide cipher. Encrypts with ENCRYPTION_KEY and also decrypts tokens
+    made with any of ENCRYPTION_OLD_KEYS, so keys can be rotated without downtime.
+    """
+    keys = [settings.ENCRYPTION_KEY, *settings.ENCRYPTION_OLD_KEYS.split(",")]
+    return MultiFernet([Fernet(key.strip().encode()) for key in keys if key.strip()])
 
 
 def encrypt_credentials(credentials: dict) -> str:
@@ -21,3 +32,57 @@ def decrypt_credentials(encrypted: str) -> dict:
     fernet = get_fernet()
     decrypted_bytes = fernet.decrypt(encrypted.encode())
     return json.loads(decrypted_bytes.decode())
+
+
+def rotate_credentials(encrypted: str) -> str:
+    """Re-encrypt stored credentials with the current ENCRYPTION_KEY."""
+    return get_fernet().rotate(encrypted.encode()).decode()
+
+
+# Decrypted credentials per provider: (ciphertext digest, plaintext JSON). The dicts
+# handed out are parsed from the plaintext per call and are the caller's to drop. Python
+# offers no reliable way to scrub secrets from memory (the decrypted bytes and every
+# string parsed from them are immutable copies), so entries simply expire.
+_credentials_cache: TTLCache[uuid.UUID, tuple[bytes, bytes]] = TTLCache(
+    maxsize=settings.CREDENTIALS_CACHE_SIZE,
+    ttl=settings.CREDENTIALS_CACHE_TTL_SECONDS,
+)
+# Batches are decrypted in a worker thread while the event loop reads the cache
+_cache_lock = threading.Lock()
+
+
+def get_provider_credentials(provider_id: uuid.UUID, encrypted: str) -> dict:
+    """Decrypt a provider's credentials, reusing a recent decryption of the same ciphertext.
+
+    Safe to call from worker threads as well as the event loop.
+    """
+    digest = hashlib.sha256(encrypted.encode()).digest()
+    with _cache_lock:
+        entry = _credentials_cache.get(provider_id)
+        if entry is not None and entry[0] == digest:
+            return json.loads(entry[1])
+    plaintext = get_fernet().decrypt(encrypted.encode())
+    with _cache_lock:
+        _credentials_cache.set(provider_id, (digest, plaintext))
+        return json.loads(plaintext)
+
+
+def decrypt_many(providers: Iterable[tuple[uuid.UUID, str]]) -> dict[uuid.UUID, dict]:
+    """Decrypt credentials for many (provider id, ciphertext) pairs at once.
+
+    Results also warm the cache used by `get_provider_credentials`. Ciphertexts that do
+    not decrypt with any configured key are left out.
+    """
+    credentials = {}
+    for provider_id, encrypted in providers:
+        try:
+            credentials[provider_id] = get_provider_credentials(provider_id, encrypted)
+        except InvalidToken:
+            continue
+    return credentials
+
+
+def clear_credentials_cache() -> None:
+    """Drop every cached decryption, e.g. after a key rotation."""
+    with _cache_lock:
+        _credentials_cache.clear()
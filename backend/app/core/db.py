@@ -1,11 +1,84 @@
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            self.checkouts += 1
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
 
-# Derive async connection URL from the sync one
-async_database_url = settings.DATABASE_URL.replace(
-    "postgresql+psycopg://", "postgresql+psycopg_async://"
-)
 
-engine = create_async_engine(async_database_url)
+def create_engine(url: str) -> AsyncEngine:
+    """Create an async engine for a `postgresql+psycopg://` URL with the pool settings."""
+    connect_args: dict = {
+        # Server-side prepared statements do not survive a transaction-mode pooler
+        "prepare_threshold": settings.DB_PREPARE_THRESHOLD,
+    }
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+    engine = create_async_engine(
+        # Derive async connection URL from the sync one
+        url.replace("postgresql+psycopg://", "postgresql+psycopg_async://"),
+        poolclass=InstrumentedPool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine)
+    return engine
+
+
+def pool_stats(engine: AsyncEngine) -> dict:
+    """Current usage and cumulative checkout waits of an engine's pool."""
+    pool = engine.pool
+    stats = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+    }
+    if isinstance(pool, InstrumentedPool):
+        stats |= {
+            "checkouts": pool.checkouts,
+            "timeouts": pool.timeouts,
+            "wait_seconds_total": pool.wait_seconds,
+            "wait_seconds_max": pool.max_wait_seconds,
+        }
+    return stats
+
+
+engine = create_engine(settings.DATABASE_URL)
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
+
+# Replica reads can lag the primary, so only use this for data a user did not just write
+read_engine = create_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else engine
+AsyncReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False)
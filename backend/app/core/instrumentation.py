@@ -0,0 +1,228 @@
+"""Request timing and database instrumentation.
+
+`MetricsMiddleware` times every request into per-route histograms and describes where
+its time went in a Server-Timing header: authentication, the profile lookup and any
+other phase timed with `timed`, the database (time and query count) and the whole
+request up to the response headers. Phases overlap with the database time when they
+query.
+
+Cursor hooks on every engine count queries and their time against the current request,
+log requests that run more than REQUEST_QUERY_BUDGET queries (the signature of an N+1
+pattern) and log statements slower than DB_SLOW_QUERY_MS by fingerprint, so repeats of
+one statement with different literals group together.
+"""
+
+import contextvars
+import hashlib
+import logging
+import re
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram, registry
+
+logger = logging.getLogger(__name__)
+
+# Slow statements are logged up to this many characters
+MAX_STATEMENT_LENGTH = 2000
+
+REQUEST_DURATION = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Time from receiving a request to sending the end of its response.",
+        ("method", "route"),
+    )
+)
+REQUESTS = registry.register(
+    Counter("http_requests_total", "Requests completed.", ("method", "route", "status"))
+)
+REQUEST_QUERIES = registry.register(
+    Histogram(
+        "http_request_db_queries",
+        "Database queries run per request.",
+        ("route",),
+        buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+    )
+)
+REQUEST_DB_DURATION = registry.register(
+    Histogram("http_request_db_seconds", "Database time per request.", ("route",))
+)
+OVER_QUERY_BUDGET = registry.register(
+    Counter(
+        "http_requests_over_query_budget_total",
+        "Requests that ran more than REQUEST_QUERY_BUDGET queries.",
+        ("route",),
+    )
+)
+QUERY_DURATION = registry.register(
+    Histogram("db_query_duration_seconds", "Duration of database statements.", ("operation",))
+)
+SLOW_QUERIES = registry.register(
+    Counter(
+        "db_slow_queries_total",
+        "Statements slower than DB_SLOW_QUERY_MS, by fingerprint.",
+        ("fingerprint",),
+    )
+)
+
+_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+@dataclass(slots=True)
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    # Seconds by phase name, in the order the phases first ran
+    phases: dict[str, float] = field(default_factory=dict)
+
+    def server_timing(self, total: float) -> str:
+        metrics = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.phases.items()]
+        queries = f"{self.queries} {'query' if self.queries == 1 else 'queries'}"
+        metrics.append(f'db;dur={self.db_seconds * 1000:.1f};desc="{queries}"')
+        metrics.append(f"app;dur={total * 1000:.1f}")
+        return ", ".join(metrics)
+
+
+# Stats of the request being handled; tasks and SQLAlchemy's greenlets inherit it
+_current_request: contextvars.ContextVar[RequestStats | None] = contextvars.ContextVar(
+    "current_request", default=None
+)
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Add the time spent in the block to a phase of the current request, if any."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _current_request.get()
+        if stats is not None:
+            stats.phases[phase] = stats.phases.get(phase, 0.0) + time.perf_counter() - started
+
+
+_PARAMETER = re.compile(r"%\(\w+\)s|%s|\$\d+|'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_REPEATED_GROUP = re.compile(r"(\([^()]*\))(?:\s*,\s*\1)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> tuple[str, str]:
+    """A statement with its parameters, literals and variable-length lists collapsed,
+    and a short digest of that for grouping.
+
+    `IN` lists and multi-row VALUES of any length normalize to the same text.
+    """
+    normalized = _WHITESPACE.sub(" ", statement).strip()
+    normalized = _PARAMETER.sub("?", normalized)
+    normalized = _PARAMETER_LIST.sub("(?, ...)", normalized)
+    normalized = _REPEATED_GROUP.sub(r"\1, ...", normalized)
+    return normalized, hashlib.blake2b(normalized.encode(), digest_size=8).hexdigest()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    operation = statement.lstrip()[:6].upper()
+    QUERY_DURATION.observe(elapsed, operation if operation in _OPERATIONS else "OTHER")
+
+    stats = _current_request.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+
+    if settings.DB_SLOW_QUERY_MS and elapsed * 1000 >= settings.DB_SLOW_QUERY_MS:
+        normalized, digest = fingerprint(statement)
+        SLOW_QUERIES.inc(digest)
+        logger.warning(
+            "Slow query %s took %.1f ms: %s",
+            digest,
+            elapsed * 1000,
+            normalized[:MAX_STATEMENT_LENGTH],
+        )
+
+
+def _handle_error(context) -> None:
+    # A failed statement never reaches after_cursor_execute. A connection runs one
+    # statement at a time, so anything left is that statement's start, if it got that far
+    if context.connection is not None:
+        started = context.connection.info.get("query_started")
+        if started:
+            started.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Time every statement run on the engine."""
+    sync_engine = engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
+
+
+class MetricsMiddleware:
+    """Records every HTTP request's latency, status and database use by route template.
+
+    A plain ASGI middleware, so streaming responses pass through untouched and the cost
+    per request is a few clock reads and histogram updates.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_ENABLED:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing", stats.server_timing(time.perf_counter() - started)
+                    )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_request.reset(token)
+            elapsed = time.perf_counter() - started
+            # The route template, so path parameters do not multiply the series. Under a
+            # mount its path is relative to the mount's prefix in root_path, and may be ""
+            route = scope.get("route")
+            path = "unmatched" if route is None else scope.get("root_path", "") + route.path
+            method = scope["method"]
+            REQUEST_DURATION.observe(elapsed, method, path)
+            REQUESTS.inc(method, path, str(status_code))
+            REQUEST_QUERIES.observe(stats.queries, path)
+            REQUEST_DB_DURATION.observe(stats.db_seconds, path)
+            budget = settings.REQUEST_QUERY_BUDGET
+            if budget and stats.queries > budget:
+                OVER_QUERY_BUDGET.inc(path)
+                logger.warning(
+                    "%s %s ran %d queries, over the budget of %d (%.1f ms in the database)",
+                    method,
+                    path,
+                    stats.queries,
+                    budget,
+                    stats.db_seconds * 1000,
+                )
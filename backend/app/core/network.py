@@ -0,0 +1,77 @@
+"""Guards for requests the server makes to user-supplied URLs, such as alert webhooks.
+
+Without them any user could point the API at loopback, link-local (cloud metadata at
+169.254.169.254) or private addresses and have it send requests into the internal
+network. URLs are checked when they are saved, and their host is resolved and checked
+again right before each request, since DNS can change in between.
+"""
+
+import asyncio
+import ipaddress
+import socket
+
+import httpx
+
+IPAddress = ipaddress.IPv4Address | ipaddress.IPv6Address
+
+# Names that resolve to the machine itself without asking DNS
+_LOCAL_NAMES = ("localhost", "localhost.localdomain")
+
+
+class UnresolvedHostError(ValueError):
+    """A host name did not resolve, which may be a passing DNS failure."""
+
+
+def is_public_address(address: IPAddress) -> bool:
+    """Whether an address is routable on the public internet.
+
+    Rejects loopback, link-local, private, shared (CGNAT), reserved and multicast
+    ranges, including IPv4 addresses wrapped in IPv6.
+    """
+    if isinstance(address, ipaddress.IPv6Address) and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    return address.is_global and not address.is_multicast
+
+
+def check_public_url(url: str) -> httpx.URL:
+    """Parse an https URL whose host is not a local name or a non-public address.
+
+    Raises ValueError otherwise. Hostnames are not resolved; see `resolve_public_host`.
+    """
+    try:
+        parsed = httpx.URL(url)
+    except httpx.InvalidURL:
+        raise ValueError("URL is not valid") from None
+    if parsed.scheme != "https":
+        raise ValueError("URL must use https")
+    host = parsed.host.rstrip(".").lower()
+    if not host:
+        raise ValueError("URL must have a host")
+    if host in _LOCAL_NAMES or host.endswith(".localhost"):
+        raise ValueError("URL must not point at a local address")
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return parsed
+    if not is_public_address(address):
+        raise ValueError("URL must not point at a local or private address")
+    return parsed
+
+
+async def resolve_public_host(url: httpx.URL) -> list[IPAddress]:
+    """Resolve the host of a URL and return its addresses, all of them public.
+
+    Raises UnresolvedHostError when the host does not resolve, and ValueError when any
+    address it resolves to is not public; a name with one private address among public
+    ones is as dangerous as one with only private addresses.
+    """
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            url.host, url.port or 443, type=socket.SOCK_STREAM
+        )
+    except socket.gaierror:
+        raise UnresolvedHostError(f"Host {url.host} could not be resolved") from None
+    addresses = list(dict.fromkeys(ipaddress.ip_address(info[4][0]) for info in infos))
+    if not addresses or not all(is_public_address(address) for address in addresses):
+        raise ValueError(f"Host {url.host} resolves to a local or private address")
+    return addresses
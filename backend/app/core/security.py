@@ -1,22 +1,157 @@
+import asyncio
+import contextlib
+import copy
+import hashlib
+import logging
+import math
+import re
+import time
+
+import httpx
 import jwt
 from fastapi import HTTPException, status
 
+from app.connectors.http import get_http_client
+from app.core.cache import TTLCache
 from app.core.config import settings
 
-jwks_client = jwt.PyJWKClient(f"{settings.SUPABASE_URL}/auth/v1/.well-known/jwks.json")
+logger = logging.getLogger(__name__)
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+# A key set fetch that raises one of these failed; the held keys stay in use. ValueError
+# covers bodies that are not JSON or not a JWKS document
+_FETCH_ERRORS = (httpx.HTTPError, jwt.PyJWTError, ValueError)
+
+
+class JWKSManager:
+    """Supabase signing keys held in memory and refreshed in the background.
+
+    Keys are fetched at startup and again before the JWKS response's max-age runs out,
+    so verifying a token almost never waits on the network. Failed fetches are retried
+    with exponential backoff. A token signed with an unknown key id (a rotated key, or
+    no keys yet because the startup fetch failed) fetches the key set on demand; those
+    fetches are shared by concurrent requests and rate-limited to one per
+    JWKS_MIN_REFRESH_SECONDS, so tokens with bogus key ids cannot cause a stream of them.
+    """
+
+    def __init__(self, url: str, client: httpx.AsyncClient | None = None):
+        self.url = url
+        self.client = client
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._task: asyncio.Task | None = None
+        self._fetch: asyncio.Task | None = None
+        self._last_fetch = -math.inf
+
+    async def start(self) -> None:
+        try:
+            delay = await self.refresh() * 0.8
+        except _FETCH_ERRORS:
+            logger.warning("Fetching the JWKS failed; retrying in the background", exc_info=True)
+            delay = None
+        self._task = asyncio.create_task(self._run(delay))
+
+    async def stop(self) -> None:
+        for task in (self._task, self._fetch):
+            if task:
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+        self._task = self._fetch = None
+
+    async def refresh(self) -> float:
+        """Fetch the key set and return how long it may be cached, in seconds."""
+        self._last_fetch = time.monotonic()
+        client = self.client or get_http_client()
+        response = await client.get(self.url, timeout=10.0)
+        response.raise_for_status()
+        self.load(response.json())
+        match = _MAX_AGE.search(response.headers.get("Cache-Control", ""))
+        return float(match.group(1)) if match else settings.JWKS_REFRESH_SECONDS
+
+    def load(self, key_set: dict) -> None:
+        """Replace the held keys with those of a JWKS document.
 
+        Raises ValueError or PyJWTError, keeping the held keys, if it is malformed.
+        """
+        if not isinstance(key_set, dict) or not isinstance(key_set.get("keys"), list):
+            raise ValueError("JWKS document has no list of keys")
+        if not all(isinstance(key, dict) for key in key_set["keys"]):
+            raise ValueError("JWKS keys must be JSON objects")
+        keys = jwt.PyJWKSet.from_dict(key_set).keys
+        self._keys = {key.key_id: key for key in keys if key.key_id}
+
+    async def get_signing_key(self, kid: str | None) -> jwt.PyJWK | None:
+        """The key for `kid`, fetching the key set first if it is not held yet."""
+        if not kid:
+            return None
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+        if self._fetch is None:
+            if time.monotonic() - self._last_fetch < settings.JWKS_MIN_REFRESH_SECONDS:
+                return None
+            self._fetch = asyncio.create_task(self.refresh())
+            self._fetch.add_done_callback(self._fetched)
+        # Shielded, so a request that gives up does not cancel the fetch for the others
+        with contextlib.suppress(*_FETCH_ERRORS):
+            await asyncio.shield(self._fetch)
+        return self._keys.get(kid)
+
+    def _fetched(self, task: asyncio.Task) -> None:
+        self._fetch = None
+        if not task.cancelled() and task.exception():
+            logger.warning("Fetching the JWKS failed: %r", task.exception())
+
+    async def _run(self, delay: float | None) -> None:
+        failures = 0 if delay is not None else 1
+        while True:
+            if delay is None:
+                # Back off exponentially after failures, up to the normal refresh interval
+                delay = min(
+                    settings.JWKS_MIN_REFRESH_SECONDS * 2 ** (failures - 1),
+                    settings.JWKS_REFRESH_SECONDS,
+                )
+            await asyncio.sleep(delay)
+            try:
+                # Refresh ahead of the end of the cache lifetime
+                delay = await self.refresh() * 0.8
+                failures = 0
+            except _FETCH_ERRORS:
+                logger.warning("Refreshing the JWKS failed", exc_info=True)
+                delay = None
+                failures += 1
+
+
+jwks_manager = JWKSManager(f"{settings.SUPABASE_URL}/auth/v1/.well-known/jwks.json")
+
+# Payloads of tokens that already passed verification, keyed by token digest and kept no
+# longer than the token's own expiry
+_verified_tokens: TTLCache[bytes, dict] = TTLCache(
+    maxsize=settings.VERIFIED_TOKEN_CACHE_SIZE, ttl=settings.VERIFIED_TOKEN_CACHE_TTL_SECONDS
+)
+
+
+async def verify_token(token: str) -> dict:
+    """Verify a Supabase JWT token and return the payload.
+
+    The payload is the caller's own copy; the cached original is never handed out.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = _verified_tokens.get(digest)
+    if payload is not None:
+        return copy.deepcopy(payload)
 
-def verify_token(token: str) -> dict:
-    """Verify a Supabase JWT token and return the payload."""
     try:
-        signing_key = jwks_client.get_signing_key_from_jwt(token)
+        kid = jwt.get_unverified_header(token).get("kid")
+        signing_key = await jwks_manager.get_signing_key(kid)
+        if signing_key is None:
+            raise jwt.InvalidTokenError("Unknown signing key")
         payload = jwt.decode(
             token,
             signing_key.key,
             algorithms=["ES256"],
             audience="authenticated",
         )
-        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -27,3 +162,7 @@ def verify_token(token: str) -> dict:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token",
         ) from None
+
+    if "exp" in payload:
+        _verified_tokens.set(digest, payload, ttl=payload["exp"] - time.time())
+    return copy.deepcopy(payload)
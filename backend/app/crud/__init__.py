@@ -1 +1,14 @@
-from app.crud import cost, provider, user  # noqa: F401
+from app.crud import (  # noqa: F401
+    alert,
+    alert_evaluation,
+    cost,
+    cost_aggregate,
+    cost_export,
+    cost_forecast,
+    cost_partition,
+    cost_rollup,
+    notification,
+    provider,
+    sync_job,
+    user,
+)
@@ -0,0 +1,62 @@
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.alert import Alert, AlertEvent, AlertState
+from app.schemas.alert import AlertCreate, AlertUpdate
+
+# Changing any of these invalidates the running totals and fired crossings of an alert.
+# Disabled alerts miss their deltas, so re-enabling one re-seeds it too.
+_SCOPE_FIELDS = {"service", "threshold", "period", "enabled"}
+
+
+async def get(db: AsyncSession, alert_id: uuid.UUID) -> Alert | None:
+    return await db.get(Alert, alert_id)
+
+
+async def get_by_user(db: AsyncSession, user_id: uuid.UUID) -> list[Alert]:
+    stmt = select(Alert).where(Alert.user_id == user_id).order_by(Alert.created_at.desc())
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
+
+
+async def create(db: AsyncSession, user_id: uuid.UUID, alert_in: AlertCreate) -> Alert:
+    alert = Alert(user_id=user_id, **alert_in.model_dump())
+    db.add(alert)
+    await db.commit()
+    await db.refresh(alert)
+    return alert
+
+
+async def update(db: AsyncSession, alert: Alert, alert_in: AlertUpdate) -> Alert:
+    update_data = alert_in.model_dump(exclude_unset=True)
+    changed = {field for field, value in update_data.items() if getattr(alert, field) != value}
+
+    for field, value in update_data.items():
+        setattr(alert, field, value)
+
+    if changed & _SCOPE_FIELDS:
+        # Totals are re-seeded from the rollups on the next change in scope
+        await db.execute(AlertState.__table__.delete().where(AlertState.alert_id == alert.id))
+    await db.commit()
+    await db.refresh(alert)
+    return alert
+
+
+async def delete(db: AsyncSession, alert: Alert) -> None:
+    await db.delete(alert)
+    await db.commit()
+
+
+async def get_events(
+    db: AsyncSession, alert_id: uuid.UUID, *, limit: int = 100
+) -> list[AlertEvent]:
+    stmt = (
+        select(AlertEvent)
+        .where(AlertEvent.alert_id == alert_id)
+        .order_by(AlertEvent.created_at.desc())
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return list(result.scalars().all())
@@ -0,0 +1,188 @@
+"""Incremental alert evaluation, driven by the cost deltas that update the rollups.
+
+Every alert keeps a running total per UTC day or month in `alert_states`. Writes of cost
+records hand their per-day deltas to `apply_changes` in the same transaction as the
+rollup update. The alerts of all touched providers are loaded in one query and indexed
+by provider, each delta is folded into the totals of the alerts it falls under, and
+alerts whose total reaches the threshold fire once per period, queueing a notification
+in the outbox. Nothing is re-summed: a state row is seeded from the daily rollups only
+the first time its period is touched, so alerts created mid-period start from the
+actual spend.
+"""
+
+import uuid
+from collections import defaultdict
+from collections.abc import Mapping
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import Row, and_, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.alert import Alert, AlertPeriod
+from app.models.provider import Provider
+
+# Seeds totals for (alert, period) pairs seen for the first time. The daily rollups
+# already include the deltas being applied, so seeded pairs are left out of _ADD.
+_SEED = """
+    INSERT INTO alert_states AS s (alert_id, period_start, total)
+    SELECT t.alert_id, t.period_start, coalesce(sum(r.amount), 0)
+    FROM unnest(
+        CAST(:alert_ids AS uuid[]),
+        CAST(:period_starts AS date[]),
+        CAST(:period_ends AS date[])
+    ) AS t(alert_id, period_start, period_end)
+    JOIN alerts a ON a.id = t.alert_id
+    JOIN providers p ON p.user_id = a.user_id AND (a.provider_id IS NULL OR p.id = a.provider_id)
+    LEFT JOIN cost_rollups_daily r ON r.provider_id = p.id
+        AND r.day >= t.period_start
+        AND r.day < t.period_end
+        AND (a.service IS NULL OR r.service = a.service)
+    GROUP BY t.alert_id, t.period_start
+    ON CONFLICT (alert_id, period_start) DO NOTHING
+    RETURNING alert_id, period_start
+"""
+
+_ADD = """
+    UPDATE alert_states AS s
+    SET total = s.total + t.delta, updated_at = now()
+    FROM unnest(
+        CAST(:alert_ids AS uuid[]),
+        CAST(:period_starts AS date[]),
+        CAST(:deltas AS numeric[])
+    ) AS t(alert_id, period_start, delta)
+    WHERE s.alert_id = t.alert_id AND s.period_start = t.period_start
+"""
+
+# The fired_at guard makes each crossing fire once, even across concurrent syncs. The
+# notification for each event goes into the outbox in the same statement; it is sent
+# later by the notification dispatcher, never from the ingest path.
+_FIRE = """
+    WITH fired AS (
+        UPDATE alert_states AS s
+        SET fired_at = now()
+        FROM unnest(CAST(:alert_ids AS uuid[]), CAST(:period_starts AS date[]))
+            AS t(alert_id, period_start),
+            alerts a
+        WHERE s.alert_id = t.alert_id
+            AND s.period_start = t.period_start
+            AND a.id = s.alert_id
+            AND s.fired_at IS NULL
+            AND s.total >= a.threshold
+        RETURNING s.alert_id, s.period_start, s.total, a.threshold
+    ),
+    events AS (
+        INSERT INTO alert_events (id, alert_id, period_start, total, threshold)
+        SELECT gen_random_uuid(), alert_id, period_start, total, threshold FROM fired
+        RETURNING id, alert_id, period_start, total, threshold, created_at
+    ),
+    outbox AS (
+        INSERT INTO notifications (id, alert_event_id, notification_type, destination, payload)
+        SELECT
+            gen_random_uuid(),
+            e.id,
+            a.notification_type,
+            a.destination,
+            jsonb_build_object(
+                'event_id', e.id,
+                'alert_id', a.id,
+                'alert_name', a.name,
+                'provider_id', a.provider_id,
+                'service', a.service,
+                'period', lower(a.period::text),
+                'period_start', e.period_start,
+                'total', e.total,
+                'threshold', e.threshold,
+                'currency', a.currency,
+                'fired_at', e.created_at
+            )
+        FROM events e
+        JOIN alerts a ON a.id = e.alert_id
+    )
+    SELECT id, alert_id, period_start, total, threshold FROM events
+"""
+
+
+def period_bounds(period: AlertPeriod, day: date) -> tuple[date, date]:
+    """The UTC day or month containing `day`, as [start, end)."""
+    if period == AlertPeriod.DAY:
+        return day, day + timedelta(days=1)
+    start = day.replace(day=1)
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+
+async def apply_changes(
+    db: AsyncSession, changes: Mapping[tuple[uuid.UUID, str, date], Decimal]
+) -> list[Row]:
+    """Fold (provider_id, service, UTC day) -> amount deltas into alert totals.
+
+    Only periods that have not ended yet are tracked, so backfilling history never
+    fires alerts for past periods. Returns the alert events that fired. The caller
+    commits.
+    """
+    changes = {key: amount for key, amount in changes.items() if amount}
+    if not changes:
+        return []
+
+    provider_ids = {provider_id for provider_id, _, _ in changes}
+    result = await db.execute(
+        select(Provider.id, Alert.id, Alert.service, Alert.period)
+        .join(
+            Alert,
+            and_(
+                Alert.user_id == Provider.user_id,
+                or_(Alert.provider_id.is_(None), Alert.provider_id == Provider.id),
+            ),
+        )
+        .where(Provider.id.in_(provider_ids), Alert.enabled)
+    )
+    alerts_by_provider: dict[uuid.UUID, list[tuple[uuid.UUID, str | None, AlertPeriod]]] = (
+        defaultdict(list)
+    )
+    for provider_id, alert_id, service, period in result:
+        alerts_by_provider[provider_id].append((alert_id, service, period))
+    if not alerts_by_provider:
+        return []
+
+    today = datetime.now(UTC).date()
+    deltas: dict[tuple[uuid.UUID, date], Decimal] = defaultdict(Decimal)
+    period_ends: dict[tuple[uuid.UUID, date], date] = {}
+    for (provider_id, service, day), amount in changes.items():
+        for alert_id, alert_service, period in alerts_by_provider.get(provider_id, ()):
+            if alert_service is not None and alert_service != service:
+                continue
+            start, end = period_bounds(period, day)
+            if end <= today:
+                continue
+            deltas[(alert_id, start)] += amount
+            period_ends[(alert_id, start)] = end
+    if not deltas:
+        return []
+
+    # Key order keeps concurrent writers from deadlocking on the same state rows
+    keys = sorted(deltas)
+    seeded = await db.execute(
+        text(_SEED),
+        {
+            "alert_ids": [key[0] for key in keys],
+            "period_starts": [key[1] for key in keys],
+            "period_ends": [period_ends[key] for key in keys],
+        },
+    )
+    seeded_keys = {(row.alert_id, row.period_start) for row in seeded}
+    existing = [key for key in keys if key not in seeded_keys]
+    if existing:
+        await db.execute(
+            text(_ADD),
+            {
+                "alert_ids": [key[0] for key in existing],
+                "period_starts": [key[1] for key in existing],
+                "deltas": [deltas[key] for key in existing],
+            },
+        )
+
+    fired = await db.execute(
+        text(_FIRE),
+        {"alert_ids": [key[0] for key in keys], "period_starts": [key[1] for key in keys]},
+    )
+    return list(fired.all())
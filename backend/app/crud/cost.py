@@ -1,22 +1,125 @@
+import hashlib
 import uuid
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable
 
-from sqlalchemy import select
+from psycopg.types.json import Jsonb
+from sqlalchemy import Row, Select, insert, select, text, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.crud import cost_rollup
 from app.models.provider import CostRecord, Provider
-from app.schemas.cost import CostFilters, CostRecordCreate
+from app.schemas.cost import (
+    CostCursor,
+    CostFilters,
+    CostRecordCreate,
+    CostUpsertResult,
+    encode_metadata,
+)
 
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# Rows fetched per round trip when streaming from a server-side cursor
+STREAM_BATCH_SIZE = 1000
+# The fields of CostRecordResponse. Listings select these columns rather than entities,
+# which skips building ORM objects for rows that are only serialized.
+RESPONSE_COLUMNS = (
+    CostRecord.amount,
+    CostRecord.currency,
+    CostRecord.service,
+    CostRecord.period_start,
+    CostRecord.period_end,
+    CostRecord.metadata_json,
+    CostRecord.id,
+    CostRecord.provider_id,
+    CostRecord.created_at,
+)
 
-async def get_by_user(
-    db: AsyncSession,
+_COPY_COST_RECORDS = (
+    "COPY cost_records "
+    "(id, provider_id, amount, currency, service, period_start, period_end, metadata_json, "
+    "content_hash) FROM STDIN"
+)
+
+# Rows whose content hash is unchanged match the ON CONFLICT clause but are not written.
+# `previous` reads the pre-statement snapshot, which gives the rollup deltas.
+_UPSERT_COST_RECORDS = """
+    WITH input AS (
+        SELECT * FROM unnest(
+            CAST(:provider_ids AS uuid[]),
+            CAST(:services AS varchar[]),
+            CAST(:period_starts AS timestamptz[]),
+            CAST(:period_ends AS timestamptz[]),
+            CAST(:amounts AS numeric[]),
+            CAST(:currencies AS varchar[]),
+            CAST(:metadata AS jsonb[]),
+            CAST(:hashes AS bytea[])
+        ) AS t(
+            provider_id, service, period_start, period_end, amount, currency, metadata_json,
+            content_hash
+        )
+    ),
+    previous AS (
+        SELECT c.provider_id, c.service, c.period_start, c.period_end, c.amount
+        FROM cost_records c
+        JOIN input i USING (provider_id, service, period_start, period_end)
+    ),
+    written AS (
+        INSERT INTO cost_records AS c (
+            id, provider_id, service, period_start, period_end, amount, currency, metadata_json,
+            content_hash
+        )
+        SELECT gen_random_uuid(), provider_id, service, period_start, period_end, amount,
+            currency, metadata_json, content_hash
+        FROM input
+        ON CONFLICT (provider_id, service, period_start, period_end) DO UPDATE
+        SET amount = excluded.amount,
+            currency = excluded.currency,
+            metadata_json = excluded.metadata_json,
+            content_hash = excluded.content_hash
+        WHERE c.content_hash IS DISTINCT FROM excluded.content_hash
+        RETURNING c.provider_id, c.service, c.period_start, c.period_end, c.amount
+    )
+    SELECT w.provider_id, w.service, w.period_start, w.amount, p.amount AS previous_amount
+    FROM written w
+    LEFT JOIN previous p USING (provider_id, service, period_start, period_end)
+"""
+
+
+def content_hash(cost: CostRecordCreate) -> bytes:
+    """Digest of the fields a re-sync may change for an existing natural key."""
+    digest = hashlib.blake2b(digest_size=16)
+    # Normalized, so 1.5 and 1.50 hash alike just as they compare equal in Postgres
+    digest.update(f"{cost.amount.normalize():f}".encode())
+    digest.update(b"\x00")
+    digest.update(cost.currency.encode())
+    digest.update(b"\x00")
+    if cost.metadata_json is None:
+        digest.update(b"\x00")
+    else:
+        digest.update(b"\x01")
+        digest.update(encode_metadata(cost.metadata_json))
+    return digest.digest()
+
+
+def _jsonb(metadata: dict | None) -> Jsonb | None:
+    # Raw driver parameters are not adapted by the JSONB column type
+    return None if metadata is None else Jsonb(metadata)
+
+
+def by_user_stmt(
     user_id: uuid.UUID,
     filters: CostFilters | None = None,
-) -> list[CostRecord]:
+    cursor: CostCursor | None = None,
+    *,
+    columns: Iterable = RESPONSE_COLUMNS,
+) -> Select:
+    """Select `columns` of the user's cost records, newest first. Provider is joined in."""
     stmt = (
-        select(CostRecord)
+        select(*columns)
         .join(Provider)
         .where(Provider.user_id == user_id)
-        .order_by(CostRecord.period_start.desc())
+        .order_by(CostRecord.period_start.desc(), CostRecord.id.desc())
     )
 
     if filters:
@@ -27,24 +130,217 @@ async def get_by_user(
         if filters.start_date:
             stmt = stmt.where(CostRecord.period_start >= filters.start_date)
         if filters.end_date:
-            stmt = stmt.where(CostRecord.period_end <= filters.end_date)
+            # The period_start bound is implied; it lets Postgres skip later partitions
+            stmt = stmt.where(
+                CostRecord.period_end <= filters.end_date,
+                CostRecord.period_start < filters.end_date,
+            )
 
+    if cursor:
+        stmt = stmt.where(
+            tuple_(CostRecord.period_start, CostRecord.id) < (cursor.period_start, cursor.id),
+            # Implied by the row comparison, but only a plain bound prunes partitions
+            CostRecord.period_start <= cursor.period_start,
+        )
+
+    return stmt
+
+
+async def get_by_user(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    filters: CostFilters | None = None,
+    *,
+    limit: int | None = None,
+    cursor: CostCursor | None = None,
+) -> list[Row]:
+    """Cost record rows with the RESPONSE_COLUMNS, newest first."""
+    stmt = by_user_stmt(user_id, filters, cursor)
+    if limit is not None:
+        stmt = stmt.limit(limit)
     result = await db.execute(stmt)
-    return list(result.scalars().all())
+    return list(result.all())
+
+
+async def get_page(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    filters: CostFilters | None = None,
+    *,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: CostCursor | None = None,
+) -> tuple[list[Row], CostCursor | None]:
+    """Return one page of cost record rows and the cursor for the next page, if any."""
+    limit = min(limit, MAX_PAGE_SIZE)
+    # Fetch one extra row to learn whether another page exists without a COUNT
+    records = await get_by_user(db, user_id, filters, limit=limit + 1, cursor=cursor)
+    if len(records) <= limit:
+        return records, None
+    records = records[:limit]
+    last = records[-1]
+    return records, CostCursor(period_start=last.period_start, id=last.id)
+
+
+async def stream_by_user(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    filters: CostFilters | None = None,
+    *,
+    cursor: CostCursor | None = None,
+) -> AsyncIterator[Row]:
+    """Yield cost record rows from a server-side cursor, STREAM_BATCH_SIZE rows at a time."""
+    stmt = by_user_stmt(user_id, filters, cursor).execution_options(yield_per=STREAM_BATCH_SIZE)
+    result = await db.stream(stmt)
+    async for row in result:
+        yield row
 
 
 async def create(db: AsyncSession, cost_in: CostRecordCreate) -> CostRecord:
-    cost = CostRecord(**cost_in.model_dump())
+    cost = CostRecord(**cost_in.model_dump(), content_hash=content_hash(cost_in))
     db.add(cost)
+    await cost_rollup.apply(db, [cost])
     await db.commit()
     await db.refresh(cost)
     return cost
 
 
 async def create_many(db: AsyncSession, costs: list[CostRecordCreate]) -> list[CostRecord]:
-    records = [CostRecord(**cost.model_dump()) for cost in costs]
-    db.add_all(records)
+    if not costs:
+        return []
+    # One multi-row INSERT ... RETURNING per batch instead of a refresh per record
+    result = await db.scalars(
+        insert(CostRecord).returning(CostRecord),
+        [{**cost.model_dump(), "content_hash": content_hash(cost)} for cost in costs],
+    )
+    records = list(result.all())
+    await cost_rollup.apply(db, costs)
     await db.commit()
-    for record in records:
-        await db.refresh(record)
     return records
+
+
+async def _batches(
+    costs: Iterable[CostRecordCreate] | AsyncIterable[CostRecordCreate], size: int
+) -> AsyncIterator[list[CostRecordCreate]]:
+    batch: list[CostRecordCreate] = []
+    if isinstance(costs, AsyncIterable):
+        async for cost in costs:
+            batch.append(cost)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    else:
+        for cost in costs:
+            batch.append(cost)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+async def ingest(
+    db: AsyncSession,
+    costs: Iterable[CostRecordCreate] | AsyncIterable[CostRecordCreate],
+    *,
+    batch_size: int | None = None,
+) -> list[uuid.UUID]:
+    """Bulk-load new cost records through COPY FROM STDIN and return their ids.
+
+    Records are consumed lazily in batches of `batch_size` and each batch is committed
+    with its rollup update, so lock hold times stay flat however long the input is. Ids
+    are generated client-side and nothing is read back. If a batch fails, the batches
+    before it stay committed and the error is raised; their records can be found by
+    their natural keys. COPY fails on an existing natural key, so re-synced periods go
+    through `upsert_many` instead.
+    """
+    batch_size = batch_size or settings.COST_INGEST_BATCH_SIZE
+    ids: list[uuid.UUID] = []
+    async for batch in _batches(costs, batch_size):
+        batch_ids = [uuid.uuid4() for _ in batch]
+        # The connection may change after a commit, so fetch it per batch
+        conn = await db.connection()
+        raw = await conn.get_raw_connection()
+        async with raw.driver_connection.cursor() as cursor:
+            async with cursor.copy(_COPY_COST_RECORDS) as copy:
+                for record_id, cost in zip(batch_ids, batch, strict=True):
+                    await copy.write_row(
+                        (
+                            record_id,
+                            cost.provider_id,
+                            cost.amount,
+                            cost.currency,
+                            cost.service,
+                            cost.period_start,
+                            cost.period_end,
+                            _jsonb(cost.metadata_json),
+                            content_hash(cost),
+                        )
+                    )
+        await cost_rollup.apply(db, batch)
+        await db.commit()
+        ids.extend(batch_ids)
+    return ids
+
+
+async def upsert_many(
+    db: AsyncSession,
+    costs: Iterable[CostRecordCreate] | AsyncIterable[CostRecordCreate],
+    *,
+    batch_size: int | None = None,
+    outcome: CostUpsertResult | None = None,
+    before_batch: Callable[[], Awaitable[object]] | None = None,
+) -> CostUpsertResult:
+    """Insert or update cost records by natural key, skipping rows that did not change.
+
+    Each batch is a single INSERT ... ON CONFLICT DO UPDATE statement, committed with its
+    rollup update, so no transaction stays open while the input is produced. Rows whose
+    amount and metadata hash to the stored content hash are left untouched, so re-syncing
+    an overlapping window only writes what changed. `before_batch` is awaited first in
+    every batch's transaction; raising there rolls the batch back. Counts are added to
+    `outcome` after every batch when one is passed, so callers can report progress while
+    a long upsert runs.
+    """
+    batch_size = batch_size or settings.COST_INGEST_BATCH_SIZE
+    outcome = outcome if outcome is not None else CostUpsertResult()
+    async for batch in _batches(costs, batch_size):
+        if before_batch is not None:
+            await before_batch()
+        # ON CONFLICT cannot touch the same row twice in one statement; the last one wins
+        unique = {
+            (cost.provider_id, cost.service, cost.period_start, cost.period_end): cost
+            for cost in batch
+        }
+        rows = list(unique.values())
+        result = await db.execute(
+            text(_UPSERT_COST_RECORDS),
+            {
+                "provider_ids": [cost.provider_id for cost in rows],
+                "services": [cost.service for cost in rows],
+                "period_starts": [cost.period_start for cost in rows],
+                "period_ends": [cost.period_end for cost in rows],
+                "amounts": [cost.amount for cost in rows],
+                "currencies": [cost.currency for cost in rows],
+                "metadata": [_jsonb(cost.metadata_json) for cost in rows],
+                "hashes": [content_hash(cost) for cost in rows],
+            },
+        )
+        written = result.all()
+        await cost_rollup.apply_changes(
+            db,
+            (
+                (
+                    row.provider_id,
+                    row.service,
+                    row.period_start,
+                    row.amount - (row.previous_amount or 0),
+                    1 if row.previous_amount is None else 0,
+                )
+                for row in written
+            ),
+        )
+        await db.commit()
+        inserted = sum(1 for row in written if row.previous_amount is None)
+        outcome.inserted += inserted
+        outcome.updated += len(written) - inserted
+        outcome.unchanged += len(rows) - len(written)
+    return outcome
@@ -0,0 +1,292 @@
+"""SQL-side aggregation of cost records for dashboard widgets.
+
+Every query sums over the current window and the equally long window before it in a
+single pass (`SUM(...) FILTER (WHERE ...)`), so only the aggregate rows leave Postgres.
+Whole UTC days and months are read from the rollup tables; raw cost records are only
+scanned for the partial days at the edges of a window.
+"""
+
+import uuid
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from sqlalchemy import (
+    ColumnElement,
+    DateTime,
+    Subquery,
+    cast,
+    desc,
+    false,
+    func,
+    literal,
+    select,
+    union_all,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.cost_rollup import CostDailyRollup, CostMonthlyRollup
+from app.models.provider import CostRecord, Provider
+from app.schemas.cost import (
+    CostByProvider,
+    CostByService,
+    CostFilters,
+    CostGranularity,
+    CostPeriod,
+    CostSummary,
+    CostTimelinePoint,
+)
+
+
+def resolve_period(
+    timezone: str,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+) -> CostPeriod:
+    """Build the aggregation window, defaulting to month-to-date in the user's timezone.
+
+    Raises ValueError when the window is empty or ends before it starts.
+    """
+    try:
+        tz = ZoneInfo(timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        timezone, tz = "UTC", ZoneInfo("UTC")
+
+    # Naive bounds are read as wall-clock times in the user's timezone
+    if start_date and start_date.tzinfo is None:
+        start_date = start_date.replace(tzinfo=tz)
+    if end_date and end_date.tzinfo is None:
+        end_date = end_date.replace(tzinfo=tz)
+
+    end = end_date or datetime.now(tz)
+    start = start_date or end.astimezone(tz).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0
+    )
+    if start >= end:
+        raise ValueError("start_date must be before end_date")
+    return CostPeriod(start=start, end=end, previous_start=start - (end - start), timezone=timezone)
+
+
+def _ceil_day(value: datetime) -> datetime:
+    day = value.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    return day if day == value else day + timedelta(days=1)
+
+
+def _floor_day(value: datetime) -> datetime:
+    return value.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _ceil_month(value: datetime) -> datetime:
+    month = _floor_month(value)
+    if month == value:
+        return month
+    return month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+
+
+def _floor_month(value: datetime) -> datetime:
+    return _floor_day(value).replace(day=1)
+
+
+def _segments(
+    start: datetime, end: datetime, *, months: bool
+) -> list[tuple[str, datetime, datetime]]:
+    """Split [start, end) into raw edges, whole UTC days and (optionally) whole UTC months."""
+    first_day, last_day = _ceil_day(start), _floor_day(end)
+    if first_day >= last_day:
+        return [("raw", start, end)] if start < end else []
+
+    segments = []
+    if start < first_day:
+        segments.append(("raw", start, first_day))
+    first_month, last_month = _ceil_month(first_day), _floor_month(last_day)
+    if months and first_month < last_month:
+        if first_day < first_month:
+            segments.append(("day", first_day, first_month))
+        segments.append(("month", first_month, last_month))
+        if last_month < last_day:
+            segments.append(("day", last_month, last_day))
+    else:
+        segments.append(("day", first_day, last_day))
+    if last_day < end:
+        segments.append(("raw", last_day, end))
+    return segments
+
+
+def _source(
+    user_id: uuid.UUID,
+    filters: CostFilters | None,
+    ranges: list[tuple[datetime, datetime]],
+    *,
+    rollups: bool = True,
+    months: bool = True,
+) -> Subquery:
+    """Cost rows for the ranges, read from rollups where they cover whole days or months.
+
+    Columns: provider_id, service, period_start, amount, record_count.
+    """
+    providers = select(Provider.id).where(Provider.user_id == user_id)
+    if filters:
+        if filters.provider_id:
+            providers = providers.where(Provider.id == filters.provider_id)
+        if filters.provider_type:
+            providers = providers.where(Provider.type == filters.provider_type)
+
+    parts = []
+    for start, end in ranges:
+        segments = _segments(start, end, months=months) if rollups else [("raw", start, end)]
+        for kind, seg_start, seg_end in segments:
+            if kind == "raw":
+                part = select(
+                    CostRecord.provider_id,
+                    CostRecord.service,
+                    CostRecord.period_start,
+                    CostRecord.amount,
+                    literal(1).label("record_count"),
+                ).where(
+                    CostRecord.provider_id.in_(providers),
+                    CostRecord.period_start >= seg_start,
+                    CostRecord.period_start < seg_end,
+                )
+            else:
+                model, bucket = (
+                    (CostDailyRollup, CostDailyRollup.day)
+                    if kind == "day"
+                    else (CostMonthlyRollup, CostMonthlyRollup.month)
+                )
+                part = select(
+                    model.provider_id,
+                    model.service,
+                    func.timezone("UTC", cast(bucket, DateTime)).label("period_start"),
+                    model.amount,
+                    model.record_count,
+                ).where(
+                    model.provider_id.in_(providers),
+                    bucket >= seg_start.date(),
+                    bucket < seg_end.date(),
+                )
+            parts.append(part)
+
+    if not parts:
+        # Empty window: keep the column shape with no rows
+        parts.append(
+            select(
+                CostRecord.provider_id,
+                CostRecord.service,
+                CostRecord.period_start,
+                CostRecord.amount,
+                literal(1).label("record_count"),
+            ).where(false())
+        )
+    return union_all(*parts).subquery("costs")
+
+
+def _comparison_ranges(period: CostPeriod) -> list[tuple[datetime, datetime]]:
+    return [(period.previous_start, period.start), (period.start, period.end)]
+
+
+def _totals(
+    costs: Subquery, period: CostPeriod
+) -> tuple[ColumnElement[Decimal], ColumnElement[Decimal]]:
+    in_current = costs.c.period_start >= period.start
+    total = func.coalesce(func.sum(costs.c.amount).filter(in_current), 0)
+    previous_total = func.coalesce(func.sum(costs.c.amount).filter(~in_current), 0)
+    return total.label("total"), previous_total.label("previous_total")
+
+
+def _delta(total: Decimal, previous_total: Decimal) -> dict:
+    change = total - previous_total
+    return {
+        "total": total,
+        "previous_total": previous_total,
+        "change": change,
+        "change_percent": float(change / previous_total * 100) if previous_total else None,
+    }
+
+
+async def get_summary(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    period: CostPeriod,
+    filters: CostFilters | None = None,
+) -> CostSummary:
+    costs = _source(user_id, filters, _comparison_ranges(period))
+    total, previous_total = _totals(costs, period)
+    record_count = func.coalesce(
+        func.sum(costs.c.record_count).filter(costs.c.period_start >= period.start), 0
+    ).label("record_count")
+    row = (await db.execute(select(total, previous_total, record_count))).one()
+    return CostSummary(
+        period=period, record_count=row.record_count, **_delta(row.total, row.previous_total)
+    )
+
+
+async def get_by_provider(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    period: CostPeriod,
+    filters: CostFilters | None = None,
+) -> list[CostByProvider]:
+    costs = _source(user_id, filters, _comparison_ranges(period))
+    total, previous_total = _totals(costs, period)
+    stmt = (
+        select(Provider.id, Provider.name, Provider.type, total, previous_total)
+        .join(costs, costs.c.provider_id == Provider.id)
+        .group_by(Provider.id, Provider.name, Provider.type)
+        .order_by(desc("total"))
+    )
+    result = await db.execute(stmt)
+    return [
+        CostByProvider(
+            provider_id=row.id,
+            provider_name=row.name,
+            provider_type=row.type,
+            **_delta(row.total, row.previous_total),
+        )
+        for row in result
+    ]
+
+
+async def get_by_service(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    period: CostPeriod,
+    filters: CostFilters | None = None,
+) -> list[CostByService]:
+    costs = _source(user_id, filters, _comparison_ranges(period))
+    total, previous_total = _totals(costs, period)
+    stmt = (
+        select(costs.c.service, total, previous_total)
+        .group_by(costs.c.service)
+        .order_by(desc("total"))
+    )
+    result = await db.execute(stmt)
+    return [
+        CostByService(service=row.service, **_delta(row.total, row.previous_total))
+        for row in result
+    ]
+
+
+async def get_timeline(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    period: CostPeriod,
+    filters: CostFilters | None = None,
+    granularity: CostGranularity = CostGranularity.DAY,
+) -> list[CostTimelinePoint]:
+    # Rollups are bucketed by UTC day and month, so they only line up with UTC buckets
+    costs = _source(
+        user_id,
+        filters,
+        [(period.start, period.end)],
+        rollups=period.timezone == "UTC",
+        months=granularity == CostGranularity.MONTH,
+    )
+    # Three-argument date_trunc truncates in the given zone and returns a timestamptz
+    bucket = func.date_trunc(granularity.value, costs.c.period_start, period.timezone)
+    stmt = (
+        select(bucket.label("bucket"), func.sum(costs.c.amount).label("total"))
+        .group_by("bucket")
+        .order_by("bucket")
+    )
+    result = await db.execute(stmt)
+    return [CostTimelinePoint(bucket=row.bucket, total=row.total) for row in result]
@@ -0,0 +1,148 @@
+"""Bulk export of cost records as CSV, Parquet or Arrow IPC.
+
+Every format reads `COPY (...) TO STDOUT` in CSV. Postgres sends each row in its own
+message, so the stream is cut into chunks on row boundaries without parsing it. CSV
+chunks go out as they are; for Parquet and Arrow each chunk is parsed by pyarrow's CSV
+reader into one record batch and encoded straight away. Memory stays at about one chunk
+however many rows match, and no per-row work happens in Python.
+"""
+
+import io
+import uuid
+from collections.abc import AsyncIterator
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+from sqlalchemy import String, cast, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud.cost import by_user_stmt
+from app.models.provider import CostRecord, Provider
+from app.schemas.cost import CostFilters
+
+EXPORT_COLUMNS = (
+    CostRecord.period_start,
+    CostRecord.period_end,
+    CostRecord.provider_id,
+    Provider.name.label("provider_name"),
+    # Stored as the enum name; the API spells provider types in lower case
+    func.lower(cast(Provider.type, String)).label("provider_type"),
+    CostRecord.service,
+    CostRecord.amount,
+    CostRecord.currency,
+    CostRecord.id,
+)
+
+EXPORT_SCHEMA = pa.schema(
+    [
+        ("period_start", pa.timestamp("us", tz="UTC")),
+        ("period_end", pa.timestamp("us", tz="UTC")),
+        ("provider_id", pa.string()),
+        ("provider_name", pa.string()),
+        ("provider_type", pa.string()),
+        ("service", pa.string()),
+        ("amount", pa.decimal128(18, 6)),
+        ("currency", pa.string()),
+        ("id", pa.string()),
+    ]
+)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands out what was written since the last `drain`.
+
+    `tell` keeps counting across drains, since Parquet records file offsets in its footer.
+    """
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _copy_chunks(
+    db: AsyncSession, user_id: uuid.UUID, filters: CostFilters | None, *, header: bool
+) -> AsyncIterator[bytes]:
+    conn = await db.connection()
+    stmt = by_user_stmt(user_id, filters, columns=EXPORT_COLUMNS)
+    # COPY takes no bind parameters. The filters are typed values (UUIDs, an enum and
+    # datetimes) rendered by SQLAlchemy, never free text.
+    query = stmt.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    raw = await conn.get_raw_connection()
+    async with raw.driver_connection.cursor() as cursor:
+        # Timestamps are written in the session time zone
+        await cursor.execute("SET LOCAL TIME ZONE 'UTC'")
+        options = "FORMAT csv, HEADER" if header else "FORMAT csv"
+        async with cursor.copy(f"COPY ({query}) TO STDOUT ({options})") as copy:
+            rows: list[bytes] = []
+            size = 0
+            async for row in copy:
+                rows.append(bytes(row))
+                size += len(row)
+                if size >= settings.COST_EXPORT_CHUNK_BYTES:
+                    yield b"".join(rows)
+                    rows, size = [], 0
+            if rows:
+                yield b"".join(rows)
+
+
+async def stream_csv(
+    db: AsyncSession, user_id: uuid.UUID, filters: CostFilters | None = None
+) -> AsyncIterator[bytes]:
+    """Yield the user's cost records as CSV with a header row."""
+    async for chunk in _copy_chunks(db, user_id, filters, header=True):
+        yield chunk
+
+
+async def stream_arrow(
+    db: AsyncSession,
+    user_id: uuid.UUID,
+    filters: CostFilters | None = None,
+    *,
+    parquet: bool = False,
+) -> AsyncIterator[bytes]:
+    """Yield the user's cost records as an Arrow IPC stream, or as Parquet if `parquet`."""
+    read_options = pa_csv.ReadOptions(column_names=EXPORT_SCHEMA.names)
+    # Quoted values may span lines, since service and provider names are free text
+    parse_options = pa_csv.ParseOptions(newlines_in_values=True)
+    convert_options = pa_csv.ConvertOptions(
+        column_types=dict(zip(EXPORT_SCHEMA.names, EXPORT_SCHEMA.types, strict=True)),
+        strings_can_be_null=False,
+    )
+
+    sink = _ChunkSink()
+    if parquet:
+        writer = pq.ParquetWriter(sink, EXPORT_SCHEMA, compression="zstd")
+    else:
+        writer = pa.ipc.new_stream(sink, EXPORT_SCHEMA)
+    try:
+        async for chunk in _copy_chunks(db, user_id, filters, header=False):
+            table = pa_csv.read_csv(
+                pa.BufferReader(chunk),
+                read_options=read_options,
+                parse_options=parse_options,
+                convert_options=convert_options,
+            )
+            writer.write_table(table)
+            yield sink.drain()
+    finally:
+        writer.close()
+    # Parquet footer or Arrow end-of-stream marker
+    yield sink.drain()
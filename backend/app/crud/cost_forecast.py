@@ -0,0 +1,241 @@
+"""Month-end spend projections and anomaly flags per provider and service.
+
+One query reads the user's daily rollups for the last FORECAST_HISTORY_DAYS days and the
+current month as one packed array per (provider, service) series. The arrays are scattered
+into a series x day matrix and every statistic is computed with NumPy across all series
+at once:
+
+- trailing 7 and 28 day averages
+- weekday seasonality: each weekday's mean relative to the series' overall mean
+- a linear trend fitted to the deseasonalized history by least squares
+- a month-end projection: the actual month to date plus the seasonal trend for the
+  days left
+- anomaly flags for the latest complete day against the four weeks before it, by
+  median absolute deviation, falling back to a z-score for series too regular to have
+  a spread
+
+Days are UTC, as in the rollups. Results are cached per user and invalidated by the
+next sync or any other change to the user's providers.
+"""
+
+import uuid
+import warnings
+from datetime import UTC, date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import Float, Integer, cast, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.crud import provider as provider_crud
+from app.models.cost_rollup import CostDailyRollup
+from app.models.provider import Provider
+from app.schemas.cost import CostForecast, CostSeriesForecast
+
+# Eight weeks, so each weekday's seasonal factor averages eight samples
+FORECAST_HISTORY_DAYS = 56
+# Days before the latest complete one that its anomaly scores are measured against
+ANOMALY_BASELINE_DAYS = 28
+# Modified z-score (0.6745 * deviation / MAD) above which a day is flagged, after
+# Iglewicz and Hoaglin; the plain z-score threshold applies when the MAD is zero
+ANOMALY_MAD_THRESHOLD = 3.5
+ANOMALY_Z_THRESHOLD = 3.0
+# Smallest jump above the baseline median worth flagging, in currency units
+ANOMALY_MIN_AMOUNT = 1.0
+
+# (data version, UTC date, forecast) by user id
+_forecast_cache: TTLCache[uuid.UUID, tuple[str, date, CostForecast]] = TTLCache(
+    maxsize=settings.COST_FORECAST_CACHE_SIZE, ttl=settings.COST_FORECAST_CACHE_TTL_SECONDS
+)
+
+
+def _next_month(day: date) -> date:
+    """First day of the month after the one containing `day`."""
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+async def _load_series(
+    db: AsyncSession, user_id: uuid.UUID, start: date, end: date
+) -> tuple[list, np.ndarray]:
+    """The user's series over [start, end] as (provider id, name, type, service) keys and
+    a dense series x day matrix of amounts.
+    """
+    # Each series' day offsets and amounts arrive packed as big-endian int4 and float8
+    # bytes, which NumPy reads as is instead of psycopg parsing every array element.
+    # Both aggregates see the rows in the same order, so the two stay aligned.
+    packed = (
+        func.string_agg(func.int4send(cast(CostDailyRollup.day - start, Integer)), b""),
+        func.string_agg(func.float8send(cast(CostDailyRollup.amount, Float)), b""),
+    )
+    providers = select(Provider.id).where(Provider.user_id == user_id)
+    series = (
+        select(
+            CostDailyRollup.provider_id,
+            CostDailyRollup.service,
+            *(column.label(name) for column, name in zip(packed, ("days", "amounts"), strict=True)),
+        )
+        .where(
+            CostDailyRollup.provider_id.in_(providers),
+            CostDailyRollup.day >= start,
+            CostDailyRollup.day <= end,
+        )
+        .group_by(CostDailyRollup.provider_id, CostDailyRollup.service)
+        .subquery()
+    )
+    stmt = select(
+        series.c.provider_id,
+        Provider.name,
+        Provider.type,
+        series.c.service,
+        series.c.days,
+        series.c.amounts,
+    ).join(Provider, Provider.id == series.c.provider_id)
+    rows = (await db.execute(stmt)).all()
+
+    amounts = np.zeros((len(rows), (end - start).days + 1))
+    if rows:
+        days = np.frombuffer(b"".join(row.days for row in rows), dtype=">i4")
+        series = np.repeat(np.arange(len(rows)), [len(row.days) // 4 for row in rows])
+        amounts[series, days] = np.frombuffer(b"".join(row.amounts for row in rows), dtype=">f8")
+    return [row[:4] for row in rows], amounts
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray, default: float) -> np.ndarray:
+    return np.divide(
+        numerator,
+        denominator,
+        out=np.full(np.broadcast(numerator, denominator).shape, default),
+        where=denominator != 0,
+    )
+
+
+def forecast(amounts: np.ndarray, today: date) -> dict[str, np.ndarray]:
+    """Statistics for every row of a series x day matrix ending with `today`.
+
+    The matrix holds FORECAST_HISTORY_DAYS complete days before today, plus earlier days
+    of the current month when it started before that, plus today so far.
+    """
+    history = amounts[:, -FORECAST_HISTORY_DAYS - 1 : -1]
+    actual_today = amounts[:, -1]
+    month_start = today.replace(day=1)
+    month_to_date = amounts[:, amounts.shape[1] - 1 - (today - month_start).days :].sum(axis=1)
+
+    # Weekday seasonality: mean spend on each weekday relative to the overall mean
+    first_day = today - timedelta(days=FORECAST_HISTORY_DAYS)
+    weekdays = (first_day.weekday() + np.arange(FORECAST_HISTORY_DAYS)) % 7
+    onehot = np.eye(7)[weekdays]
+    level = history.mean(axis=1, keepdims=True)
+    seasonal = _ratio(history @ onehot / onehot.sum(axis=0), level, 1.0)
+    factors = seasonal[:, weekdays]
+
+    # Least-squares trend of the deseasonalized history. Days whose weekday never sees
+    # spend carry no information about the level and are left out of the fit.
+    weights = (factors > 0).astype(float)
+    deseasonalized = _ratio(history, factors, 0.0)
+    t = np.arange(FORECAST_HISTORY_DAYS, dtype=float)
+    n = np.maximum(weights.sum(axis=1), 1)
+    t_mean = (weights * t).sum(axis=1) / n
+    y_mean = (weights * deseasonalized).sum(axis=1) / n
+    t_dev = t - t_mean[:, None]
+    slope = _ratio(
+        (weights * t_dev * (deseasonalized - y_mean[:, None])).sum(axis=1),
+        (weights * t_dev**2).sum(axis=1),
+        0.0,
+    )
+    intercept = y_mean - slope * t_mean
+
+    # Today and the rest of the month, continuing the history's day numbering
+    days_left = (_next_month(today) - today).days
+    future_t = FORECAST_HISTORY_DAYS + np.arange(days_left)
+    future_weekdays = (today.weekday() + np.arange(days_left)) % 7
+    predicted = np.maximum(
+        (intercept[:, None] + slope[:, None] * future_t) * seasonal[:, future_weekdays], 0
+    )
+    # Today's spend so far is a floor for today's prediction
+    projected = (
+        month_to_date
+        - actual_today
+        + np.maximum(predicted[:, 0], actual_today)
+        + predicted[:, 1:].sum(axis=1)
+    )
+
+    # Anomaly scores of the latest complete day, deseasonalized, against the baseline days
+    # before it. A weekday that never sees spend has no scores.
+    latest = history[:, -1]
+    latest_level = _ratio(latest, factors[:, -1], np.nan)
+    baseline = np.where(
+        weights[:, -ANOMALY_BASELINE_DAYS - 1 : -1] > 0,
+        deseasonalized[:, -ANOMALY_BASELINE_DAYS - 1 : -1],
+        np.nan,
+    )
+    with warnings.catch_warnings():
+        # Series without a single usable baseline day give all-NaN slices
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(baseline, axis=1)
+        mad = np.nanmedian(np.abs(baseline - median[:, None]), axis=1)
+        mean = np.nanmean(baseline, axis=1)
+        std = np.nanstd(baseline, axis=1)
+    z_score = np.where(std > 0, (latest_level - mean) / np.where(std > 0, std, 1), np.nan)
+    mad_score = np.where(
+        mad > 0, 0.6745 * (latest_level - median) / np.where(mad > 0, mad, 1), np.nan
+    )
+    anomaly = np.where(
+        mad > 0, mad_score > ANOMALY_MAD_THRESHOLD, z_score > ANOMALY_Z_THRESHOLD
+    ) & (latest_level - np.nan_to_num(median) >= ANOMALY_MIN_AMOUNT)
+
+    return {
+        "month_to_date": month_to_date,
+        "projected_month_total": projected,
+        "trailing_7d_average": history[:, -7:].mean(axis=1),
+        "trailing_28d_average": history[:, -28:].mean(axis=1),
+        "trend_per_day": slope,
+        "latest_amount": latest,
+        "z_score": z_score,
+        "mad_score": mad_score,
+        "anomaly": anomaly,
+    }
+
+
+def _values(array: np.ndarray) -> list:
+    # Plain Python values for serializing; NaN (no score) becomes None
+    if array.dtype == bool:
+        return array.tolist()
+    return [None if value != value else value for value in np.round(array, 4).tolist()]
+
+
+async def get_forecast(db: AsyncSession, user_id: uuid.UUID) -> CostForecast:
+    """Projections and anomaly flags for all of the user's series, highest projection first.
+
+    Served from a per-process cache until the user's data version or the UTC date changes.
+    """
+    version = await provider_crud.get_data_version(db, user_id)
+    today = datetime.now(UTC).date()
+    cached = _forecast_cache.get(user_id)
+    if cached and cached[:2] == (version, today):
+        return cached[2]
+
+    start = min(today - timedelta(days=FORECAST_HISTORY_DAYS), today.replace(day=1))
+    keys, amounts = await _load_series(db, user_id, start, today)
+    stats = {name: _values(values) for name, values in forecast(amounts, today).items()}
+    series = [
+        CostSeriesForecast.model_construct(
+            provider_id=provider_id,
+            provider_name=provider_name,
+            provider_type=provider_type,
+            service=service,
+            **{name: values[i] for name, values in stats.items()},
+        )
+        for i, (provider_id, provider_name, provider_type, service) in enumerate(keys)
+    ]
+    series.sort(key=lambda item: item.projected_month_total, reverse=True)
+    result = CostForecast.model_construct(
+        as_of=today,
+        month_end=_next_month(today) - timedelta(days=1),
+        month_to_date=round(sum(stats["month_to_date"]), 4),
+        projected_month_total=round(sum(stats["projected_month_total"]), 4),
+        anomaly_count=sum(stats["anomaly"]),
+        series=series,
+    )
+    _forecast_cache.set(user_id, (version, today, result))
+    return result
@@ -0,0 +1,136 @@
+"""Monthly range partitions of cost_records on period_start.
+
+Partitions cover whole UTC months and are named cost_records_yYYYYmMM. Rows outside
+every partition land in cost_records_default, from which `ensure_partitions` moves them
+into a partition of their own. Retention drops whole partitions; the rollup tables keep
+the daily and monthly totals of dropped months.
+"""
+
+from datetime import UTC, date, datetime
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.crud import provider as provider_crud
+
+DEFAULT_PARTITION = "cost_records_default"
+
+
+def partition_name(month: date) -> str:
+    return f"cost_records_y{month.year}m{month.month:02d}"
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month: date) -> str:
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+async def get_partitions(db: AsyncSession) -> list[date]:
+    """First days of the months that have a partition, oldest first."""
+    result = await db.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'cost_records'::regclass"
+        )
+    )
+    months = []
+    for (name,) in result:
+        if name != DEFAULT_PARTITION:
+            months.append(date(int(name[14:18]), int(name[19:21]), 1))
+    return sorted(months)
+
+
+async def create_partition(db: AsyncSession, month: date) -> None:
+    """Create the partition for a month, moving any of its rows out of the default one."""
+    name = partition_name(month)
+    start, end = _bound(month), _bound(_add_months(month, 1))
+    in_range = f"period_start >= '{start}' AND period_start < '{end}'"
+    has_rows = await db.scalar(
+        text(f"SELECT EXISTS (SELECT FROM {DEFAULT_PARTITION} WHERE {in_range})")
+    )
+    if has_rows:
+        # A new partition may not overlap rows left in the default partition
+        await db.execute(text(f"ALTER TABLE cost_records DETACH PARTITION {DEFAULT_PARTITION}"))
+    await db.execute(
+        text(
+            f"CREATE TABLE {name} PARTITION OF cost_records "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        )
+    )
+    await db.execute(text(f"ALTER TABLE {name} ENABLE ROW LEVEL SECURITY"))
+    if has_rows:
+        await db.execute(
+            text(f"INSERT INTO cost_records SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}")
+        )
+        await db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"))
+        await db.execute(
+            text(f"ALTER TABLE cost_records ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT")
+        )
+
+
+async def ensure_partitions(db: AsyncSession, months_ahead: int | None = None) -> list[date]:
+    """Create partitions through `months_ahead` months from now, and for every month that
+    has rows in the default partition. Returns the months created. The caller commits.
+    """
+    months_ahead = settings.COST_PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    current = datetime.now(UTC).date().replace(day=1)
+    wanted = {_add_months(current, offset) for offset in range(months_ahead + 1)}
+    stray = await db.execute(
+        text(
+            "SELECT DISTINCT date_trunc('month', period_start AT TIME ZONE 'UTC')::date "
+            f"FROM {DEFAULT_PARTITION}"
+        )
+    )
+    wanted.update(month for (month,) in stray)
+
+    created = sorted(wanted - set(await get_partitions(db)))
+    for month in created:
+        await create_partition(db, month)
+    return created
+
+
+async def drop_expired_partitions(
+    db: AsyncSession, retain_months: int | None = None, *, detach_only: bool = False
+) -> list[str]:
+    """Drop (or only detach, to archive elsewhere) partitions wholly older than the
+    retention window. Returns their names. A retention of 0 keeps everything. Dropped
+    records leave cost listings, so every provider's data version moves. The caller
+    commits.
+    """
+    retain_months = settings.COST_RETENTION_MONTHS if retain_months is None else retain_months
+    if not retain_months:
+        return []
+    cutoff = _add_months(datetime.now(UTC).date().replace(day=1), -retain_months)
+    expired = [partition_name(month) for month in await get_partitions(db) if month < cutoff]
+    for name in expired:
+        await db.execute(text(f"ALTER TABLE cost_records DETACH PARTITION {name}"))
+        if not detach_only:
+            await db.execute(text(f"DROP TABLE {name}"))
+    if expired:
+        await provider_crud.bump_data_version(db)
+    return expired
+
+
+async def maintain(
+    db: AsyncSession,
+    *,
+    months_ahead: int | None = None,
+    retain_months: int | None = None,
+    detach_only: bool = False,
+) -> tuple[list[date], list[str]]:
+    """Create upcoming partitions and drop expired ones in one transaction.
+
+    Returns the months created and the partitions removed, or nothing if another process
+    is already doing maintenance.
+    """
+    if not await db.scalar(text("SELECT pg_try_advisory_xact_lock(hashtext('cost_partitions'))")):
+        return [], []
+    created = await ensure_partitions(db, months_ahead)
+    expired = await drop_expired_partitions(db, retain_months, detach_only=detach_only)
+    await db.commit()
+    return created, expired
@@ -0,0 +1,135 @@
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+from sqlalchemy import Date, cast, delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import alert_evaluation
+from app.crud import provider as provider_crud
+from app.models.cost_rollup import CostDailyRollup, CostMonthlyRollup
+from app.models.provider import CostRecord
+from app.schemas.cost import CostRecordCreate
+
+# Deltas are shipped as one array per column so each rollup table takes a single statement
+_UPSERT = """
+    INSERT INTO {table} AS r (provider_id, service, {bucket}, amount, record_count)
+    SELECT * FROM unnest(
+        CAST(:provider_ids AS uuid[]),
+        CAST(:services AS varchar[]),
+        CAST(:buckets AS date[]),
+        CAST(:amounts AS numeric[]),
+        CAST(:counts AS integer[])
+    )
+    ON CONFLICT (provider_id, service, {bucket}) DO UPDATE
+    SET amount = r.amount + excluded.amount, record_count = r.record_count + excluded.record_count
+"""
+
+
+def rollup_day(period_start: datetime) -> date:
+    return period_start.astimezone(UTC).date()
+
+
+async def apply(db: AsyncSession, records: Iterable[CostRecord | CostRecordCreate]) -> None:
+    """Add newly written cost records to the rollups. The caller commits."""
+    await apply_changes(
+        db,
+        (
+            (record.provider_id, record.service, record.period_start, record.amount, 1)
+            for record in records
+        ),
+    )
+
+
+async def apply_changes(
+    db: AsyncSession, changes: Iterable[tuple[uuid.UUID, str, datetime, Decimal, int]]
+) -> None:
+    """Add (provider_id, service, period_start, amount delta, count delta) changes to the rollups.
+
+    The same deltas then advance the running totals of alerts, and the providers' data
+    versions move. The caller commits.
+    """
+    daily: dict[tuple[uuid.UUID, str, date], list] = defaultdict(lambda: [Decimal(0), 0])
+    for provider_id, service, period_start, amount, count in changes:
+        totals = daily[(provider_id, service, rollup_day(period_start))]
+        totals[0] += amount
+        totals[1] += count
+    if not daily:
+        return
+    # First, so every writer locks a provider before its rollup rows
+    await provider_crud.bump_data_version(db, {key[0] for key in daily})
+
+    monthly: dict[tuple[uuid.UUID, str, date], list] = defaultdict(lambda: [Decimal(0), 0])
+    for (provider_id, service, day), (amount, count) in daily.items():
+        totals = monthly[(provider_id, service, day.replace(day=1))]
+        totals[0] += amount
+        totals[1] += count
+
+    for table, bucket, totals_by_key in (
+        ("cost_rollups_daily", "day", daily),
+        ("cost_rollups_monthly", "month", monthly),
+    ):
+        # Key order keeps concurrent writers from deadlocking on the same rollup rows
+        keys = sorted(totals_by_key)
+        await db.execute(
+            text(_UPSERT.format(table=table, bucket=bucket)),
+            {
+                "provider_ids": [key[0] for key in keys],
+                "services": [key[1] for key in keys],
+                "buckets": [key[2] for key in keys],
+                "amounts": [totals_by_key[key][0] for key in keys],
+                "counts": [totals_by_key[key][1] for key in keys],
+            },
+        )
+
+    await alert_evaluation.apply_changes(db, {key: totals[0] for key, totals in daily.items()})
+
+
+async def rebuild(db: AsyncSession, provider_id: uuid.UUID | None = None) -> None:
+    """Recompute the rollups from raw cost records, for one provider or for all of them.
+
+    Also bumps the data versions, since anything the rollups did not reflect was a write
+    to the raw records they missed.
+    """
+    day = cast(func.timezone("UTC", CostRecord.period_start), Date)
+    daily_source = select(
+        CostRecord.provider_id,
+        CostRecord.service,
+        day,
+        func.sum(CostRecord.amount),
+        func.count(),
+    ).group_by(CostRecord.provider_id, CostRecord.service, day)
+    month = cast(func.date_trunc("month", CostDailyRollup.day), Date)
+    monthly_source = select(
+        CostDailyRollup.provider_id,
+        CostDailyRollup.service,
+        month,
+        func.sum(CostDailyRollup.amount),
+        func.sum(CostDailyRollup.record_count),
+    ).group_by(CostDailyRollup.provider_id, CostDailyRollup.service, month)
+
+    delete_daily = delete(CostDailyRollup)
+    delete_monthly = delete(CostMonthlyRollup)
+    if provider_id:
+        daily_source = daily_source.where(CostRecord.provider_id == provider_id)
+        monthly_source = monthly_source.where(CostDailyRollup.provider_id == provider_id)
+        delete_daily = delete_daily.where(CostDailyRollup.provider_id == provider_id)
+        delete_monthly = delete_monthly.where(CostMonthlyRollup.provider_id == provider_id)
+
+    columns = ["provider_id", "service"]
+    await db.execute(delete_daily)
+    await db.execute(delete_monthly)
+    await db.execute(
+        insert(CostDailyRollup).from_select(
+            [*columns, "day", "amount", "record_count"], daily_source
+        )
+    )
+    await db.execute(
+        insert(CostMonthlyRollup).from_select(
+            [*columns, "month", "amount", "record_count"], monthly_source
+        )
+    )
+    await provider_crud.bump_data_version(db, [provider_id] if provider_id else None)
+    await db.commit()
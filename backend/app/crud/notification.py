@@ -0,0 +1,116 @@
+import random
+import uuid
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import Row, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.alert import Notification, NotificationStatus
+
+# How long a claimed notification stays hidden from other dispatchers. A dispatcher that
+# dies mid-send leaves its rows to be picked up again once the claim expires.
+CLAIM_LEASE = timedelta(minutes=5)
+
+# Delivery errors are kept for inspection, so keep them short
+MAX_ERROR_LENGTH = 1000
+
+
+async def claim(db: AsyncSession, limit: int) -> list[Row]:
+    """Claim up to `limit` due notifications, oldest first, and commit.
+
+    SKIP LOCKED lets dispatchers on several replicas drain the outbox side by side
+    without handing out the same row twice.
+    """
+    due = (
+        select(Notification.id)
+        .where(
+            Notification.status == NotificationStatus.PENDING,
+            Notification.next_attempt_at <= func.now(),
+        )
+        .order_by(Notification.next_attempt_at)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    stmt = (
+        update(Notification)
+        .where(Notification.id.in_(due.scalar_subquery()))
+        .values(next_attempt_at=func.now() + CLAIM_LEASE)
+        .returning(
+            Notification.id,
+            Notification.notification_type,
+            Notification.destination,
+            Notification.payload,
+            Notification.attempts,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    notifications = list((await db.execute(stmt)).all())
+    await db.commit()
+    return notifications
+
+
+async def mark_sent(db: AsyncSession, notification_ids: list[uuid.UUID]) -> None:
+    await db.execute(
+        update(Notification)
+        .where(Notification.id.in_(notification_ids))
+        .values(status=NotificationStatus.SENT, sent_at=func.now(), last_error=None)
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds before the next attempt after `attempts` failures: exponential, with jitter."""
+    delay = min(
+        settings.NOTIFICATION_RETRY_BASE_SECONDS * 2 ** (attempts - 1),
+        settings.NOTIFICATION_RETRY_MAX_SECONDS,
+    )
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def fail(
+    db: AsyncSession, notifications: Iterable[Row], error: str, *, permanent: bool = False
+) -> list[uuid.UUID]:
+    """Record a failed attempt and schedule a retry with backoff.
+
+    Notifications that failed permanently or ran out of attempts are dead-lettered.
+    Returns the ids of those.
+    """
+    now = datetime.now(UTC)
+    values = []
+    dead = []
+    for notification in notifications:
+        attempts = notification.attempts + 1
+        if permanent or attempts >= settings.NOTIFICATION_MAX_ATTEMPTS:
+            status = NotificationStatus.DEAD
+            dead.append(notification.id)
+        else:
+            status = NotificationStatus.PENDING
+        values.append(
+            {
+                "id": notification.id,
+                "status": status,
+                "attempts": attempts,
+                "next_attempt_at": now + timedelta(seconds=retry_delay(attempts)),
+                "last_error": error[:MAX_ERROR_LENGTH],
+            }
+        )
+    # Bulk UPDATE by primary key, one statement for the whole batch
+    await db.execute(update(Notification), values)
+    await db.commit()
+    return dead
+
+
+async def defer(db: AsyncSession, delays: dict[uuid.UUID, float]) -> None:
+    """Put claimed notifications back for later without counting an attempt."""
+    now = datetime.now(UTC)
+    await db.execute(
+        update(Notification),
+        [
+            {"id": notification_id, "next_attempt_at": now + timedelta(seconds=delay)}
+            for notification_id, delay in delays.items()
+        ],
+    )
+    await db.commit()
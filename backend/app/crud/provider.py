@@ -1,12 +1,20 @@
 import uuid
+from collections.abc import Iterable
 
-from sqlalchemy import select
+from sqlalchemy import func, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.crypto import encrypt_credentials
 from app.models.provider import Provider
 from app.schemas.provider import ProviderCreate, ProviderUpdate
 
+# Rows are locked in id order, so concurrent writers cannot deadlock on them
+_BUMP_DATA_VERSION = """
+    UPDATE providers p SET data_version = p.data_version + 1
+    FROM (SELECT id FROM providers WHERE id = ANY(:ids) ORDER BY id FOR UPDATE) AS locked
+    WHERE p.id = locked.id
+"""
+
 
 async def get(db: AsyncSession, provider_id: uuid.UUID) -> Provider | None:
     return await db.get(Provider, provider_id)
@@ -18,6 +26,36 @@ async def get_by_user(db: AsyncSession, user_id: uuid.UUID) -> list[Provider]:
     return list(result.scalars().all())
 
 
+async def get_data_version(db: AsyncSession, user_id: uuid.UUID) -> str:
+    """Token that changes whenever the user's providers or costs may have changed.
+
+    Creating and updating a provider move `updated_at`, every cost write increments its
+    `data_version`, and the count catches deletions of a provider other than the last
+    updated one.
+    """
+    stmt = select(
+        func.count(),
+        func.max(Provider.updated_at),
+        func.coalesce(func.sum(Provider.data_version), 0),
+    ).where(Provider.user_id == user_id)
+    count, updated_at, data_version = (await db.execute(stmt)).one()
+    return f"{count}:{updated_at.isoformat() if updated_at else ''}:{data_version}"
+
+
+async def bump_data_version(
+    db: AsyncSession, provider_ids: Iterable[uuid.UUID] | None = None
+) -> None:
+    """Increment `data_version` of the given providers, or of all of them. The caller commits.
+
+    A counter rather than a timestamp, since a transaction's now() is older than its
+    commit and could fall behind a version already handed out.
+    """
+    if provider_ids is None:
+        await db.execute(text("UPDATE providers SET data_version = data_version + 1"))
+    else:
+        await db.execute(text(_BUMP_DATA_VERSION), {"ids": sorted(set(provider_ids))})
+
+
 async def create(db: AsyncSession, user_id: uuid.UUID, provider_in: ProviderCreate) -> Provider:
     provider = Provider(
         user_id=user_id,
@@ -0,0 +1,125 @@
+import uuid
+from collections.abc import Iterable
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import Update, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.sync import SyncJob, SyncJobStatus
+
+ACTIVE_STATUSES = (SyncJobStatus.QUEUED, SyncJobStatus.RUNNING)
+
+
+async def get(db: AsyncSession, job_id: uuid.UUID) -> SyncJob | None:
+    return await db.get(SyncJob, job_id)
+
+
+async def get_or_create_active(
+    db: AsyncSession, provider_id: uuid.UUID, *, full: bool = False
+) -> tuple[SyncJob, bool]:
+    """Queue a sync job for the provider, or return the one already queued or running.
+
+    The partial unique index on active jobs makes this safe across concurrent requests
+    and replicas. Returns the job and whether it was created.
+    """
+    # A job whose process died would block the provider forever, so give up on it
+    await db.execute(_fail_orphaned_stmt().where(SyncJob.provider_id == provider_id))
+
+    while True:
+        stmt = (
+            insert(SyncJob)
+            .values(id=uuid.uuid4(), provider_id=provider_id, full=full)
+            .on_conflict_do_nothing(
+                index_elements=["provider_id"],
+                index_where=SyncJob.status.in_(ACTIVE_STATUSES),
+            )
+            .returning(SyncJob)
+        )
+        job = (await db.execute(stmt)).scalar_one_or_none()
+        if job:
+            await db.commit()
+            return job, True
+
+        existing = await db.execute(
+            select(SyncJob).where(
+                SyncJob.provider_id == provider_id, SyncJob.status.in_(ACTIVE_STATUSES)
+            )
+        )
+        job = existing.scalar_one_or_none()
+        # None if the active job finished in between; try inserting again
+        if job:
+            await db.commit()
+            return job, False
+
+
+def _fail_orphaned_stmt() -> Update:
+    orphaned_before = datetime.now(UTC) - timedelta(seconds=settings.SYNC_JOB_ORPHAN_SECONDS)
+    return (
+        update(SyncJob)
+        .where(SyncJob.status.in_(ACTIVE_STATUSES), SyncJob.updated_at < orphaned_before)
+        .values(status=SyncJobStatus.FAILED, error="Abandoned", finished_at=datetime.now(UTC))
+    )
+
+
+async def fail_orphaned(db: AsyncSession) -> int:
+    """Fail every queued or running job that its process stopped touching, e.g. because
+    the process crashed. Returns how many were failed.
+    """
+    result = await db.execute(_fail_orphaned_stmt())
+    await db.commit()
+    return result.rowcount
+
+
+async def touch(db: AsyncSession, job_ids: Iterable[uuid.UUID]) -> None:
+    """Mark jobs as still held by a live process."""
+    await db.execute(
+        update(SyncJob).where(SyncJob.id.in_(list(job_ids))).values(updated_at=func.now())
+    )
+    await db.commit()
+
+
+async def start(db: AsyncSession, job_id: uuid.UUID) -> SyncJob | None:
+    """Mark a queued job as running. Returns None if it is no longer queued."""
+    stmt = (
+        update(SyncJob)
+        .where(SyncJob.id == job_id, SyncJob.status == SyncJobStatus.QUEUED)
+        .values(status=SyncJobStatus.RUNNING, started_at=datetime.now(UTC))
+        .returning(SyncJob)
+    )
+    job = (await db.execute(stmt)).scalar_one_or_none()
+    await db.commit()
+    return job
+
+
+async def update_progress(
+    db: AsyncSession, job_id: uuid.UUID, rows_fetched: int, rows_written: int
+) -> None:
+    await db.execute(
+        update(SyncJob)
+        .where(SyncJob.id == job_id)
+        .values(rows_fetched=rows_fetched, rows_written=rows_written)
+    )
+    await db.commit()
+
+
+async def finish(
+    db: AsyncSession,
+    job_id: uuid.UUID,
+    rows_fetched: int,
+    rows_written: int,
+    error: str | None = None,
+) -> None:
+    await db.execute(
+        update(SyncJob)
+        .where(SyncJob.id == job_id)
+        .values(
+            status=SyncJobStatus.FAILED if error else SyncJobStatus.SUCCEEDED,
+            rows_fetched=rows_fetched,
+            rows_written=rows_written,
+            error=error,
+            finished_at=datetime.now(UTC),
+        )
+    )
+    await db.commit()
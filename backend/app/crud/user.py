@@ -1,11 +1,20 @@
 import uuid
 
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.models.user import UserProfile
 from app.schemas.user import UserProfileCreate, UserProfileUpdate
 
+# Detached profiles by auth user id, so authenticated requests skip the profile lookup.
+# Updates through this module invalidate it; other replicas see them after the TTL.
+_profile_cache: TTLCache[uuid.UUID, UserProfile] = TTLCache(
+    maxsize=settings.USER_PROFILE_CACHE_SIZE, ttl=settings.USER_PROFILE_CACHE_TTL_SECONDS
+)
+
 
 async def get_by_auth_user_id(db: AsyncSession, auth_user_id: uuid.UUID) -> UserProfile | None:
     stmt = select(UserProfile).where(UserProfile.auth_user_id == auth_user_id)
@@ -28,13 +37,33 @@ async def update(
     for field, value in update_data.items():
         setattr(profile, field, value)
     await db.commit()
+    _profile_cache.pop(profile.auth_user_id)
     await db.refresh(profile)
     return profile
 
 
 async def get_or_create(db: AsyncSession, auth_user_id: uuid.UUID) -> UserProfile:
-    """Get existing profile or create a new one for the auth user."""
-    profile = await get_by_auth_user_id(db, auth_user_id)
-    if not profile:
-        profile = await create(db, UserProfileCreate(auth_user_id=auth_user_id))
-    return profile
+    """Get existing profile or create a new one for the auth user.
+
+    Served from a per-process cache when possible. Creation is a single INSERT ... ON
+    CONFLICT DO NOTHING, so concurrent first requests for a new user all succeed.
+    """
+    profile = _profile_cache.get(auth_user_id)
+    if profile is None:
+        stmt = (
+            insert(UserProfile)
+            .values(**UserProfileCreate(auth_user_id=auth_user_id).model_dump())
+            .on_conflict_do_nothing(index_elements=[UserProfile.auth_user_id])
+            .returning(UserProfile)
+        )
+        profile = (await db.execute(stmt)).scalar_one_or_none()
+        if profile is None:
+            profile = await get_by_auth_user_id(db, auth_user_id)
+        # Either way, end the transaction so the connection goes back to the pool instead
+        # of idling while the route works on a read session from the same pool
+        await db.commit()
+        # Cache a detached copy; the caller gets its own instance bound to its session
+        db.expunge(profile)
+        _profile_cache.set(auth_user_id, profile)
+    # load=False attaches the cached state without a round trip
+    return await db.merge(profile, load=False)
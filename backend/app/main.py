@@ -1,11 +1,49 @@
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from app.api.routes import api_router
+from app.api.routes import api_router, metrics
+from app.connectors.http import close_http_client
 from app.core.config import settings
+from app.core.instrumentation import MetricsMiddleware
+from app.core.security import jwks_manager
+from app.notifications.dispatcher import NotificationDispatcher
+from app.sync.jobs import job_queue
+from app.sync.scheduler import SyncScheduler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
+    await jwks_manager.start()
+    job_queue.start()
+    scheduler = SyncScheduler() if settings.SYNC_SCHEDULER_ENABLED else None
+    if scheduler:
+        scheduler.start()
+    dispatcher = NotificationDispatcher() if settings.NOTIFICATION_DISPATCHER_ENABLED else None
+    if dispatcher:
+        dispatcher.start()
+    yield
+    if dispatcher:
+        await dispatcher.stop()
+    if scheduler:
+        await scheduler.stop()
+    await job_queue.stop()
+    await jwks_manager.stop()
+    await close_http_client()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan,
 )
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+    # At the root, where Prometheus scrapes by default. Never without a token: the
+    # metrics name every route and show traffic and database load
+    if settings.METRICS_TOKEN:
+        app.include_router(metrics.router)
@@ -6,10 +6,22 @@ class Base(DeclarativeBase):
 
 
 # Import models so Alembic can detect them
+from app.models.alert import (  # noqa: E402, F401
+    Alert,
+    AlertEvent,
+    AlertPeriod,
+    AlertState,
+    Notification,
+    NotificationStatus,
+    NotificationType,
+)
+from app.models.cost_rollup import CostDailyRollup, CostMonthlyRollup  # noqa: E402, F401
 from app.models.provider import (  # noqa: E402, F401
     CostRecord,
     Provider,
     ProviderStatus,
+    ProviderSyncState,
     ProviderType,
 )
+from app.models.sync import SyncJob, SyncJobStatus  # noqa: E402, F401
 from app.models.user import UserProfile  # noqa: E402, F401
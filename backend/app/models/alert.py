@@ -0,0 +1,159 @@
+import enum
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    Text,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models import Base
+
+
+class AlertPeriod(enum.StrEnum):
+    DAY = "day"
+    MONTH = "month"
+
+
+class NotificationType(enum.StrEnum):
+    EMAIL = "email"
+    WEBHOOK = "webhook"
+
+
+class NotificationStatus(enum.StrEnum):
+    PENDING = "pending"
+    SENT = "sent"
+    # Gave up after NOTIFICATION_MAX_ATTEMPTS or a permanent failure
+    DEAD = "dead"
+
+
+class Alert(Base):
+    """Notify when spend in a UTC day or month reaches a threshold.
+
+    Scoped to one provider, or to all of the user's providers when `provider_id` is
+    null, and optionally to a single service.
+    """
+
+    __tablename__ = "alerts"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("user_profiles.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    provider_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("providers.id", ondelete="CASCADE"), index=True
+    )
+    service: Mapped[str | None] = mapped_column(String(100))
+    name: Mapped[str] = mapped_column(String(100), nullable=False)
+    threshold: Mapped[Decimal] = mapped_column(Numeric(18, 6), nullable=False)
+    # ISO 4217 code
+    currency: Mapped[str] = mapped_column(String(3), nullable=False, server_default="USD")
+    period: Mapped[AlertPeriod] = mapped_column(
+        Enum(AlertPeriod), nullable=False, default=AlertPeriod.MONTH
+    )
+    notification_type: Mapped[NotificationType] = mapped_column(
+        Enum(NotificationType), nullable=False
+    )
+    # Email address or webhook URL
+    destination: Mapped[str] = mapped_column(Text, nullable=False)
+    enabled: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class AlertState(Base):
+    """Running spend total of an alert's scope for one period, kept up to date from deltas."""
+
+    __tablename__ = "alert_states"
+
+    alert_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("alerts.id", ondelete="CASCADE"), primary_key=True
+    )
+    # First day of the UTC day or month
+    period_start: Mapped[date] = mapped_column(Date, primary_key=True)
+    total: Mapped[Decimal] = mapped_column(Numeric(18, 6), nullable=False)
+    # Set once the total reaches the threshold, so each crossing fires only once
+    fired_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+
+class AlertEvent(Base):
+    """A threshold crossing of an alert."""
+
+    __tablename__ = "alert_events"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    alert_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("alerts.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    period_start: Mapped[date] = mapped_column(Date, nullable=False)
+    total: Mapped[Decimal] = mapped_column(Numeric(18, 6), nullable=False)
+    threshold: Mapped[Decimal] = mapped_column(Numeric(18, 6), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
+class Notification(Base):
+    """Outbox entry for delivering an alert event, written in the transaction that fired it.
+
+    Sent by the notification dispatcher (see app/notifications/dispatcher.py).
+    """
+
+    __tablename__ = "notifications"
+    __table_args__ = (
+        # The dispatcher's queue: pending rows by when they are due
+        Index(
+            "ix_notifications_next_attempt_at_pending",
+            "next_attempt_at",
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    alert_event_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("alert_events.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    notification_type: Mapped[NotificationType] = mapped_column(
+        Enum(NotificationType), nullable=False
+    )
+    destination: Mapped[str] = mapped_column(Text, nullable=False)
+    # Snapshot of the alert and event, so later edits to the alert do not change the message
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    # Server defaults, since alert evaluation inserts these rows in SQL
+    status: Mapped[NotificationStatus] = mapped_column(
+        Enum(NotificationStatus), nullable=False, server_default=NotificationStatus.PENDING.name
+    )
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, server_default="0")
+    # Also pushed forward while a dispatcher holds the row, so a crashed one's claim expires
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    last_error: Mapped[str | None] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    sent_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
@@ -0,0 +1,54 @@
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import Date, ForeignKey, Index, Integer, Numeric, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models import Base
+
+
+class CostDailyRollup(Base):
+    """Cost records summed per provider, service and UTC day of `period_start`."""
+
+    __tablename__ = "cost_rollups_daily"
+    __table_args__ = (
+        Index(
+            "ix_cost_rollups_daily_provider_id_day_covering",
+            "provider_id",
+            "day",
+            postgresql_include=["service", "amount", "record_count"],
+        ),
+    )
+
+    provider_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("providers.id", ondelete="CASCADE"), primary_key=True
+    )
+    service: Mapped[str] = mapped_column(String(100), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    amount: Mapped[Decimal] = mapped_column(Numeric(18, 6), nullable=False)
+    record_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class CostMonthlyRollup(Base):
+    """Cost records summed per provider, service and UTC month of `period_start`."""
+
+    __tablename__ = "cost_rollups_monthly"
+    __table_args__ = (
+        Index(
+            "ix_cost_rollups_monthly_provider_id_month_covering",
+            "provider_id",
+            "month",
+            postgresql_include=["service", "amount", "record_count"],
+        ),
+    )
+
+    provider_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("providers.id", ondelete="CASCADE"), primary_key=True
+    )
+    service: Mapped[str] = mapped_column(String(100), primary_key=True)
+    # First day of the month
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    amount: Mapped[Decimal] = mapped_column(Numeric(18, 6), nullable=False)
+    record_count: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -1,9 +1,23 @@
 import enum
 import uuid
 from datetime import datetime
+from decimal import Decimal
+from typing import Any
 
-from sqlalchemy import DateTime, Enum, ForeignKey, String, Text, func
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    LargeBinary,
+    Numeric,
+    String,
+    Text,
+    func,
+    text,
+)
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models import Base
@@ -30,7 +44,10 @@ class Provider(Base):
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     user_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("user_profiles.id", ondelete="CASCADE"), nullable=False
+        UUID(as_uuid=True),
+        ForeignKey("user_profiles.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
     )
     type: Mapped[ProviderType] = mapped_column(Enum(ProviderType), nullable=False)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
@@ -41,6 +58,9 @@ class Provider(Base):
     )
     last_sync_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
     last_error: Mapped[str | None] = mapped_column(Text)
+    # Incremented in the transaction of every write to the provider's costs, so ETags and
+    # cached forecasts notice them (see provider_crud.get_data_version)
+    data_version: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
@@ -54,18 +74,69 @@ class Provider(Base):
 
 class CostRecord(Base):
     __tablename__ = "cost_records"
+    __table_args__ = (
+        # Serves the keyset-ordered listing and index-only scans for aggregates
+        Index(
+            "ix_cost_records_provider_id_period_start",
+            "provider_id",
+            text("period_start DESC"),
+            text("id DESC"),
+            postgresql_include=["service", "amount"],
+        ),
+        # Natural key: a provider reports one amount per service and period
+        Index(
+            "ix_cost_records_natural_key",
+            "provider_id",
+            "service",
+            "period_start",
+            "period_end",
+            unique=True,
+        ),
+        # Monthly partitions, managed by app.crud.cost_partition
+        {"postgresql_partition_by": "RANGE (period_start)"},
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     provider_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("providers.id", ondelete="CASCADE"), nullable=False
     )
-    amount: Mapped[float] = mapped_column(nullable=False)
+    # Fixed-point, so sums are exact; six places cover per-token API prices
+    amount: Mapped[Decimal] = mapped_column(Numeric(18, 6), nullable=False)
+    # ISO 4217 code
+    currency: Mapped[str] = mapped_column(String(3), nullable=False, server_default="USD")
     service: Mapped[str] = mapped_column(String(100), nullable=False)
-    period_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Part of the primary key because unique constraints on a partitioned table must
+    # include the partition key
+    period_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
     period_end: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
-    # Additional data from the provider (JSON stored as text)
-    metadata_json: Mapped[str | None] = mapped_column(Text)
+    # Additional data from the provider, compacted by CostRecordCreate
+    metadata_json: Mapped[dict[str, Any] | None] = mapped_column(JSONB(none_as_null=True))
+    # Digest of amount, currency and metadata, so re-synced rows that did not change are skipped
+    content_hash: Mapped[bytes | None] = mapped_column(LargeBinary)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
     provider: Mapped["Provider"] = relationship("Provider", back_populates="cost_records")
+
+
+class ProviderSyncState(Base):
+    """Where the last successful sync of a provider stopped, so the next one resumes there,
+    and the lease of the sync running now."""
+
+    __tablename__ = "provider_sync_states"
+
+    provider_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("providers.id", ondelete="CASCADE"), primary_key=True
+    )
+    # End of the last fully synced range; the next sync starts here minus an overlap window
+    synced_through: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    # Opaque change tokens for provider APIs that hand them out
+    cursor: Mapped[str | None] = mapped_column(Text)
+    etag: Mapped[str | None] = mapped_column(Text)
+    # The sync currently running for the provider and when its lease runs out; a sync whose
+    # worker died is taken over once the lease has expired
+    lease_owner: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True))
+    leased_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
@@ -0,0 +1,205 @@
+"""Background delivery of alert notifications from the `notifications` outbox.
+
+Alert evaluation writes one outbox row per fired alert in the same transaction as the
+cost data that fired it, so ingestion never waits on an email provider or a webhook
+receiver and nothing is lost when a process dies. The dispatcher claims due rows in
+batches (FOR UPDATE SKIP LOCKED, so replicas can run side by side) and feeds them
+through a bounded queue to NOTIFICATION_WORKERS worker tasks. Emails go out through
+Resend's batch endpoint on the shared HTTP client, webhooks one request each on a
+client of their own that never reuses a connection.
+
+Each destination is rate limited; notifications over the limit are put back for later
+without counting an attempt. Failed sends are retried with exponential backoff and
+dead-lettered once they run out of attempts or fail permanently.
+
+Runs inside the API process when NOTIFICATION_DISPATCHER_ENABLED is set, or on its own
+with `python -m app.notifications.dispatcher`.
+"""
+
+import asyncio
+import logging
+import time
+
+import httpx
+from sqlalchemy import Row
+
+from app.connectors.http import close_http_client, get_http_client
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal, engine
+from app.crud import notification as notification_crud
+from app.models.alert import NotificationType
+from app.notifications.senders import (
+    RESEND_BATCH_LIMIT,
+    DeliveryError,
+    new_webhook_client,
+    send_emails,
+    send_webhook,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """Token bucket per key: `rate` sends per `period` seconds, in bursts of up to `rate`.
+
+    Idle buckets are full again after one period, so they simply expire from the cache.
+    """
+
+    def __init__(self, rate: int, period: float = 60.0, maxsize: int = 100_000):
+        self.rate = rate
+        self.period = period
+        self._buckets: TTLCache[str, tuple[float, float]] = TTLCache(maxsize, period)
+
+    def reserve(self, key: str) -> float:
+        """Take a token for `key` if one is available and return 0, otherwise return the
+        seconds until one will be.
+        """
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key) or (float(self.rate), now)
+        tokens = min(float(self.rate), tokens + (now - updated) * self.rate / self.period)
+        if tokens >= 1:
+            self._buckets.set(key, (tokens - 1, now))
+            return 0.0
+        self._buckets.set(key, (tokens, now))
+        return (1 - tokens) * self.period / self.rate
+
+
+def destination_key(notification: Row) -> str:
+    """The rate limit key: the receiving host of a webhook, the address of an email."""
+    if notification.notification_type == NotificationType.WEBHOOK:
+        return f"webhook:{httpx.URL(notification.destination).host}"
+    return f"email:{notification.destination.lower()}"
+
+
+class NotificationDispatcher:
+    def __init__(
+        self,
+        workers: int | None = None,
+        client: httpx.AsyncClient | None = None,
+        webhook_client: httpx.AsyncClient | None = None,
+    ):
+        self.workers = workers or settings.NOTIFICATION_WORKERS
+        self.client = client
+        self.webhook_client = webhook_client or new_webhook_client()
+        self.limiter = RateLimiter(settings.NOTIFICATION_RATE_PER_MINUTE)
+        # Bounded so claiming waits for free workers instead of holding rows in memory
+        self._queue: asyncio.Queue[list[Row]] = asyncio.Queue(maxsize=self.workers)
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._poll()))
+
+    async def stop(self) -> None:
+        # Claimed but unsent notifications are picked up again when their claim expires
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await self.webhook_client.aclose()
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                claimed = await self.dispatch()
+            except Exception:
+                logger.exception("Notification dispatch failed")
+                claimed = 0
+            # A full batch means more are probably due; keep draining
+            if claimed < settings.NOTIFICATION_BATCH_SIZE:
+                await asyncio.sleep(settings.NOTIFICATION_POLL_SECONDS)
+
+    async def dispatch(self) -> int:
+        """Claim one batch of due notifications and queue them for the workers.
+
+        Returns the number claimed.
+        """
+        async with AsyncSessionLocal() as db:
+            notifications = await notification_crud.claim(db, settings.NOTIFICATION_BATCH_SIZE)
+        if not notifications:
+            return 0
+
+        ready: list[Row] = []
+        deferred = {}
+        for notification in notifications:
+            delay = self.limiter.reserve(destination_key(notification))
+            if delay:
+                deferred[notification.id] = delay
+            else:
+                ready.append(notification)
+        if deferred:
+            async with AsyncSessionLocal() as db:
+                await notification_crud.defer(db, deferred)
+
+        emails = [n for n in ready if n.notification_type == NotificationType.EMAIL]
+        for i in range(0, len(emails), RESEND_BATCH_LIMIT):
+            await self._queue.put(emails[i : i + RESEND_BATCH_LIMIT])
+        for notification in ready:
+            if notification.notification_type == NotificationType.WEBHOOK:
+                await self._queue.put([notification])
+        return len(notifications)
+
+    async def join(self) -> None:
+        """Wait until every queued send has finished."""
+        await self._queue.join()
+
+    async def _work(self) -> None:
+        while True:
+            batch = await self._queue.get()
+            try:
+                await self._send(batch)
+            except Exception:
+                logger.exception("Sending %d notification(s) failed", len(batch))
+            finally:
+                self._queue.task_done()
+
+    async def _send(self, batch: list[Row]) -> None:
+        try:
+            if batch[0].notification_type == NotificationType.EMAIL:
+                failures = await send_emails(self.client or get_http_client(), batch)
+            else:
+                await send_webhook(self.webhook_client, batch[0])
+                failures = {}
+        except DeliveryError as exc:
+            failures = {notification.id: exc for notification in batch}
+        except Exception as exc:
+            # A bug or an unexpected response must not leave the rows claimed until the
+            # lease runs out and then hammer the receiver; retry them with backoff
+            logger.exception("Sending %d notification(s) failed", len(batch))
+            error = DeliveryError(f"Unexpected error: {exc!r}")
+            failures = {notification.id: error for notification in batch}
+
+        # Failed notifications grouped by their error, one update per group
+        failed: dict[int, tuple[DeliveryError, list[Row]]] = {}
+        for notification in batch:
+            if exc := failures.get(notification.id):
+                failed.setdefault(id(exc), (exc, []))[1].append(notification)
+        for exc, notifications in failed.values():
+            async with AsyncSessionLocal() as db:
+                dead = await notification_crud.fail(
+                    db, notifications, str(exc), permanent=exc.permanent
+                )
+            if dead:
+                logger.warning("Dead-lettered %d notification(s): %s", len(dead), exc)
+
+        sent = [notification.id for notification in batch if notification.id not in failures]
+        if sent:
+            async with AsyncSessionLocal() as db:
+                await notification_crud.mark_sent(db, sent)
+
+
+async def main() -> None:
+    dispatcher = NotificationDispatcher()
+    dispatcher.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await dispatcher.stop()
+        await close_http_client()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -0,0 +1,143 @@
+"""Delivery of alert notifications to email (through Resend) and webhooks."""
+
+import uuid
+from collections.abc import Sequence
+
+import httpx
+from sqlalchemy import Row
+
+from app.core.config import settings
+from app.core.network import UnresolvedHostError, check_public_url, resolve_public_host
+
+# Emails per request to Resend's batch endpoint
+RESEND_BATCH_LIMIT = 100
+# Statuses with which Resend rejects a whole batch for a problem with any one email in it
+_EMAIL_REJECTED = (400, 422)
+
+
+class DeliveryError(Exception):
+    """A notification could not be delivered.
+
+    `permanent` failures (bad configuration, a destination rejecting the request) are
+    dead-lettered at once instead of being retried.
+    """
+
+    def __init__(self, message: str, *, permanent: bool = False, status_code: int | None = None):
+        super().__init__(message)
+        self.permanent = permanent
+        self.status_code = status_code
+
+
+def _check(response: httpx.Response, target: str) -> None:
+    if response.is_success:
+        return
+    # Timeouts and rate limits pass; other client errors will not fix themselves
+    permanent = response.is_client_error and response.status_code not in (408, 429)
+    raise DeliveryError(
+        f"{target} returned {response.status_code}: {response.text[:200]}",
+        permanent=permanent,
+        status_code=response.status_code,
+    )
+
+
+def _scope(payload: dict) -> str:
+    return f"service {payload['service']}" if payload.get("service") else "all services"
+
+
+def render_email(payload: dict) -> dict:
+    """The subject and plain-text body of an alert email."""
+    period = "day" if payload["period"] == "day" else "month"
+    total = f"{payload['total']:,.2f} {payload['currency']}"
+    threshold = f"{payload['threshold']:,.2f} {payload['currency']}"
+    return {
+        "subject": f"{payload['alert_name']}: {total} spent this {period}",
+        "text": (
+            f"Spend for {_scope(payload)} in the {period} starting {payload['period_start']} "
+            f"(UTC) has reached {total}, crossing your alert threshold of {threshold}.\n"
+        ),
+    }
+
+
+async def send_emails(
+    client: httpx.AsyncClient, notifications: Sequence[Row]
+) -> dict[uuid.UUID, DeliveryError]:
+    """Send up to RESEND_BATCH_LIMIT alert emails in one Resend batch request.
+
+    Returns the failures by notification id; every other email was sent. Resend rejects
+    a whole batch when any one email in it is invalid, so a rejected batch is split in
+    halves and each half sent again until the rejected emails are isolated. One bad
+    address costs about 2 * log2(batch size) extra requests and fails only its own email.
+    """
+    if not settings.RESEND_API_KEY or not settings.NOTIFICATION_EMAIL_FROM:
+        raise DeliveryError(
+            "RESEND_API_KEY and NOTIFICATION_EMAIL_FROM must be set to send email",
+            permanent=True,
+        )
+    emails = [
+        {
+            "from": settings.NOTIFICATION_EMAIL_FROM,
+            "to": [notification.destination],
+            **render_email(notification.payload),
+        }
+        for notification in notifications
+    ]
+    try:
+        try:
+            response = await client.post(
+                f"{settings.RESEND_API_URL}/emails/batch",
+                json=emails,
+                headers={"Authorization": f"Bearer {settings.RESEND_API_KEY}"},
+                timeout=settings.NOTIFICATION_TIMEOUT_SECONDS,
+            )
+        except httpx.HTTPError as exc:
+            raise DeliveryError(f"Resend request failed: {exc!r}") from exc
+        _check(response, "Resend")
+    except DeliveryError as exc:
+        if exc.status_code not in _EMAIL_REJECTED or len(notifications) == 1:
+            return {notification.id: exc for notification in notifications}
+        middle = len(notifications) // 2
+        failures = await send_emails(client, notifications[:middle])
+        return failures | await send_emails(client, notifications[middle:])
+    return {}
+
+
+def new_webhook_client() -> httpx.AsyncClient:
+    """A client for webhooks only, which keeps no connection alive after a request.
+
+    Webhooks are sent to an IP address, with the host name in the Host header and SNI,
+    and httpx pools connections by address. A pooled connection would carry the next
+    request to any other host on that address over TLS verified for the first one, so
+    every webhook opens its own connection. Never pass the shared connector client.
+    """
+    return httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=0))
+
+
+async def send_webhook(client: httpx.AsyncClient, notification: Row) -> None:
+    """POST the alert event payload as JSON to the webhook URL, on a client from
+    `new_webhook_client`.
+
+    The URL was checked when the alert was saved, but its host may resolve elsewhere
+    now, so it is resolved again here and the request sent to that checked address.
+    Connecting by name instead would resolve it a second time and could reach a private
+    address (DNS rebinding).
+    """
+    try:
+        url = check_public_url(notification.destination)
+        addresses = await resolve_public_host(url)
+    except UnresolvedHostError as exc:
+        raise DeliveryError(f"Webhook destination: {exc}") from exc
+    except ValueError as exc:
+        raise DeliveryError(f"Webhook destination: {exc}", permanent=True) from exc
+    try:
+        response = await client.post(
+            url.copy_with(host=str(addresses[0])),
+            json=notification.payload,
+            # Deliveries are at least once; receivers can drop repeats by this key
+            headers={"Host": url.netloc.decode("ascii"), "Idempotency-Key": str(notification.id)},
+            # The certificate is still checked against the name in the URL
+            extensions={"sni_hostname": url.host},
+            timeout=settings.NOTIFICATION_TIMEOUT_SECONDS,
+        )
+    except httpx.HTTPError as exc:
+        raise DeliveryError(f"Webhook request failed: {exc!r}") from exc
+    _check(response, "Webhook")
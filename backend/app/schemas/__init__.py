@@ -1,14 +1,32 @@
+from app.schemas.alert import (  # noqa: F401
+    AlertCreate,
+    AlertEventResponse,
+    AlertResponse,
+    AlertUpdate,
+)
 from app.schemas.cost import (  # noqa: F401
+    CostByProvider,
+    CostByService,
+    CostCursor,
     CostFilters,
+    CostForecast,
+    CostGranularity,
+    CostPeriod,
     CostRecordCreate,
     CostRecordResponse,
     CostRecordWithProvider,
+    CostSeriesForecast,
+    CostSummary,
+    CostTimelinePoint,
+    CostTotals,
+    CostUpsertResult,
 )
 from app.schemas.provider import (  # noqa: F401
     ProviderCreate,
     ProviderResponse,
     ProviderUpdate,
 )
+from app.schemas.sync import SyncJobResponse  # noqa: F401
 from app.schemas.user import (  # noqa: F401
     UserProfileCreate,
     UserProfileResponse,
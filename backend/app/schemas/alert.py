@@ -0,0 +1,79 @@
+import uuid
+from datetime import date, datetime
+from typing import Annotated
+
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter, ValidationError, model_validator
+
+from app.core.network import check_public_url
+from app.models.alert import AlertPeriod, NotificationType
+from app.schemas.cost import Money
+
+_email_address = TypeAdapter(EmailStr)
+
+
+def validate_destination(notification_type: NotificationType, destination: str) -> None:
+    """Raise ValueError unless `destination` suits the notification type.
+
+    Webhooks must be https URLs that do not point at a local or private address. Their
+    hosts are resolved and checked again before every delivery.
+    """
+    if notification_type == NotificationType.WEBHOOK:
+        try:
+            check_public_url(destination)
+        except ValueError as e:
+            raise ValueError(f"Webhook destination: {e}") from None
+    else:
+        try:
+            _email_address.validate_python(destination)
+        except ValidationError:
+            raise ValueError("Email destination must be an email address") from None
+
+
+class AlertBase(BaseModel):
+    name: str = Field(max_length=100)
+    provider_id: uuid.UUID | None = None
+    service: str | None = Field(default=None, max_length=100)
+    threshold: Annotated[Money, Field(gt=0)]
+    # ISO 4217 code
+    currency: str = Field(default="USD", pattern="^[A-Z]{3}$")
+    period: AlertPeriod = AlertPeriod.MONTH
+    notification_type: NotificationType
+    destination: str
+    enabled: bool = True
+
+
+class AlertCreate(AlertBase):
+    @model_validator(mode="after")
+    def check_destination(self) -> "AlertCreate":
+        validate_destination(self.notification_type, self.destination)
+        return self
+
+
+class AlertUpdate(BaseModel):
+    name: str | None = Field(default=None, max_length=100)
+    service: str | None = Field(default=None, max_length=100)
+    threshold: Annotated[Money | None, Field(gt=0)] = None
+    period: AlertPeriod | None = None
+    notification_type: NotificationType | None = None
+    destination: str | None = None
+    enabled: bool | None = None
+
+
+class AlertResponse(AlertBase):
+    id: uuid.UUID
+    user_id: uuid.UUID
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = {"from_attributes": True}
+
+
+class AlertEventResponse(BaseModel):
+    id: uuid.UUID
+    alert_id: uuid.UUID
+    period_start: date
+    total: Money
+    threshold: Money
+    created_at: datetime
+
+    model_config = {"from_attributes": True}
@@ -1,22 +1,83 @@
+import base64
+import enum
+import json
 import uuid
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Annotated, Any, TypedDict
 
-from pydantic import BaseModel
+from pydantic import BaseModel, PlainSerializer, field_validator
 
 from app.models.provider import ProviderType
 
+# Amounts are exact decimals internally and plain JSON numbers on the wire
+Money = Annotated[Decimal, PlainSerializer(float, return_type=float, when_used="json")]
+
+# Encoded metadata above this size is trimmed, which keeps cost rows below the ~2 kB
+# TOAST threshold so they stay inline and uncompressed
+MAX_METADATA_BYTES = 1024
+# Longest string value kept when trimming metadata
+MAX_METADATA_VALUE_LENGTH = 200
+
+
+def encode_metadata(metadata: dict[str, Any]) -> bytes:
+    """Canonical JSON encoding of metadata, stable across key order."""
+    return json.dumps(metadata, sort_keys=True, separators=(",", ":")).encode()
+
+
+def compact_metadata(metadata: dict[str, Any] | None) -> dict[str, Any] | None:
+    """Drop empty values and trim metadata that would not fit in MAX_METADATA_BYTES.
+
+    Trimmed metadata keeps only short scalar values and is marked with `"truncated": true`.
+    """
+    if metadata is None:
+        return None
+    compact = {key: value for key, value in metadata.items() if value is not None}
+    if len(encode_metadata(compact)) <= MAX_METADATA_BYTES:
+        return compact or None
+    trimmed = {
+        key: value
+        for key, value in compact.items()
+        if isinstance(value, bool | int | float)
+        or (isinstance(value, str) and len(value) <= MAX_METADATA_VALUE_LENGTH)
+    }
+    trimmed["truncated"] = True
+    if len(encode_metadata(trimmed)) > MAX_METADATA_BYTES:
+        return {"truncated": True}
+    return trimmed
+
 
 class CostRecordBase(BaseModel):
-    amount: float
+    amount: Money
+    # ISO 4217 code
+    currency: str = "USD"
     service: str
     period_start: datetime
     period_end: datetime
-    metadata_json: str | None = None
+    metadata_json: dict[str, Any] | None = None
 
 
 class CostRecordCreate(CostRecordBase):
     provider_id: uuid.UUID
 
+    @field_validator("currency")
+    @classmethod
+    def normalize_currency(cls, value: str) -> str:
+        if len(value) != 3 or not value.isalpha():
+            raise ValueError("currency must be a three-letter ISO 4217 code")
+        return value.upper()
+
+    @field_validator("metadata_json")
+    @classmethod
+    def trim_metadata(cls, value: dict[str, Any] | None) -> dict[str, Any] | None:
+        return compact_metadata(value)
+
+
+class CostUpsertResult(BaseModel):
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
 
 class CostRecordResponse(CostRecordBase):
     id: uuid.UUID
@@ -26,6 +87,37 @@ class CostRecordResponse(CostRecordBase):
     model_config = {"from_attributes": True}
 
 
+class CostRecordRow(TypedDict):
+    """CostRecordResponse as a plain dict, for serializing selected rows without validation.
+
+    Keep the fields in step with CostRecordResponse, which documents the API.
+    """
+
+    amount: Money
+    currency: str
+    service: str
+    period_start: datetime
+    period_end: datetime
+    metadata_json: dict[str, Any] | None
+    id: uuid.UUID
+    provider_id: uuid.UUID
+    created_at: datetime
+
+
+class CostRecordColumns(TypedDict):
+    """Cost records as one array per field, for charting clients."""
+
+    amount: list[Money]
+    currency: list[str]
+    service: list[str]
+    period_start: list[datetime]
+    period_end: list[datetime]
+    metadata_json: list[dict[str, Any] | None]
+    id: list[uuid.UUID]
+    provider_id: list[uuid.UUID]
+    created_at: list[datetime]
+
+
 class CostRecordWithProvider(CostRecordResponse):
     provider_name: str
     provider_type: ProviderType
@@ -36,3 +128,97 @@ class CostFilters(BaseModel):
     provider_type: ProviderType | None = None
     start_date: datetime | None = None
     end_date: datetime | None = None
+
+
+class CostCursor(BaseModel):
+    """Keyset position in the (period_start DESC, id DESC) ordering of cost records."""
+
+    period_start: datetime
+    id: uuid.UUID
+
+    def encode(self) -> str:
+        """Encode the cursor as an opaque URL-safe token."""
+        return base64.urlsafe_b64encode(self.model_dump_json().encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "CostCursor":
+        """Decode a token produced by `encode`. Raises ValueError if it is malformed."""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except ValueError:
+            raise ValueError("Invalid cursor") from None
+        return cls.model_validate_json(raw)
+
+
+class CostGranularity(enum.StrEnum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class CostPeriod(BaseModel):
+    """Aggregation window on `period_start`, with the equally long window preceding it."""
+
+    start: datetime
+    end: datetime
+    previous_start: datetime
+    timezone: str
+
+
+class CostTotals(BaseModel):
+    total: Money
+    previous_total: Money
+    change: Money
+    change_percent: float | None
+
+
+class CostSummary(CostTotals):
+    period: CostPeriod
+    record_count: int
+
+
+class CostByProvider(CostTotals):
+    provider_id: uuid.UUID
+    provider_name: str
+    provider_type: ProviderType
+
+
+class CostByService(CostTotals):
+    service: str
+
+
+class CostTimelinePoint(BaseModel):
+    bucket: datetime
+    total: Money
+
+
+class CostSeriesForecast(BaseModel):
+    """Projection and anomaly scores of one (provider, service) series, in UTC days."""
+
+    provider_id: uuid.UUID
+    provider_name: str
+    provider_type: ProviderType
+    service: str
+    month_to_date: float
+    # Month to date plus the seasonal trend for the rest of the month
+    projected_month_total: float
+    trailing_7d_average: float
+    trailing_28d_average: float
+    # Slope of the deseasonalized daily spend
+    trend_per_day: float
+    # Spend on the latest complete day, which the scores below rate
+    latest_amount: float
+    z_score: float | None
+    # Modified z-score by median absolute deviation
+    mad_score: float | None
+    anomaly: bool
+
+
+class CostForecast(BaseModel):
+    as_of: date
+    # Last day of the month being projected
+    month_end: date
+    month_to_date: float
+    projected_month_total: float
+    anomaly_count: int
+    series: list[CostSeriesForecast]
@@ -0,0 +1,29 @@
+import uuid
+from datetime import UTC, datetime
+
+from pydantic import BaseModel, computed_field
+
+from app.models.sync import SyncJobStatus
+
+
+class SyncJobResponse(BaseModel):
+    id: uuid.UUID
+    provider_id: uuid.UUID
+    status: SyncJobStatus
+    full: bool
+    rows_fetched: int
+    rows_written: int
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    model_config = {"from_attributes": True}
+
+    @computed_field
+    @property
+    def elapsed_seconds(self) -> float | None:
+        """Seconds since the job started, or its total run time once finished."""
+        if self.started_at is None:
+            return None
+        return ((self.finished_at or datetime.now(UTC)) - self.started_at).total_seconds()
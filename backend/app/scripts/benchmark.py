@@ -0,0 +1,313 @@
+"""Benchmark the cost queries and the cost and provider routes.
+
+Runs each case `--iterations` times after `--warmup` untimed runs, as one synthetic
+user from `app.scripts.generate_costs` (run that first), and writes the latency
+statistics to a JSON file. Routes are called end to end in process through an ASGI
+client, with the JWKS replaced by a key generated for the run so real tokens pass
+verification. Writes go to a provider created for the run and deleted afterwards.
+
+With `--compare` the results are checked against an earlier results file and the run
+fails when any case's median got slower by more than `--threshold`.
+
+Usage: python -m app.scripts.benchmark [--user N] [--iterations N] [--warmup N]
+                                      [--output FILE] [--compare FILE] [--threshold PCT]
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import httpx
+import jwt
+from cryptography.hazmat.primitives.asymmetric import ec
+from sqlalchemy import delete, func, select, text
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal, engine
+from app.core.security import jwks_manager
+from app.crud import cost as cost_crud
+from app.crud import user as user_crud
+from app.main import app
+from app.models.provider import CostRecord, Provider
+from app.schemas.cost import CostFilters, CostRecordCreate
+from app.scripts.generate_costs import synthetic_auth_user_id
+
+# Records per create_many call, about one sync window of a busy provider
+CREATE_MANY_SIZE = 500
+
+
+def stub_jwks() -> Callable[[uuid.UUID], str]:
+    """Point token verification at a freshly generated ES256 key.
+
+    Returns a function that signs a Supabase-style access token for an auth user id.
+    """
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    jwk = json.loads(jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key()))
+    kid = uuid.uuid4().hex
+    jwks_manager.load({"keys": [{**jwk, "kid": kid, "alg": "ES256", "use": "sig"}]})
+
+    def sign(auth_user_id: uuid.UUID) -> str:
+        now = datetime.now(UTC)
+        claims = {
+            "sub": str(auth_user_id),
+            "aud": "authenticated",
+            "role": "authenticated",
+            "iat": now,
+            "exp": now + timedelta(hours=1),
+        }
+        return jwt.encode(claims, private_key, algorithm="ES256", headers={"kid": kid})
+
+    return sign
+
+
+def api_client(token: str | None = None, base_url: str | None = None) -> httpx.AsyncClient:
+    """HTTP client for the API, in process unless `base_url` points at a running server."""
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    if base_url:
+        return httpx.AsyncClient(base_url=f"{base_url}{settings.API_V1_STR}", headers=headers)
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url=f"http://benchmark{settings.API_V1_STR}",
+        headers=headers,
+    )
+
+
+def summarize(samples: list[float], elapsed: float | None = None) -> dict:
+    """Latency statistics in milliseconds for samples in seconds.
+
+    Throughput is per second of `elapsed` wall time when given, otherwise of the summed
+    samples, as for runs one at a time.
+    """
+    ordered = sorted(samples)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else []
+
+    def ms(value: float) -> float:
+        return round(value * 1000, 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": ms(statistics.fmean(ordered)),
+        "min_ms": ms(ordered[0]),
+        "p50_ms": ms(cuts[49] if cuts else ordered[0]),
+        "p95_ms": ms(cuts[94] if cuts else ordered[0]),
+        "p99_ms": ms(cuts[98] if cuts else ordered[0]),
+        "max_ms": ms(ordered[-1]),
+        "ops_per_second": round(len(ordered) / (elapsed or sum(ordered)), 1),
+    }
+
+
+def metadata() -> dict:
+    """Where and on what a run happened, so results files can be told apart."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "started_at": datetime.now(UTC).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+@dataclass
+class Case:
+    name: str
+    run: Callable[..., Awaitable[object]]
+    # Untimed; its result is passed to `run`
+    setup: Callable[[], Awaitable[object]] | None = None
+
+
+async def _request(
+    client: httpx.AsyncClient, method: str, url: str, *, expect: int | None = None, **kwargs
+) -> httpx.Response:
+    response = await client.request(method, url, **kwargs)
+    if expect is not None and response.status_code != expect:
+        raise RuntimeError(f"{method} {url} returned {response.status_code}, not {expect}")
+    if expect is None:
+        response.raise_for_status()
+    return response
+
+
+def _cases(client: httpx.AsyncClient, user_id: uuid.UUID, provider_id: uuid.UUID) -> list[Case]:
+    """The benchmark cases, reads first so the writes do not move the ETag under them."""
+    last_month = CostFilters(start_date=datetime.now(UTC) - timedelta(days=30))
+
+    async def query(filters: CostFilters | None = None, limit: int | None = None) -> object:
+        async with AsyncSessionLocal() as db:
+            return await cost_crud.get_by_user(db, user_id, filters, limit=limit)
+
+    batches = iter(range(sys.maxsize))
+
+    async def new_records() -> list[CostRecordCreate]:
+        # Hourly records of a new service on every run, inside the synthetic history
+        service = f"benchmark-{next(batches)}"
+        start = datetime.now(UTC).replace(minute=0, second=0, microsecond=0)
+        return [
+            CostRecordCreate(
+                provider_id=provider_id,
+                amount=Decimal("1.25"),
+                service=service,
+                period_start=start - timedelta(hours=i + 1),
+                period_end=start - timedelta(hours=i),
+            )
+            for i in range(CREATE_MANY_SIZE)
+        ]
+
+    async def create_many(records: list[CostRecordCreate]) -> object:
+        async with AsyncSessionLocal() as db:
+            return await cost_crud.create_many(db, records)
+
+    async def current_etag() -> str:
+        return (await _request(client, "GET", "/costs")).headers["ETag"]
+
+    async def create_provider() -> str:
+        response = await _request(client, "POST", "/providers", json=_PROVIDER)
+        return response.json()["id"]
+
+    return [
+        Case("get_by_user page", lambda: query(limit=cost_crud.DEFAULT_PAGE_SIZE)),
+        Case("get_by_user 30 days", lambda: query(last_month)),
+        Case("GET /costs", lambda: _request(client, "GET", "/costs")),
+        Case(
+            "GET /costs 304",
+            lambda etag: _request(
+                client, "GET", "/costs", headers={"If-None-Match": etag}, expect=304
+            ),
+            setup=current_etag,
+        ),
+        Case("GET /providers", lambda: _request(client, "GET", "/providers")),
+        Case("GET /providers/{id}", lambda: _request(client, "GET", f"/providers/{provider_id}")),
+        Case(f"create_many {CREATE_MANY_SIZE}", create_many, setup=new_records),
+        Case("POST /providers", create_provider),
+        Case(
+            "PATCH /providers/{id}",
+            lambda: _request(client, "PATCH", f"/providers/{provider_id}", json={"name": "Bench"}),
+        ),
+        Case(
+            "DELETE /providers/{id}",
+            lambda created: _request(client, "DELETE", f"/providers/{created}"),
+            setup=create_provider,
+        ),
+    ]
+
+
+# Every provider the run creates has this name, so they can all be removed afterwards
+_PROVIDER = {"name": "Benchmark", "type": "vercel", "credentials": {"token": "benchmark"}}
+
+
+async def _measure(case: Case, iterations: int, warmup: int) -> dict:
+    samples = []
+    for i in range(warmup + iterations):
+        args = (await case.setup(),) if case.setup else ()
+        started = time.perf_counter()
+        await case.run(*args)
+        if i >= warmup:
+            samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print each case's median against the baseline's and return the names of the cases
+    that got slower by more than `threshold` percent.
+    """
+    regressions = []
+    for name, stats in results.items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        change = (stats["p50_ms"] / before["p50_ms"] - 1) * 100 if before["p50_ms"] else 0.0
+        slower = change > threshold
+        if slower:
+            regressions.append(name)
+        print(
+            f"{name:<28} {before['p50_ms']:>10.2f} -> {stats['p50_ms']:>10.2f} ms "
+            f"{change:+7.1f}%{'  SLOWER' if slower else ''}"
+        )
+    return regressions
+
+
+async def main(args: argparse.Namespace) -> int:
+    sign = stub_jwks()
+    auth_user_id = synthetic_auth_user_id(args.user)
+    async with AsyncSessionLocal() as db:
+        profile = await user_crud.get_by_auth_user_id(db, auth_user_id)
+        if profile is None:
+            print(f"No synthetic user {args.user}; run app.scripts.generate_costs first")
+            return 2
+        cost_records = await db.scalar(
+            select(func.count())
+            .select_from(CostRecord)
+            .join(Provider, Provider.id == CostRecord.provider_id)
+            .where(Provider.user_id == profile.id)
+        )
+        server_version = await db.scalar(text("SHOW server_version"))
+
+    run = {
+        **metadata(),
+        "postgres": server_version,
+        "user": args.user,
+        "cost_records": cost_records,
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+    }
+    results = {}
+    async with api_client(sign(auth_user_id)) as client:
+        response = await _request(client, "POST", "/providers", json=_PROVIDER)
+        provider_id = uuid.UUID(response.json()["id"])
+        try:
+            for case in _cases(client, profile.id, provider_id):
+                results[case.name] = stats = await _measure(case, args.iterations, args.warmup)
+                print(
+                    f"{case.name:<28} p50 {stats['p50_ms']:>9.2f}  p95 {stats['p95_ms']:>9.2f}  "
+                    f"p99 {stats['p99_ms']:>9.2f} ms  {stats['ops_per_second']:>9.1f}/s"
+                )
+        finally:
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    delete(Provider).where(
+                        Provider.user_id == profile.id, Provider.name.in_(["Benchmark", "Bench"])
+                    )
+                )
+                await db.commit()
+            await engine.dispose()
+
+    with open(args.output, "w") as f:
+        json.dump({"metadata": run, "results": results}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(
+                f"{len(regressions)} case(s) slower than {args.compare} by over {args.threshold}%"
+            )
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--user", type=int, default=0, help="synthetic user number")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="results file of an earlier run")
+    parser.add_argument(
+        "--threshold", type=float, default=20.0, help="allowed median slowdown, percent"
+    )
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,170 @@
+"""Fill DATABASE_URL with synthetic users, providers and daily cost records.
+
+Every one of `--users` users gets `--providers` connected providers with `--services`
+services each, and every service one cost record per UTC day for the last `--days`
+days. Amounts follow a per-service base level with a weekday pattern, slow growth,
+noise and the odd spike. They are derived from `--seed` and the positions of the user,
+provider, service and day, so a run with the same arguments writes the same data.
+
+Records are generated inside Postgres with generate_series, one INSERT ... SELECT per
+chunk of providers, and the rollups are rebuilt once at the end. Missing monthly
+partitions are created first. Synthetic users have auth ids from `synthetic_auth_user_id`
+so benchmarks can sign tokens for them; the synthetic users of an earlier run are
+deleted first. Records carry no content hash, so a real sync rewrites them all.
+
+Usage: python -m app.scripts.generate_costs [--users N] [--providers N] [--services N]
+                                           [--days N] [--seed N]
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.crypto import encrypt_credentials
+from app.core.db import AsyncSessionLocal, engine
+from app.crud import cost_partition, cost_rollup
+from app.models.provider import Provider, ProviderStatus, ProviderType
+from app.models.user import UserProfile
+
+# Synthetic auth ids share this prefix and end in the user's number
+_AUTH_ID_PREFIX = "00000000-0000-4000-8000-"
+_AUTH_ID_RANGE = (uuid.UUID(_AUTH_ID_PREFIX + "0" * 12), uuid.UUID(_AUTH_ID_PREFIX + "f" * 12))
+_NAMESPACE = uuid.UUID("5f0c3a52-6d7e-4c1b-9a43-2b1e7d9c8f60")
+
+# Roughly this many cost records per INSERT ... SELECT
+CHUNK_ROWS = 500_000
+
+# Everything but the provider ids and numbers is a parameter; the hashes make the
+# amounts a pure function of the seed and the row's position
+_INSERT_RECORDS = text(
+    """
+    INSERT INTO cost_records (id, provider_id, amount, service, period_start, period_end)
+    SELECT gen_random_uuid(), p.id,
+           round((base.level
+                  * CASE WHEN extract(isodow FROM d.day) >= 6 THEN 0.6 ELSE 1 END
+                  * (1 + :growth * d.n / 365.0)
+                  * (0.8 + 0.4 * (noise.h & 65535) / 65535.0)
+                  * CASE WHEN (noise.h >> 16) & 511 = 0 THEN 5 ELSE 1 END)::numeric, 6),
+           'service-' || lpad(s::text, 2, '0'), d.day, d.day + interval '1 day'
+    FROM unnest(CAST(:provider_ids AS uuid[]), CAST(:provider_numbers AS int[])) AS p(id, n)
+    CROSS JOIN generate_series(1, :services) AS s
+    CROSS JOIN LATERAL (
+        SELECT 0.5 + (hashtext(concat_ws(':', :seed, p.n, s)) & 1023) / 64.0 AS level
+    ) AS base
+    CROSS JOIN LATERAL (
+        SELECT n, CAST(:start AS timestamptz) + make_interval(days => n) AS day
+        FROM generate_series(0, :days - 1) AS n
+    ) AS d
+    CROSS JOIN LATERAL (SELECT hashtext(concat_ws(':', :seed, p.n, s, d.n)) AS h) AS noise
+    """
+)
+
+# Yearly growth of every service's spend
+GROWTH = 0.2
+
+
+def synthetic_auth_user_id(user: int) -> uuid.UUID:
+    """Auth user id of the `user`th synthetic user, counting from 0."""
+    return uuid.UUID(f"{_AUTH_ID_PREFIX}{user:012x}")
+
+
+async def generate(
+    db: AsyncSession, users: int, providers: int, services: int, days: int, seed: int
+) -> int:
+    """Replace the synthetic data with a fresh set and return the cost records written."""
+    started = time.perf_counter()
+    today = datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = today - timedelta(days=days - 1)
+
+    await db.execute(
+        text("DELETE FROM user_profiles WHERE auth_user_id BETWEEN :low AND :high"),
+        {"low": _AUTH_ID_RANGE[0], "high": _AUTH_ID_RANGE[1]},
+    )
+
+    # Partitions for every month of history, so no record lands in the default one
+    month = start.date().replace(day=1)
+    existing = set(await cost_partition.get_partitions(db))
+    while month <= today.date():
+        if month not in existing:
+            await cost_partition.create_partition(db, month)
+        month = (month + timedelta(days=32)).replace(day=1)
+    await cost_partition.ensure_partitions(db)
+
+    profiles = []
+    provider_rows = []
+    credentials = encrypt_credentials({"api_key": "synthetic"})
+    types = list(ProviderType)
+    for user in range(users):
+        user_id = uuid.uuid5(_NAMESPACE, f"user:{user}")
+        profiles.append(
+            {"id": user_id, "auth_user_id": synthetic_auth_user_id(user), "timezone": "UTC"}
+        )
+        for number in range(providers):
+            provider_rows.append(
+                {
+                    "id": uuid.uuid5(_NAMESPACE, f"provider:{user}:{number}"),
+                    "user_id": user_id,
+                    "type": types[number % len(types)],
+                    "name": f"Synthetic {number + 1}",
+                    "credentials_encrypted": credentials,
+                    "status": ProviderStatus.CONNECTED,
+                }
+            )
+    await db.execute(insert(UserProfile), profiles)
+    await db.execute(insert(Provider), provider_rows)
+    await db.commit()
+
+    chunk = max(1, CHUNK_ROWS // (services * days))
+    written = 0
+    for i in range(0, len(provider_rows), chunk):
+        batch = provider_rows[i : i + chunk]
+        result = await db.execute(
+            _INSERT_RECORDS,
+            {
+                "provider_ids": [row["id"] for row in batch],
+                "provider_numbers": list(range(i, i + len(batch))),
+                "services": services,
+                "days": days,
+                "start": start,
+                "seed": seed,
+                "growth": GROWTH,
+            },
+        )
+        await db.commit()
+        written += result.rowcount
+        print(f"{written:,} cost records ({time.perf_counter() - started:.1f}s)")
+
+    await cost_rollup.rebuild(db)
+    for table in ("user_profiles", "providers", "cost_records"):
+        await db.execute(text(f"ANALYZE {table}"))
+    await db.commit()
+    return written
+
+
+async def main(users: int, providers: int, services: int, days: int, seed: int) -> None:
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as db:
+        written = await generate(db, users, providers, services, days, seed)
+    await engine.dispose()
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"{users} users, {users * providers} providers and {written:,} cost records "
+        f"in {elapsed:.1f}s ({written / elapsed:,.0f} records/s)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--providers", type=int, default=3, help="providers per user")
+    parser.add_argument("--services", type=int, default=5, help="services per provider")
+    parser.add_argument("--days", type=int, default=730, help="days of history")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.providers, args.services, args.days, args.seed))
@@ -0,0 +1,133 @@
+"""Drive concurrent load at the API and report latency percentiles and throughput.
+
+`--concurrency` clients send requests back to back for `--duration` seconds, cycling
+through `--paths`, each acting as one of the first `--users` synthetic users from
+`app.scripts.generate_costs`. By default requests go through the app in this process,
+with the JWKS stubbed as in `app.scripts.benchmark`, so clients and app share one event
+loop. With `--base-url` they go to a running server instead, authenticated with the
+`--token` values given, which that server must accept.
+
+Prints p50/p95/p99 latency and requests per second overall and per path, and writes
+them to a JSON file.
+
+Usage: python -m app.scripts.load_test [--concurrency N] [--duration SECONDS] [--users N]
+                                      [--paths PATH,...] [--base-url URL --token TOKEN ...]
+                                      [--output FILE]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+from app.core.db import engine
+from app.scripts.benchmark import api_client, metadata, stub_jwks, summarize
+from app.scripts.generate_costs import synthetic_auth_user_id
+
+DEFAULT_PATHS = "/costs,/costs/summary,/costs/by-service,/costs/timeline,/providers"
+
+
+async def _client_loop(
+    client: httpx.AsyncClient,
+    paths: list[str],
+    offset: int,
+    deadline: float,
+    latencies: dict[str, list[float]],
+    statuses: Counter,
+) -> None:
+    i = offset
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+        except httpx.HTTPError as exc:
+            statuses[type(exc).__name__] += 1
+            continue
+        latencies[path].append(time.perf_counter() - started)
+        statuses[response.status_code] += 1
+
+
+async def main(args: argparse.Namespace) -> int:
+    paths = [path.strip() for path in args.paths.split(",") if path.strip()]
+    if args.base_url:
+        if not args.token:
+            print("--base-url needs at least one --token")
+            return 2
+        tokens = args.token
+    else:
+        sign = stub_jwks()
+        tokens = [sign(synthetic_auth_user_id(user)) for user in range(args.users)]
+    clients = [api_client(token, args.base_url) for token in tokens]
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    statuses: Counter = Counter()
+    try:
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(
+                _client_loop(clients[i % len(clients)], paths, i, deadline, latencies, statuses)
+                for i in range(args.concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        for client in clients:
+            await client.aclose()
+        await engine.dispose()
+
+    samples = [latency for path in paths for latency in latencies[path]]
+    if not samples:
+        print("No requests completed")
+        return 1
+    total = summarize(samples, elapsed)
+    by_path = {path: summarize(latencies[path], elapsed) for path in paths if latencies[path]}
+    for name, stats in [*by_path.items(), ("total", total)]:
+        print(
+            f"{name:<24} {stats['count']:>8} req  p50 {stats['p50_ms']:>8.2f}  "
+            f"p95 {stats['p95_ms']:>8.2f}  p99 {stats['p99_ms']:>8.2f} ms  "
+            f"{stats['ops_per_second']:>8.1f} req/s"
+        )
+    errors = sum(
+        count for status, count in statuses.items() if not str(status).startswith(("2", "3"))
+    )
+    print(f"Statuses: {dict(sorted(statuses.items(), key=str))}")
+
+    run = {
+        **metadata(),
+        "base_url": args.base_url,
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "users": len(tokens),
+    }
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "metadata": run,
+                "total": total,
+                "paths": by_path,
+                "statuses": {str(status): count for status, count in statuses.items()},
+            },
+            f,
+            indent=2,
+        )
+    print(f"Results written to {args.output}")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--users", type=int, default=10, help="synthetic users to spread over")
+    parser.add_argument("--paths", default=DEFAULT_PATHS, help="comma-separated API paths")
+    parser.add_argument("--base-url", help="a running server, e.g. http://localhost:8000")
+    parser.add_argument("--token", action="append", help="access token for --base-url")
+    parser.add_argument("--output", default="load-test-results.json")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,34 @@
+"""Create upcoming cost_records partitions and drop expired ones.
+
+Usage: python -m app.scripts.maintain_partitions [--months-ahead N] [--retain-months N]
+                                                [--detach-only]
+"""
+
+import argparse
+import asyncio
+
+from app.core.db import AsyncSessionLocal, engine
+from app.crud import cost_partition
+
+
+async def main(months_ahead: int | None, retain_months: int | None, detach_only: bool) -> None:
+    async with AsyncSessionLocal() as db:
+        created, expired = await cost_partition.maintain(
+            db, months_ahead=months_ahead, retain_months=retain_months, detach_only=detach_only
+        )
+        for month in created:
+            print(f"Created {cost_partition.partition_name(month)}")
+        for name in expired:
+            print(f"{'Detached' if detach_only else 'Dropped'} {name}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--months-ahead", type=int, help="default: COST_PARTITION_MONTHS_AHEAD")
+    parser.add_argument("--retain-months", type=int, help="default: COST_RETENTION_MONTHS")
+    parser.add_argument(
+        "--detach-only", action="store_true", help="detach expired partitions instead of dropping"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.months_ahead, args.retain_months, args.detach_only))
@@ -0,0 +1,24 @@
+"""Rebuild the cost rollup tables from raw cost records.
+
+Usage: python -m app.scripts.rebuild_rollups [--provider-id UUID]
+"""
+
+import argparse
+import asyncio
+import uuid
+
+from app.core.db import AsyncSessionLocal, engine
+from app.crud import cost_rollup
+
+
+async def main(provider_id: uuid.UUID | None) -> None:
+    async with AsyncSessionLocal() as db:
+        await cost_rollup.rebuild(db, provider_id)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--provider-id", type=uuid.UUID, help="only rebuild this provider")
+    args = parser.parse_args()
+    asyncio.run(main(args.provider_id))
@@ -0,0 +1,43 @@
+"""Re-encrypt every provider's credentials with the current ENCRYPTION_KEY.
+
+Run after moving the previous key to ENCRYPTION_OLD_KEYS; once it finishes, the old key
+can be removed from ENCRYPTION_OLD_KEYS.
+
+Usage: python -m app.scripts.rotate_credentials [--batch-size N]
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from app.core.crypto import rotate_credentials
+from app.core.db import AsyncSessionLocal, engine
+from app.models.provider import Provider
+
+
+async def main(batch_size: int) -> None:
+    rotated = 0
+    async with AsyncSessionLocal() as db:
+        last_id = None
+        while True:
+            stmt = select(Provider).order_by(Provider.id).limit(batch_size)
+            if last_id:
+                stmt = stmt.where(Provider.id > last_id)
+            providers = list((await db.scalars(stmt)).all())
+            if not providers:
+                break
+            for provider in providers:
+                provider.credentials_encrypted = rotate_credentials(provider.credentials_encrypted)
+            await db.commit()
+            rotated += len(providers)
+            last_id = providers[-1].id
+    await engine.dispose()
+    print(f"Rotated credentials for {rotated} providers")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+    asyncio.run(main(args.batch_size))
@@ -0,0 +1,36 @@
+"""Sync one provider now, incrementally or from scratch.
+
+Usage: python -m app.scripts.sync_provider PROVIDER_ID [--full]
+"""
+
+import argparse
+import asyncio
+import sys
+import uuid
+
+from app.connectors.http import close_http_client
+from app.core.db import engine
+from app.sync.runner import sync_provider
+
+
+async def main(provider_id: uuid.UUID, full: bool) -> int:
+    try:
+        result = await sync_provider(provider_id, full=full)
+    finally:
+        await close_http_client()
+        await engine.dispose()
+    if result is None:
+        print("Provider not found or already being synced")
+        return 1
+    print(result.model_dump_json())
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("provider_id", type=uuid.UUID)
+    parser.add_argument(
+        "--full", action="store_true", help="re-fetch the whole history instead of new data"
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.provider_id, args.full)))
@@ -0,0 +1,119 @@
+"""In-process execution of manually requested sync jobs.
+
+Jobs are recorded in `sync_jobs`, which coalesces duplicate requests and serves status
+to any replica. The process that accepted a job runs it on one of SYNC_JOB_WORKERS
+worker tasks and writes its progress back every SYNC_JOB_PROGRESS_SECONDS.
+
+The queue itself lives only in that process, so every process also touches the jobs it
+holds on the same interval and fails active jobs nobody has touched for
+SYNC_JOB_ORPHAN_SECONDS. Jobs left behind by a crash then stop blocking new requests
+for their provider shortly after any process is up again.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.crud import sync_job as sync_job_crud
+from app.schemas.cost import CostUpsertResult
+from app.sync.runner import MAX_ERROR_LENGTH, sync_provider
+
+logger = logging.getLogger(__name__)
+
+
+def _counts(progress: CostUpsertResult) -> tuple[int, int]:
+    written = progress.inserted + progress.updated
+    return written + progress.unchanged, written
+
+
+class SyncJobQueue:
+    def __init__(self, workers: int | None = None):
+        self.workers = workers or settings.SYNC_JOB_WORKERS
+        self._queue: asyncio.Queue[uuid.UUID] = asyncio.Queue()
+        # Jobs queued or running in this process
+        self._held: set[uuid.UUID] = set()
+        self._tasks: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, job_id: uuid.UUID) -> None:
+        self._held.add(job_id)
+        self._queue.put_nowait(job_id)
+
+    async def join(self) -> None:
+        """Wait until every submitted job has finished."""
+        await self._queue.join()
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception("Sync job %s failed", job_id)
+            finally:
+                self._held.discard(job_id)
+                self._queue.task_done()
+
+    async def _heartbeat(self) -> None:
+        # Sweep right away, so a restart cleans up after the process it replaces
+        next_sweep = 0.0
+        while True:
+            sweep = time.monotonic() >= next_sweep
+            try:
+                async with AsyncSessionLocal() as db:
+                    if self._held:
+                        await sync_job_crud.touch(db, self._held.copy())
+                    if sweep:
+                        next_sweep = time.monotonic() + settings.SYNC_JOB_ORPHAN_SECONDS / 2
+                        orphaned = await sync_job_crud.fail_orphaned(db)
+                        if orphaned:
+                            logger.warning("Failed %d orphaned sync job(s)", orphaned)
+            except Exception:
+                logger.exception("Sync job heartbeat failed")
+            await asyncio.sleep(settings.SYNC_JOB_PROGRESS_SECONDS)
+
+    async def _run(self, job_id: uuid.UUID) -> None:
+        async with AsyncSessionLocal() as db:
+            job = await sync_job_crud.start(db, job_id)
+            if job is None:
+                return
+
+            progress = CostUpsertResult()
+            reporter = asyncio.create_task(self._report(job_id, progress))
+            error = None
+            try:
+                # Wait out a scheduled sync of the same provider rather than skip the request
+                result = await sync_provider(
+                    job.provider_id, full=job.full, wait=True, progress=progress
+                )
+                if result is None:
+                    error = "Provider not found"
+            except Exception as exc:
+                error = str(exc)[:MAX_ERROR_LENGTH]
+            finally:
+                reporter.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await reporter
+            await sync_job_crud.finish(db, job_id, *_counts(progress), error=error)
+
+    async def _report(self, job_id: uuid.UUID, progress: CostUpsertResult) -> None:
+        while True:
+            await asyncio.sleep(settings.SYNC_JOB_PROGRESS_SECONDS)
+            async with AsyncSessionLocal() as db:
+                await sync_job_crud.update_progress(db, job_id, *_counts(progress))
+
+
+job_queue = SyncJobQueue()
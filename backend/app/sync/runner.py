@@ -0,0 +1,181 @@
+import asyncio
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import func, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.connectors import get_connector_class
+from app.core.config import settings
+from app.core.crypto import get_provider_credentials
+from app.core.db import AsyncSessionLocal
+from app.crud import cost as cost_crud
+from app.models.provider import Provider, ProviderStatus, ProviderSyncState
+from app.schemas.cost import CostUpsertResult
+
+# Provider errors are shown to the user, so keep them short
+MAX_ERROR_LENGTH = 1000
+# How often a sync that waits for a provider's lease checks whether it was released
+LEASE_POLL_SECONDS = 2.0
+
+
+class LeaseLostError(Exception):
+    """Another worker took over the provider's sync after this one's lease ran out."""
+
+
+def sync_range(state: ProviderSyncState | None, end: datetime) -> tuple[datetime, datetime]:
+    """The range to fetch: the whole history on a first sync, otherwise from the last
+    synced point less an overlap window, so late adjustments to recent days are picked up.
+
+    The start is floored to 00:00 UTC, so providers' daily buckets always come back whole
+    and keep the same natural keys from one sync to the next.
+    """
+    history_start = end - timedelta(days=settings.SYNC_HISTORY_DAYS)
+    if state is None or state.synced_through is None:
+        start = history_start
+    else:
+        start = max(
+            state.synced_through - timedelta(days=settings.SYNC_OVERLAP_DAYS), history_start
+        )
+    start = start.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    return start, end
+
+
+async def sync_provider(
+    provider_id: uuid.UUID,
+    *,
+    stale_before: datetime | None = None,
+    full: bool = False,
+    wait: bool = False,
+    progress: CostUpsertResult | None = None,
+) -> CostUpsertResult | None:
+    """Fetch a provider's costs from its API and upsert them, holding the provider's lease.
+
+    Only data since the last sync is requested unless `full` is set, which re-fetches
+    the whole history and discards the saved change tokens. Returns None without syncing
+    when another worker holds the lease (unless `wait` is set, which waits for it), or
+    when the provider was already synced at or after `stale_before` (another replica got
+    there first). Every batch is committed as it is written and counted in `progress`;
+    the synced range and change tokens are saved only once the whole sync succeeded.
+    The provider shows as SYNCING while the sync runs. Failures are recorded on the
+    provider and re-raised.
+    """
+    owner = uuid.uuid4()
+    async with AsyncSessionLocal() as db:
+        if await db.get(Provider, provider_id) is None:
+            return None
+        while not await _acquire(db, provider_id, owner):
+            if not wait:
+                return None
+            await asyncio.sleep(LEASE_POLL_SECONDS)
+        return await _sync(db, provider_id, owner, stale_before, full, progress)
+
+
+async def _acquire(db: AsyncSession, provider_id: uuid.UUID, owner: uuid.UUID) -> bool:
+    """Take the provider's lease unless a live sync holds it."""
+    leased_until = func.now() + timedelta(seconds=settings.SYNC_LEASE_SECONDS)
+    stmt = (
+        insert(ProviderSyncState)
+        .values(provider_id=provider_id, lease_owner=owner, leased_until=leased_until)
+        .on_conflict_do_update(
+            index_elements=[ProviderSyncState.provider_id],
+            set_={"lease_owner": owner, "leased_until": leased_until},
+            where=or_(
+                ProviderSyncState.leased_until.is_(None),
+                ProviderSyncState.leased_until < func.now(),
+            ),
+        )
+        .returning(ProviderSyncState.provider_id)
+    )
+    acquired = await db.scalar(stmt) is not None
+    await db.commit()
+    return acquired
+
+
+async def _renew(db: AsyncSession, provider_id: uuid.UUID, owner: uuid.UUID) -> None:
+    """Extend the lease within the current transaction, which also locks the lease row until
+    the transaction ends. Raises LeaseLostError if another worker took it over."""
+    renewed = await db.scalar(
+        update(ProviderSyncState)
+        .where(ProviderSyncState.provider_id == provider_id, ProviderSyncState.lease_owner == owner)
+        .values(leased_until=func.now() + timedelta(seconds=settings.SYNC_LEASE_SECONDS))
+        .returning(ProviderSyncState.provider_id)
+        .execution_options(synchronize_session=False)
+    )
+    if renewed is None:
+        raise LeaseLostError(f"Sync lease of provider {provider_id} was taken over")
+
+
+async def _release(db: AsyncSession, provider_id: uuid.UUID, owner: uuid.UUID) -> bool:
+    """Give the lease up within the current transaction; False if it was no longer ours."""
+    released = await db.scalar(
+        update(ProviderSyncState)
+        .where(ProviderSyncState.provider_id == provider_id, ProviderSyncState.lease_owner == owner)
+        .values(lease_owner=None, leased_until=None)
+        .returning(ProviderSyncState.provider_id)
+        .execution_options(synchronize_session=False)
+    )
+    return released is not None
+
+
+async def _sync(
+    db: AsyncSession,
+    provider_id: uuid.UUID,
+    owner: uuid.UUID,
+    stale_before: datetime | None,
+    full: bool,
+    progress: CostUpsertResult | None,
+) -> CostUpsertResult | None:
+    # Waiting for the lease may have taken a while, so read the provider afresh
+    provider = await db.get(Provider, provider_id, populate_existing=True)
+    if provider is None:
+        return None
+    if stale_before and provider.last_sync_at and provider.last_sync_at >= stale_before:
+        await _release(db, provider_id, owner)
+        await db.commit()
+        return None
+
+    provider.status = ProviderStatus.SYNCING
+    await db.commit()
+
+    state = await db.get(ProviderSyncState, provider_id, populate_existing=True)
+    # A full sync starts over, but the saved state stays until it has succeeded
+    resume_from = None if full else state
+    start, end = sync_range(resume_from, datetime.now(UTC))
+    try:
+        connector_class = get_connector_class(provider.type)
+        connector = connector_class(
+            provider.id,
+            get_provider_credentials(provider.id, provider.credentials_encrypted),
+            cursor=resume_from and resume_from.cursor,
+            etag=resume_from and resume_from.etag,
+        )
+        result = await cost_crud.upsert_many(
+            db,
+            connector.records(start, end),
+            outcome=progress,
+            before_batch=lambda: _renew(db, provider_id, owner),
+        )
+        await _renew(db, provider_id, owner)
+    except LeaseLostError:
+        # Whoever took over now owns the provider's status
+        await db.rollback()
+        raise
+    except Exception as exc:
+        await db.rollback()
+        if await _release(db, provider_id, owner):
+            provider.status = ProviderStatus.ERROR
+            provider.last_error = str(exc)[:MAX_ERROR_LENGTH]
+        await db.commit()
+        raise
+
+    state.synced_through = end
+    state.cursor = connector.cursor
+    state.etag = connector.etag
+    state.lease_owner = state.leased_until = None
+    provider.status = ProviderStatus.CONNECTED
+    provider.last_sync_at = end
+    provider.last_error = None
+    await db.commit()
+    return result
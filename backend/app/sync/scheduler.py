@@ -0,0 +1,152 @@
+"""Periodic background sync of every provider that has a connector.
+
+Each poll selects the providers that are due, gives each a random start offset within
+SYNC_JITTER_SECONDS so upstream APIs and the database see a spread-out load, and feeds
+them through a bounded queue to SYNC_WORKERS worker tasks. Replicas may run the
+scheduler side by side: the per-provider lease taken by `sync_provider` keeps any
+provider from being synced twice at once.
+
+The scheduler also runs the daily cost_records partition maintenance.
+
+Runs inside the API process when SYNC_SCHEDULER_ENABLED is set, or on its own with
+`python -m app.sync.scheduler`.
+"""
+
+import asyncio
+import logging
+import random
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import and_, not_, or_, select
+
+from app.connectors import CONNECTORS
+from app.connectors.http import close_http_client
+from app.core.config import settings
+from app.core.crypto import decrypt_many
+from app.core.db import AsyncSessionLocal, engine
+from app.crud import cost_partition
+from app.models.provider import Provider, ProviderStatus
+from app.sync.runner import sync_provider
+
+logger = logging.getLogger(__name__)
+
+
+async def get_due_providers(now: datetime) -> list[tuple[uuid.UUID, str]]:
+    """(id, encrypted credentials) of providers with a connector whose last sync is older
+    than the sync interval.
+
+    Providers that failed are retried after SYNC_ERROR_RETRY_MINUTES rather than on
+    every poll.
+    """
+    stale_before = now - timedelta(minutes=settings.SYNC_INTERVAL_MINUTES)
+    retry_before = now - timedelta(minutes=settings.SYNC_ERROR_RETRY_MINUTES)
+    stmt = select(Provider.id, Provider.credentials_encrypted).where(
+        Provider.type.in_(list(CONNECTORS)),
+        or_(Provider.last_sync_at.is_(None), Provider.last_sync_at < stale_before),
+        not_(and_(Provider.status == ProviderStatus.ERROR, Provider.updated_at >= retry_before)),
+    )
+    async with AsyncSessionLocal() as db:
+        return [(row.id, row.credentials_encrypted) for row in await db.execute(stmt)]
+
+
+class SyncScheduler:
+    def __init__(self, workers: int | None = None):
+        self.workers = workers or settings.SYNC_WORKERS
+        # Bounded so jittered enqueues wait for a free worker instead of queueing ahead
+        self._queue: asyncio.Queue[tuple[uuid.UUID, datetime]] = asyncio.Queue(maxsize=self.workers)
+        # Providers waiting out their jitter, queued or running in this process, so a slow
+        # sync is not queued twice
+        self._pending: set[uuid.UUID] = set()
+        self._tasks: list[asyncio.Task] = []
+        # Jittered enqueues still waiting
+        self._delayed: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._poll()))
+        self._tasks.append(asyncio.create_task(self._maintain()))
+
+    async def stop(self) -> None:
+        tasks = [*self._tasks, *self._delayed]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                await self._schedule(datetime.now(UTC))
+            except Exception:
+                logger.exception("Sync scheduling failed")
+            await asyncio.sleep(settings.SYNC_POLL_SECONDS)
+
+    async def _maintain(self) -> None:
+        # Partitions are created months ahead, so once a day is plenty
+        while True:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await cost_partition.maintain(db)
+            except Exception:
+                logger.exception("Partition maintenance failed")
+            await asyncio.sleep(24 * 60 * 60)
+
+    async def _schedule(self, now: datetime) -> None:
+        stale_before = now - timedelta(minutes=settings.SYNC_INTERVAL_MINUTES)
+        due_providers = [
+            (provider_id, encrypted)
+            for provider_id, encrypted in await get_due_providers(now)
+            if provider_id not in self._pending
+        ]
+        # Decrypt the whole batch up front, off the event loop; workers then hit the
+        # credentials cache
+        await asyncio.to_thread(decrypt_many, due_providers)
+        for provider_id, _ in due_providers:
+            self._pending.add(provider_id)
+            # Each provider waits out its own offset, so a full queue delays only the
+            # providers already due rather than the jitter and the next poll
+            task = asyncio.create_task(
+                self._enqueue(
+                    provider_id, stale_before, random.uniform(0, settings.SYNC_JITTER_SECONDS)
+                )
+            )
+            self._delayed.add(task)
+            task.add_done_callback(self._delayed.discard)
+
+    async def _enqueue(self, provider_id: uuid.UUID, stale_before: datetime, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+            await self._queue.put((provider_id, stale_before))
+        except asyncio.CancelledError:
+            self._pending.discard(provider_id)
+            raise
+
+    async def _work(self) -> None:
+        while True:
+            provider_id, stale_before = await self._queue.get()
+            try:
+                result = await sync_provider(provider_id, stale_before=stale_before)
+                if result:
+                    logger.info("Synced provider %s: %s", provider_id, result)
+            except Exception:
+                logger.exception("Sync failed for provider %s", provider_id)
+            finally:
+                self._pending.discard(provider_id)
+                self._queue.task_done()
+
+
+async def main() -> None:
+    scheduler = SyncScheduler()
+    scheduler.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await scheduler.stop()
+        await close_http_client()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
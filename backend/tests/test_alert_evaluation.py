@@ -0,0 +1,133 @@
+import itertools
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.crud import alert as alert_crud
+from app.crud import alert_evaluation
+from app.crud import cost as cost_crud
+from app.models.alert import (
+    AlertEvent,
+    AlertPeriod,
+    AlertState,
+    Notification,
+    NotificationStatus,
+    NotificationType,
+)
+from app.models.provider import Provider
+from app.schemas.alert import AlertCreate, AlertUpdate
+from app.schemas.cost import CostRecordCreate
+
+# Distinct start times within the day, so records never share a natural key
+_minutes = itertools.count()
+
+
+async def _spend(db, provider_id, amount, *, days_ago=0):
+    day = datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = day - timedelta(days=days_ago) + timedelta(minutes=next(_minutes) % 1440)
+    await cost_crud.ingest(
+        db,
+        [
+            CostRecordCreate(
+                provider_id=provider_id,
+                amount=Decimal(amount),
+                service="gpt",
+                period_start=start,
+                period_end=start + timedelta(minutes=1),
+            )
+        ],
+    )
+
+
+async def _totals(db, alert_id) -> list[Decimal]:
+    result = await db.scalars(
+        select(AlertState.total)
+        .where(AlertState.alert_id == alert_id)
+        .order_by(AlertState.period_start)
+    )
+    return list(result)
+
+
+@pytest.fixture
+async def new_alert(db, provider_id):
+    user_id = await db.scalar(select(Provider.user_id).where(Provider.id == provider_id))
+
+    async def create(threshold=1000, period=AlertPeriod.MONTH):
+        alert_in = AlertCreate(
+            name="Spend",
+            threshold=Decimal(threshold),
+            period=period,
+            notification_type=NotificationType.EMAIL,
+            destination="ops@example.com",
+        )
+        return await alert_crud.create(db, user_id, alert_in)
+
+    return create
+
+
+async def test_re_enabled_alerts_are_re_seeded(db, provider_id, new_alert):
+    alert = await new_alert()
+    await _spend(db, provider_id, 10)
+    assert await _totals(db, alert.id) == [10]
+
+    await alert_crud.update(db, alert, AlertUpdate(enabled=False))
+    await _spend(db, provider_id, 5)
+    await alert_crud.update(db, alert, AlertUpdate(enabled=True))
+    await _spend(db, provider_id, 1)
+
+    # The spend while it was disabled counts again
+    assert await _totals(db, alert.id) == [16]
+
+
+async def test_new_alerts_are_seeded_from_the_rollups_then_add_deltas(db, provider_id, new_alert):
+    await _spend(db, provider_id, 10)
+    alert = await new_alert()
+    assert await _totals(db, alert.id) == []
+
+    # Seeded from the rollups, which already include this delta
+    await _spend(db, provider_id, 5)
+    assert await _totals(db, alert.id) == [15]
+    await _spend(db, provider_id, 7)
+    assert await _totals(db, alert.id) == [22]
+
+
+async def test_a_state_seeded_concurrently_takes_the_delta(db, provider_id, new_alert):
+    alert = await new_alert()
+    today = datetime.now(UTC).date()
+    # Another transaction seeded the period between our rollup update and our seed
+    db.add(AlertState(alert_id=alert.id, period_start=today.replace(day=1), total=100))
+    await db.flush()
+
+    fired = await alert_evaluation.apply_changes(db, {(provider_id, "gpt", today): Decimal(5)})
+
+    assert fired == []
+    assert await _totals(db, alert.id) == [105]
+
+
+async def test_ended_periods_are_not_tracked(db, provider_id, new_alert):
+    alert = await new_alert(period=AlertPeriod.DAY)
+    await _spend(db, provider_id, 10, days_ago=1)
+    assert await _totals(db, alert.id) == []
+
+    await _spend(db, provider_id, 3)
+    assert await _totals(db, alert.id) == [3]
+
+
+async def test_alerts_fire_once_per_period_into_the_outbox(db, provider_id, new_alert):
+    alert = await new_alert(threshold=20)
+    await _spend(db, provider_id, 15)
+    await _spend(db, provider_id, 10)
+    await _spend(db, provider_id, 10)
+
+    [event] = await alert_crud.get_events(db, alert.id)
+    assert (event.total, event.threshold) == (25, 20)
+    [notification] = await db.scalars(
+        select(Notification).join(AlertEvent).where(AlertEvent.alert_id == alert.id)
+    )
+    assert notification.alert_event_id == event.id
+    assert notification.destination == "ops@example.com"
+    assert notification.status == NotificationStatus.PENDING
+    assert notification.payload["alert_id"] == str(alert.id)
+    assert Decimal(str(notification.payload["total"])) == 25
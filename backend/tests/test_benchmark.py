@@ -0,0 +1,53 @@
+import pytest
+
+from app.core import security
+from app.scripts import benchmark
+from app.scripts.benchmark import compare, stub_jwks, summarize
+from app.scripts.generate_costs import synthetic_auth_user_id
+
+
+def test_summarize_reports_percentiles_in_milliseconds():
+    samples = [i / 1000 for i in range(1, 101)]
+
+    stats = summarize(samples)
+
+    assert stats["count"] == 100
+    assert stats["min_ms"] == 1.0 and stats["max_ms"] == 100.0
+    assert stats["p50_ms"] == pytest.approx(50.5)
+    assert stats["p95_ms"] == pytest.approx(95.05)
+    assert stats["mean_ms"] == pytest.approx(50.5)
+    assert stats["ops_per_second"] == round(100 / sum(samples), 1)
+    assert summarize(samples, elapsed=2.0)["ops_per_second"] == 50.0
+
+
+def test_summarize_handles_a_single_sample():
+    stats = summarize([0.004])
+    assert stats["p50_ms"] == stats["p99_ms"] == stats["max_ms"] == 4.0
+
+
+def test_compare_flags_cases_slower_than_the_threshold():
+    baseline = {"results": {"fast": {"p50_ms": 10.0}, "slow": {"p50_ms": 10.0}}}
+    results = {
+        "fast": {"p50_ms": 10.5},
+        "slow": {"p50_ms": 12.0},
+        "new": {"p50_ms": 99.0},
+    }
+    assert compare(results, baseline, threshold=10) == ["slow"]
+    assert compare(results, {}, threshold=10) == []
+
+
+def test_synthetic_auth_ids_are_distinct_and_stable():
+    ids = [synthetic_auth_user_id(user) for user in range(3)]
+    assert len(set(ids)) == 3
+    assert synthetic_auth_user_id(1) == ids[1]
+
+
+async def test_stub_jwks_signs_tokens_the_api_accepts(monkeypatch):
+    manager = security.JWKSManager("https://jwks.test/keys")
+    monkeypatch.setattr(security, "jwks_manager", manager)
+    monkeypatch.setattr(benchmark, "jwks_manager", manager)
+
+    sign = stub_jwks()
+    payload = await security.verify_token(sign(synthetic_auth_user_id(0)))
+
+    assert payload["sub"] == str(synthetic_auth_user_id(0))
@@ -0,0 +1,146 @@
+import asyncio
+import uuid
+from collections.abc import AsyncIterator
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+
+from app.connectors import ConnectorError, OpenAIConnector
+from app.connectors.base import BaseConnector, _retry_delay
+from app.models.provider import ProviderType
+from app.schemas.cost import CostRecordCreate
+
+START = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+def _bucket(day: int, value: float) -> dict:
+    start = START + timedelta(days=day)
+    return {
+        "start_time": int(start.timestamp()),
+        "end_time": int((start + timedelta(days=1)).timestamp()),
+        "results": [{"line_item": "gpt", "amount": {"value": value, "currency": "usd"}}],
+    }
+
+
+class WindowConnector(BaseConnector):
+    """One request per window to a mock `/usage` endpoint, which says how many batches
+    of one record to yield.
+    """
+
+    provider_type = ProviderType.OPENAI
+    base_url = "https://provider.test"
+    max_concurrency = 2
+    window = timedelta(days=1)
+
+    async def fetch_window(
+        self, start: datetime, end: datetime
+    ) -> AsyncIterator[list[CostRecordCreate]]:
+        response = await self.request("GET", "/usage", params={"day": start.date().isoformat()})
+        for _ in range(response.json()["batches"]):
+            yield [
+                CostRecordCreate(
+                    provider_id=self.provider_id,
+                    amount=Decimal("1"),
+                    service="usage",
+                    period_start=start,
+                    period_end=end,
+                )
+            ]
+
+
+def _connector(cls: type[BaseConnector], handler) -> BaseConnector:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return cls(uuid.uuid4(), {"api_key": "sk-test"}, client=client)
+
+
+async def test_openai_follows_pages():
+    pages = {
+        None: {"data": [_bucket(0, 1.5)], "has_more": True, "next_page": "p2"},
+        "p2": {"data": [_bucket(1, 2.25)], "has_more": False},
+    }
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json=pages[request.url.params.get("page")])
+
+    connector = _connector(OpenAIConnector, handler)
+    records = [record async for record in connector.records(START, START + timedelta(days=2))]
+
+    assert [record.amount for record in records] == [Decimal("1.5"), Decimal("2.25")]
+    assert [request.url.params.get("page") for request in requests] == [None, "p2"]
+    assert requests[0].headers["Authorization"] == "Bearer sk-test"
+
+
+async def test_rate_limits_are_retried_after_retry_after(monkeypatch):
+    sleeps = []
+
+    async def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+
+    monkeypatch.setattr("app.connectors.base.asyncio.sleep", sleep)
+    responses = iter(
+        [
+            httpx.Response(429, headers={"Retry-After": "7"}),
+            httpx.Response(503),
+            httpx.Response(200, json={"batches": 1}),
+        ]
+    )
+    connector = _connector(WindowConnector, lambda request: next(responses))
+
+    batches = [batch async for batch in connector.fetch(START, START + timedelta(days=1))]
+
+    assert len(batches) == 1
+    assert sleeps == [7.0, 1.0]
+
+
+def test_retry_delay_caps_retry_after_and_falls_back_to_backoff():
+    assert _retry_delay(httpx.Response(429, headers={"Retry-After": "3600"}), 0) == 60.0
+    assert _retry_delay(httpx.Response(429), 2) == 2.0
+
+
+async def test_concurrent_requests_stay_under_the_cap():
+    in_flight = peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={"batches": 1})
+
+    connector = _connector(WindowConnector, handler)
+    batches = [batch async for batch in connector.fetch(START, START + timedelta(days=10))]
+
+    assert len(batches) == 10
+    assert peak == WindowConnector.max_concurrency
+
+
+async def test_fetch_raises_the_error_of_a_failed_window():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params["day"] == "2026-01-03":
+            return httpx.Response(401, text="invalid key")
+        return httpx.Response(200, json={"batches": 1})
+
+    connector = _connector(WindowConnector, handler)
+    with pytest.raises(ConnectorError, match="401"):
+        async for _ in connector.fetch(START, START + timedelta(days=5)):
+            pass
+
+
+async def test_fetch_stops_its_tasks_when_the_consumer_leaves_early():
+    # Many batches per window fill the queue while the consumer is gone
+    connector = _connector(
+        WindowConnector, lambda request: httpx.Response(200, json={"batches": 50})
+    )
+    batches = connector.fetch(START, START + timedelta(days=10))
+    await anext(batches)
+    await asyncio.sleep(0.01)
+    await batches.aclose()
+
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert asyncio.all_tasks() == {asyncio.current_task()}
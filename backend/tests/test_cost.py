@@ -0,0 +1,125 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.crud import cost as cost_crud
+from app.crud import cost_rollup
+from app.crud import provider as provider_crud
+from app.models.cost_rollup import CostDailyRollup, CostMonthlyRollup
+from app.models.provider import CostRecord, Provider
+from app.schemas.cost import CostCursor, CostRecordCreate
+
+DAY = datetime(2026, 1, 5, tzinfo=UTC)
+
+
+def _record(provider_id, hour: int, amount: str, service: str = "gpt") -> CostRecordCreate:
+    start = DAY + timedelta(hours=hour)
+    return CostRecordCreate(
+        provider_id=provider_id,
+        amount=Decimal(amount),
+        service=service,
+        period_start=start,
+        period_end=start + timedelta(hours=1),
+    )
+
+
+async def _daily(db, provider_id) -> dict:
+    rows = await db.execute(
+        select(CostDailyRollup.service, CostDailyRollup.amount, CostDailyRollup.record_count).where(
+            CostDailyRollup.provider_id == provider_id
+        )
+    )
+    return {service: (amount, count) for service, amount, count in rows}
+
+
+async def test_ingest_returns_the_ids_it_loaded_and_rolls_them_up(db, provider_id):
+    records = [_record(provider_id, hour, "1.5") for hour in range(5)]
+
+    ids = await cost_crud.ingest(db, iter(records), batch_size=2)
+
+    stored = await db.scalars(select(CostRecord.id).where(CostRecord.provider_id == provider_id))
+    assert sorted(ids) == sorted(stored.all())
+    assert len(set(ids)) == 5
+    assert await _daily(db, provider_id) == {"gpt": (Decimal("7.5"), 5)}
+
+
+async def test_upsert_many_counts_writes_and_applies_rollup_deltas(db, provider_id):
+    first = await cost_crud.upsert_many(
+        db, [_record(provider_id, hour, "2") for hour in range(3)], batch_size=2
+    )
+    assert first.model_dump() == {"inserted": 3, "updated": 0, "unchanged": 0}
+    assert await _daily(db, provider_id) == {"gpt": (Decimal("6"), 3)}
+
+    # One amount changed, one equal but written differently, one new record
+    second = await cost_crud.upsert_many(
+        db,
+        [
+            _record(provider_id, 0, "5"),
+            _record(provider_id, 1, "2.000"),
+            _record(provider_id, 2, "2"),
+            _record(provider_id, 3, "1"),
+        ],
+    )
+
+    assert second.model_dump() == {"inserted": 1, "updated": 1, "unchanged": 2}
+    assert await _daily(db, provider_id) == {"gpt": (Decimal("10"), 4)}
+    monthly = await db.execute(
+        select(CostMonthlyRollup.amount, CostMonthlyRollup.record_count).where(
+            CostMonthlyRollup.provider_id == provider_id
+        )
+    )
+    assert monthly.all() == [(Decimal("10"), 4)]
+
+
+async def test_upsert_many_keeps_the_last_of_duplicate_keys(db, provider_id):
+    outcome = await cost_crud.upsert_many(
+        db, [_record(provider_id, 0, "1"), _record(provider_id, 0, "4")]
+    )
+
+    assert outcome.inserted == 1
+    assert await _daily(db, provider_id) == {"gpt": (Decimal("4"), 1)}
+
+
+async def test_every_cost_write_moves_the_data_version(db, provider_id):
+    user_id = await db.scalar(select(Provider.user_id).where(Provider.id == provider_id))
+    versions = [await provider_crud.get_data_version(db, user_id)]
+
+    async def moved() -> bool:
+        versions.append(await provider_crud.get_data_version(db, user_id))
+        return versions[-1] != versions[-2]
+
+    await cost_crud.ingest(db, [_record(provider_id, 0, "1")])
+    assert await moved()
+    await cost_crud.upsert_many(db, [_record(provider_id, 0, "2")])
+    assert await moved()
+    # Nothing changed, nothing to invalidate
+    await cost_crud.upsert_many(db, [_record(provider_id, 0, "2")])
+    assert not await moved()
+    await cost_rollup.rebuild(db, provider_id)
+    assert await moved()
+
+
+async def test_get_page_walks_every_record_once_newest_first(db, provider_id):
+    await cost_crud.ingest(db, [_record(provider_id, hour, "1") for hour in range(7)])
+    user_id = await db.scalar(select(Provider.user_id).where(Provider.id == provider_id))
+
+    pages, cursor = [], None
+    while True:
+        rows, cursor = await cost_crud.get_page(db, user_id, limit=3, cursor=cursor)
+        pages.append([row.period_start.hour for row in rows])
+        if cursor is None:
+            break
+        cursor = CostCursor.decode(cursor.encode())
+
+    assert pages == [[6, 5, 4], [3, 2, 1], [0]]
+
+
+def test_cursor_round_trips_and_rejects_garbage():
+    cursor = CostCursor(period_start=DAY, id=uuid.uuid4())
+    assert CostCursor.decode(cursor.encode()) == cursor
+    for token in ("not a cursor", "e30", cursor.encode()[:-4]):
+        with pytest.raises(ValueError):
+            CostCursor.decode(token)
@@ -0,0 +1,108 @@
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import select
+
+from app.crud import cost as cost_crud
+from app.crud import cost_aggregate
+from app.crud.cost_aggregate import resolve_period
+from app.models.provider import Provider
+from app.schemas.cost import CostGranularity, CostRecordCreate
+
+HISTORY_START = datetime(2026, 1, 1, tzinfo=UTC)
+# Starts and ends inside a day, with whole days and whole months in between
+PERIOD = (datetime(2026, 2, 20, 5, 30, tzinfo=UTC), datetime(2026, 4, 7, 13, tzinfo=UTC))
+
+
+def _history(provider_id) -> list[CostRecordCreate]:
+    """Six-hourly records of two services from January to mid April."""
+    records = []
+    for step in range(4 * 105):
+        start = HISTORY_START + timedelta(hours=6 * step)
+        for service, scale in (("gpt", 1), ("embeddings", 3)):
+            records.append(
+                CostRecordCreate(
+                    provider_id=provider_id,
+                    amount=Decimal(step % 7 + 1) * scale / 4,
+                    service=service,
+                    period_start=start,
+                    period_end=start + timedelta(hours=6),
+                )
+            )
+    return records
+
+
+def _expected(records, start, end, service=None) -> Decimal:
+    return sum(
+        (
+            r.amount
+            for r in records
+            if start <= r.period_start < end and service in (None, r.service)
+        ),
+        Decimal(0),
+    )
+
+
+def test_resolve_period_defaults_to_month_to_date_in_the_timezone():
+    period = resolve_period("Europe/Berlin", end_date=datetime(2026, 3, 15, 12))
+
+    assert period.start == datetime(2026, 3, 1).replace(tzinfo=period.end.tzinfo)
+    assert period.end.utcoffset().total_seconds() == 3600
+    assert period.previous_start == period.start - (period.end - period.start)
+
+
+def test_resolve_period_falls_back_to_utc_for_unknown_timezones():
+    assert resolve_period("Not/AZone").timezone == "UTC"
+
+
+@pytest.mark.parametrize(
+    "start", [datetime(2026, 3, 15, tzinfo=UTC), datetime(2026, 3, 20, tzinfo=UTC)]
+)
+def test_resolve_period_rejects_empty_and_reversed_windows(start):
+    with pytest.raises(ValueError, match="before"):
+        resolve_period("UTC", start, datetime(2026, 3, 15, tzinfo=UTC))
+
+
+@pytest.fixture
+async def history(db, provider_id):
+    records = _history(provider_id)
+    await cost_crud.ingest(db, records)
+    user_id = await db.scalar(select(Provider.user_id).where(Provider.id == provider_id))
+    return user_id, records
+
+
+async def test_totals_from_rollups_match_the_raw_records(db, history):
+    user_id, records = history
+    period = resolve_period("UTC", *PERIOD)
+    previous = (period.previous_start, period.start)
+
+    summary = await cost_aggregate.get_summary(db, user_id, period)
+    assert summary.total == _expected(records, *PERIOD)
+    assert summary.previous_total == _expected(records, *previous)
+    assert summary.record_count == sum(
+        1 for r in records if PERIOD[0] <= r.period_start < PERIOD[1]
+    )
+
+    by_service = await cost_aggregate.get_by_service(db, user_id, period)
+    assert [(row.service, row.total, row.previous_total) for row in by_service] == [
+        (service, _expected(records, *PERIOD, service), _expected(records, *previous, service))
+        for service in ("embeddings", "gpt")
+    ]
+
+    [by_provider] = await cost_aggregate.get_by_provider(db, user_id, period)
+    assert by_provider.total == summary.total
+
+
+@pytest.mark.parametrize("timezone", ["UTC", "America/New_York"])
+@pytest.mark.parametrize("granularity", list(CostGranularity))
+async def test_timeline_buckets_add_up_to_the_total(db, history, timezone, granularity):
+    user_id, records = history
+    period = resolve_period(timezone, *PERIOD)
+
+    timeline = await cost_aggregate.get_timeline(db, user_id, period, granularity=granularity)
+
+    assert sum(point.total for point in timeline) == _expected(records, *PERIOD)
+    assert [point.bucket for point in timeline] == sorted({point.bucket for point in timeline})
+    if granularity == CostGranularity.MONTH and timezone == "UTC":
+        assert [point.bucket.month for point in timeline] == [2, 3, 4]
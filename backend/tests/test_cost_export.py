@@ -0,0 +1,107 @@
+import io
+from datetime import UTC, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.crud import cost as cost_crud
+from app.crud import cost_export
+from app.models.provider import Provider, ProviderType
+from app.schemas.cost import CostFilters, CostRecordCreate
+
+DAY = datetime(2026, 1, 5, tzinfo=UTC)
+# Free text that needs quoting, with a line break inside the quotes
+AWKWARD_SERVICE = 'chat, "turbo"\nv2'
+
+
+@pytest.fixture
+async def export(db, provider_id, monkeypatch):
+    """Four records, three of them inside the filters, and a chunk per row."""
+    monkeypatch.setattr(settings, "COST_EXPORT_CHUNK_BYTES", 1)
+    amounts = ["0.000001", "123456789012.123456", "7.5", "1"]
+    services = ["gpt", AWKWARD_SERVICE, "embeddings", "gpt"]
+    records = [
+        CostRecordCreate(
+            provider_id=provider_id,
+            amount=Decimal(amount),
+            service=service,
+            period_start=DAY + timedelta(hours=hour),
+            period_end=DAY + timedelta(hours=hour + 1),
+        )
+        for hour, (amount, service) in enumerate(zip(amounts, services, strict=True))
+    ]
+    ids = await cost_crud.ingest(db, records)
+    user_id = await db.scalar(select(Provider.user_id).where(Provider.id == provider_id))
+    filters = CostFilters(
+        provider_id=provider_id,
+        provider_type=ProviderType.OPENAI,
+        # 01:00 UTC, so the first record is left out
+        start_date=datetime(2026, 1, 5, 3, tzinfo=timezone(timedelta(hours=2))),
+        end_date=DAY + timedelta(days=1),
+    )
+    # Newest first
+    expected = list(zip(records, ids, strict=True))[:0:-1]
+    return user_id, filters, expected
+
+
+async def _collect(chunks) -> list[bytes]:
+    return [chunk async for chunk in chunks]
+
+
+def _check_table(table: pa.Table, expected) -> None:
+    assert table.schema == cost_export.EXPORT_SCHEMA
+    rows = table.to_pylist()
+    assert [row["id"] for row in rows] == [str(record_id) for _, record_id in expected]
+    assert [row["amount"] for row in rows] == [record.amount for record, _ in expected]
+    assert [row["service"] for row in rows] == [record.service for record, _ in expected]
+    assert [row["period_start"] for row in rows] == [record.period_start for record, _ in expected]
+    assert {row["provider_type"] for row in rows} == {"openai"}
+
+
+async def test_csv_export(db, export):
+    user_id, filters, expected = export
+
+    chunks = await _collect(cost_export.stream_csv(db, user_id, filters))
+
+    # Header plus one chunk per row, each cut on a row boundary
+    assert len(chunks) == len(expected) + 1
+    data = b"".join(chunks)
+    # Timestamps in UTC, with the short offset Postgres writes
+    assert b"2026-01-05 03:00:00+00," in data
+    table = pa_csv.read_csv(
+        io.BytesIO(data),
+        parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=dict(
+                zip(cost_export.EXPORT_SCHEMA.names, cost_export.EXPORT_SCHEMA.types, strict=True)
+            )
+        ),
+    )
+    _check_table(table, expected)
+
+
+async def test_parquet_export(db, export):
+    user_id, filters, expected = export
+
+    data = b"".join(await _collect(cost_export.stream_arrow(db, user_id, filters, parquet=True)))
+
+    # Footer offsets must hold across the drained chunks for the file to open
+    parquet = pq.ParquetFile(io.BytesIO(data))
+    assert parquet.metadata.num_row_groups == len(expected)
+    _check_table(parquet.read(), expected)
+
+
+async def test_arrow_export(db, export):
+    user_id, filters, expected = export
+
+    data = b"".join(await _collect(cost_export.stream_arrow(db, user_id, filters)))
+
+    reader = pa.ipc.open_stream(data)
+    batches = list(reader)
+    assert [batch.num_rows for batch in batches] == [1] * len(expected)
+    _check_table(pa.Table.from_batches(batches, reader.schema), expected)
@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.crud.cost_forecast import FORECAST_HISTORY_DAYS, forecast
+
+# A Wednesday, with 13 days of March left after it
+TODAY = date(2026, 3, 18)
+START = TODAY - timedelta(days=FORECAST_HISTORY_DAYS)
+DAYS = [START + timedelta(days=i) for i in range(FORECAST_HISTORY_DAYS + 1)]
+MONTH = [day for day in DAYS if day.month == TODAY.month]
+REST_OF_MONTH = [TODAY + timedelta(days=i) for i in range(1, 14)]
+
+# The series below never emit NumPy warnings, even those that end up without scores
+pytestmark = pytest.mark.filterwarnings("error")
+
+
+def _series(spend, today_so_far=None, today=TODAY) -> np.ndarray:
+    """One row of `spend(day)` for every day up to today, with today's spend so far."""
+    days = [today - timedelta(days=i) for i in range(FORECAST_HISTORY_DAYS, -1, -1)]
+    row = np.array([float(spend(day)) for day in days])
+    if today_so_far is not None:
+        row[-1] = today_so_far
+    return row[None, :]
+
+
+def test_flat_series_projects_the_same_spend_every_day():
+    stats = forecast(_series(lambda day: 10, today_so_far=4), TODAY)
+
+    assert stats["month_to_date"][0] == 17 * 10 + 4
+    # Today's prediction is 10, above the 4 spent so far
+    assert stats["projected_month_total"][0] == pytest.approx(31 * 10)
+    assert stats["trend_per_day"][0] == pytest.approx(0, abs=1e-9)
+    assert stats["trailing_7d_average"][0] == stats["trailing_28d_average"][0] == 10
+    # No spread in the baseline, so no scores and no anomaly
+    assert np.isnan(stats["z_score"][0]) and np.isnan(stats["mad_score"][0])
+    assert not stats["anomaly"][0]
+
+
+def test_weekly_pattern_carries_into_the_projection():
+    def weekdays_only(day):
+        return 0 if day.weekday() >= 5 else 10
+
+    stats = forecast(_series(weekdays_only, today_so_far=0), TODAY)
+
+    expected = sum(weekdays_only(day) for day in MONTH[:-1] + [TODAY, *REST_OF_MONTH])
+    assert stats["projected_month_total"][0] == pytest.approx(expected)
+    assert stats["trend_per_day"][0] == pytest.approx(0, abs=1e-9)
+    assert not stats["anomaly"][0]
+
+
+def test_weekends_without_spend_have_no_scores():
+    # The latest complete day is a Sunday
+    monday = date(2026, 3, 16)
+    stats = forecast(_series(lambda day: 0 if day.weekday() >= 5 else 10, today=monday), monday)
+
+    assert stats["latest_amount"][0] == 0
+    assert np.isnan(stats["z_score"][0]) and np.isnan(stats["mad_score"][0])
+    assert not stats["anomaly"][0]
+
+
+def test_linear_ramp_is_extrapolated():
+    stats = forecast(_series(lambda day: 1 + 0.5 * DAYS.index(day)), TODAY)
+
+    assert stats["trend_per_day"][0] == pytest.approx(0.5, rel=0.02)
+    first = DAYS.index(MONTH[0])
+    expected = sum(1 + 0.5 * (first + i) for i in range(31))
+    assert stats["projected_month_total"][0] == pytest.approx(expected, rel=0.01)
+
+
+@pytest.mark.parametrize(("scale", "flagged"), [(1, True), (0.01, False)])
+def test_spike_on_the_latest_day(scale, flagged):
+    yesterday = DAYS[-2]
+
+    def spend(day):
+        if day == yesterday:
+            return 100 * scale
+        return (10 + (-1) ** DAYS.index(day)) * scale
+
+    stats = forecast(_series(spend), TODAY)
+
+    assert stats["latest_amount"][0] == pytest.approx(100 * scale)
+    assert stats["mad_score"][0] > 3.5
+    # Cents are not worth an alarm, however unusual
+    assert stats["anomaly"][0] == flagged
+
+
+def test_all_zero_series_falls_back_to_neutral_defaults():
+    amounts = np.zeros((2, len(DAYS)))
+
+    stats = forecast(amounts, TODAY)
+
+    for name in ("month_to_date", "projected_month_total", "trend_per_day", "latest_amount"):
+        assert stats[name].tolist() == [0, 0]
+    assert np.isnan(stats["z_score"]).all() and np.isnan(stats["mad_score"]).all()
+    assert not stats["anomaly"].any()
@@ -0,0 +1,55 @@
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import func, select, text
+
+from app.crud import cost as cost_crud
+from app.crud import cost_partition
+from app.models.provider import CostRecord
+from app.schemas.cost import CostRecordCreate
+
+# Long before any partition the migrations create
+STRAY_MONTH = date(1999, 3, 1)
+
+
+async def _count(db, table: str, provider_id) -> int:
+    return await db.scalar(
+        text(f"SELECT count(*) FROM {table} WHERE provider_id = :id"), {"id": provider_id}
+    )
+
+
+async def test_stray_rows_move_into_their_partition_and_expire_with_it(db, provider_id):
+    start = datetime(1999, 3, 31, 22, tzinfo=UTC)
+    await cost_crud.ingest(
+        db,
+        [
+            CostRecordCreate(
+                provider_id=provider_id,
+                amount=Decimal("1"),
+                service="gpt",
+                period_start=start + timedelta(hours=hour),
+                period_end=start + timedelta(hours=hour + 1),
+            )
+            for hour in range(4)
+        ],
+    )
+    assert await _count(db, cost_partition.DEFAULT_PARTITION, provider_id) == 4
+
+    created = await cost_partition.ensure_partitions(db, months_ahead=0)
+
+    assert {STRAY_MONTH, date(1999, 4, 1)} <= set(created)
+    assert await _count(db, cost_partition.DEFAULT_PARTITION, provider_id) == 0
+    # The last two hours fall in April, in UTC
+    assert await _count(db, "cost_records_y1999m03", provider_id) == 2
+    assert await _count(db, "cost_records_y1999m04", provider_id) == 2
+    assert await cost_partition.ensure_partitions(db, months_ahead=0) == []
+
+    expired = await cost_partition.drop_expired_partitions(db, retain_months=12 * 20)
+
+    assert {"cost_records_y1999m03", "cost_records_y1999m04"} <= set(expired)
+    remaining = select(func.count()).where(CostRecord.provider_id == provider_id)
+    assert await db.scalar(remaining) == 0
+
+
+async def test_a_retention_of_zero_keeps_everything(db):
+    assert await cost_partition.drop_expired_partitions(db, retain_months=0) == []
@@ -0,0 +1,57 @@
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+
+import httpx
+import pytest
+
+from app.api.deps import get_current_user_profile, get_read_db
+from app.core.config import settings
+from app.crud import cost as cost_crud
+from app.main import app
+from app.models.provider import Provider
+from app.models.user import UserProfile
+from app.schemas.cost import CostRecordCreate
+
+
+@pytest.fixture
+async def client(db, provider_id):
+    """An API client for the owner of `provider_id`, reading through the test session."""
+    provider = await db.get(Provider, provider_id)
+    profile = await db.get(UserProfile, provider.user_id)
+
+    async def read_db():
+        yield db
+
+    app.dependency_overrides[get_read_db] = read_db
+    app.dependency_overrides[get_current_user_profile] = lambda: profile
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url=f"http://test{settings.API_V1_STR}"
+    ) as client:
+        yield client
+    app.dependency_overrides.clear()
+
+
+async def test_columnar_listing_holds_the_same_records_as_json(db, provider_id, client):
+    start = datetime(2026, 1, 5, tzinfo=UTC)
+    await cost_crud.ingest(
+        db,
+        [
+            CostRecordCreate(
+                provider_id=provider_id,
+                amount=Decimal("1.125") * hour,
+                service="gpt",
+                period_start=start + timedelta(hours=hour),
+                period_end=start + timedelta(hours=hour + 1),
+                metadata_json={"model": "gpt-4o"} if hour % 2 else None,
+            )
+            for hour in range(5)
+        ],
+    )
+
+    rows = (await client.get("/costs", params={"limit": 3})).json()
+    columns = (await client.get("/costs", params={"limit": 3, "format": "columnar"})).json()
+
+    assert len(rows) == 3
+    assert columns == {field: [row[field] for row in rows] for field in rows[0]}
+    assert columns["amount"] == [4.5, 3.375, 2.25]
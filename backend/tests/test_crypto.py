@@ -0,0 +1,28 @@
+import uuid
+
+from app.core.crypto import (
+    clear_credentials_cache,
+    decrypt_many,
+    encrypt_credentials,
+    get_provider_credentials,
+)
+
+
+def test_cached_credentials_follow_the_ciphertext():
+    clear_credentials_cache()
+    provider_id = uuid.uuid4()
+    first = get_provider_credentials(provider_id, encrypt_credentials({"api_key": "old"}))
+    # Callers get their own dict each time, so changing one leaves the cache intact
+    first["api_key"] = "changed"
+    encrypted = encrypt_credentials({"api_key": "new"})
+    assert get_provider_credentials(provider_id, encrypted) == {"api_key": "new"}
+    assert get_provider_credentials(provider_id, encrypted) == {"api_key": "new"}
+
+
+def test_decrypt_many_leaves_out_undecryptable_ciphertexts():
+    clear_credentials_cache()
+    good, bad = uuid.uuid4(), uuid.uuid4()
+    credentials = decrypt_many(
+        [(good, encrypt_credentials({"api_key": "sk"})), (bad, "not-a-fernet-token")]
+    )
+    assert credentials == {good: {"api_key": "sk"}}
@@ -0,0 +1,94 @@
+"""ETags must describe the data of the database that served the response.
+
+The primary and the read replica are stood in for by two in-memory databases; the
+replica lags one write behind.
+"""
+
+import uuid
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user_profile, get_db, get_read_db
+from app.core.config import settings
+from app.crud import provider as provider_crud
+from app.main import app
+from app.models.provider import ProviderStatus, ProviderType
+
+USER_ID = uuid.uuid4()
+PROVIDER_ID = uuid.uuid4()
+
+
+class FakeDatabase:
+    def __init__(self, name: str):
+        self.version = "1:2026-01-01T00:00:00+00:00"
+        self.provider = SimpleNamespace(
+            id=PROVIDER_ID,
+            user_id=USER_ID,
+            name=name,
+            type=ProviderType.OPENAI,
+            status=ProviderStatus.CONNECTED,
+            last_sync_at=None,
+            last_error=None,
+            created_at=datetime(2026, 1, 1, tzinfo=UTC),
+            updated_at=datetime(2026, 1, 1, tzinfo=UTC),
+        )
+
+
+@pytest.fixture
+def databases(monkeypatch):
+    primary, replica = FakeDatabase("OpenAI"), FakeDatabase("OpenAI")
+
+    async def get_data_version(db: FakeDatabase, user_id: uuid.UUID) -> str:
+        return db.version
+
+    async def get(db: FakeDatabase, provider_id: uuid.UUID):
+        return db.provider if provider_id == db.provider.id else None
+
+    async def get_by_user(db: FakeDatabase, user_id: uuid.UUID):
+        return [db.provider]
+
+    monkeypatch.setattr(provider_crud, "get_data_version", get_data_version)
+    monkeypatch.setattr(provider_crud, "get", get)
+    monkeypatch.setattr(provider_crud, "get_by_user", get_by_user)
+    app.dependency_overrides = {
+        get_db: lambda: primary,
+        get_read_db: lambda: replica,
+        get_current_user_profile: lambda: SimpleNamespace(id=USER_ID, timezone="UTC"),
+    }
+    yield primary, replica
+    app.dependency_overrides = {}
+
+
+def _write(primary: FakeDatabase) -> None:
+    # A PATCH that reached the primary but not yet the replica
+    primary.provider.name = "Renamed"
+    primary.version = "1:2026-01-02T00:00:00+00:00"
+
+
+def test_get_provider_is_not_304_after_a_write_the_replica_missed(databases):
+    primary, _ = databases
+    client = TestClient(app)
+    url = f"{settings.API_V1_STR}/providers/{PROVIDER_ID}"
+    etag = client.get(url).headers["ETag"]
+    _write(primary)
+
+    response = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["name"] == "Renamed"
+    assert response.headers["ETag"] != etag
+    assert client.get(url, headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_replica_reads_are_tagged_with_the_replica_version(databases):
+    primary, _ = databases
+    client = TestClient(app)
+    url = f"{settings.API_V1_STR}/providers"
+    etag = client.get(url).headers["ETag"]
+    _write(primary)
+
+    # The replica still serves the old list, which the client already holds
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
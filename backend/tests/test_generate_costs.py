@@ -0,0 +1,61 @@
+"""`generate` writes the requested amount of synthetic data, the same for the same seed,
+all of it in monthly partitions. Runs inside a transaction that is rolled back.
+"""
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.cost_partition import DEFAULT_PARTITION
+from app.models.provider import CostRecord, Provider
+from app.models.user import UserProfile
+from app.scripts.generate_costs import generate, synthetic_auth_user_id
+
+USERS = 2
+PROVIDERS = 2
+SERVICES = 3
+# Long enough to cross at least one month boundary
+DAYS = 40
+
+
+async def _amounts(db: AsyncSession) -> list:
+    rows = await db.execute(
+        select(
+            CostRecord.provider_id, CostRecord.service, CostRecord.period_start, CostRecord.amount
+        )
+        .join(Provider, Provider.id == CostRecord.provider_id)
+        .join(UserProfile, UserProfile.id == Provider.user_id)
+        .where(UserProfile.auth_user_id.in_([synthetic_auth_user_id(u) for u in range(USERS)]))
+        .order_by(CostRecord.provider_id, CostRecord.service, CostRecord.period_start)
+    )
+    return [tuple(row) for row in rows]
+
+
+async def test_generate_is_deterministic_and_fills_partitions(pg_engine):
+    async with pg_engine.connect() as conn:
+        await conn.begin()
+        db = AsyncSession(bind=conn, join_transaction_mode="create_savepoint")
+
+        written = await generate(db, USERS, PROVIDERS, SERVICES, DAYS, seed=7)
+        first = await _amounts(db)
+
+        assert written == len(first) == USERS * PROVIDERS * SERVICES * DAYS
+        in_default = await db.scalar(
+            text(
+                f"SELECT count(*) FROM {DEFAULT_PARTITION} d "
+                "JOIN providers p ON p.id = d.provider_id "
+                "JOIN user_profiles u ON u.id = p.user_id "
+                "WHERE u.auth_user_id = ANY(:auth_ids)"
+            ),
+            {"auth_ids": [synthetic_auth_user_id(u) for u in range(USERS)]},
+        )
+        assert in_default == 0
+
+        # A second run replaces the first with the same rows
+        await generate(db, USERS, PROVIDERS, SERVICES, DAYS, seed=7)
+        assert await _amounts(db) == first
+
+        await generate(db, USERS, PROVIDERS, SERVICES, DAYS, seed=8)
+        assert [row[3] for row in await _amounts(db)] != [row[3] for row in first]
+
+        await db.close()
+        await conn.rollback()
@@ -0,0 +1,69 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+from app.api.routes import metrics
+from app.core.config import settings
+from app.core.metrics import registry
+from app.main import app
+
+
+def test_requests_are_labelled_with_the_full_route_template():
+    client = TestClient(app)
+    client.get(f"{settings.API_V1_STR}/costs")
+    client.get(f"{settings.API_V1_STR}/providers/00000000-0000-0000-0000-000000000000")
+    client.get("/no-such-route")
+
+    rendered = registry.render()
+
+    assert f'route="{settings.API_V1_STR}/costs"' in rendered
+    assert f'route="{settings.API_V1_STR}/providers/{{provider_id}}"' in rendered
+    assert 'route="unmatched"' in rendered
+
+
+def test_routes_under_a_mount_include_its_prefix():
+    app_with_mount = FastAPI()
+    app_with_mount.mount("/service", app)
+
+    TestClient(app_with_mount).get(f"/service{settings.API_V1_STR}/alerts")
+
+    assert f'route="/service{settings.API_V1_STR}/alerts"' in registry.render()
+
+
+def test_metrics_are_not_served_without_a_token():
+    assert TestClient(app).get("/metrics").status_code == 404
+
+
+def test_metrics_require_the_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    metrics_app = FastAPI()
+    metrics_app.include_router(metrics.router)
+    client = TestClient(metrics_app)
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert "db_pool_connections" in response.text
+
+
+def test_pool_stats_require_the_metrics_token(monkeypatch):
+    client = TestClient(app)
+    url = f"{settings.API_V1_STR}/health/db"
+    assert client.get(url).status_code == 401
+
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert client.get(url, headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get(url, headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert "checked_out" in response.json()["pool"]
+
+
+async def test_failed_statements_leave_no_timing_behind(db):
+    with pytest.raises(DBAPIError):
+        await db.execute(text("SELECT 1 / 0"))
+
+    connection = await db.connection()
+    assert not connection.info.get("query_started")
@@ -0,0 +1,63 @@
+import socket
+
+import httpx
+import pytest
+
+from app.core.network import check_public_url, resolve_public_host
+from app.models.alert import NotificationType
+from app.schemas.alert import validate_destination
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://hooks.example.com/costs",
+        "https://localhost/hook",
+        "https://api.localhost/hook",
+        "https://127.0.0.1/hook",
+        "https://169.254.169.254/latest/meta-data",
+        "https://10.0.0.5/hook",
+        "https://192.168.1.10:8443/hook",
+        "https://100.64.0.1/hook",
+        "https://[::1]/hook",
+        "https://[fe80::1]/hook",
+        "https://[::ffff:127.0.0.1]/hook",
+        "https://0.0.0.0/hook",
+    ],
+)
+def test_local_and_private_urls_are_rejected(url):
+    with pytest.raises(ValueError):
+        check_public_url(url)
+
+
+def test_public_https_urls_pass():
+    assert check_public_url("https://hooks.example.com/costs").host == "hooks.example.com"
+    assert check_public_url("https://93.184.215.14/hook").host == "93.184.215.14"
+
+
+def _resolving_to(monkeypatch, *addresses: str) -> None:
+    async def getaddrinfo(self, host, port, **kwargs):
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port)) for address in addresses
+        ]
+
+    monkeypatch.setattr("asyncio.BaseEventLoop.getaddrinfo", getaddrinfo)
+
+
+async def test_hosts_resolving_to_any_private_address_are_rejected(monkeypatch):
+    _resolving_to(monkeypatch, "93.184.215.14", "10.1.2.3")
+    with pytest.raises(ValueError, match="private"):
+        await resolve_public_host(httpx.URL("https://rebind.example.com/hook"))
+
+
+async def test_hosts_resolving_to_public_addresses_pass(monkeypatch):
+    _resolving_to(monkeypatch, "93.184.215.14", "93.184.215.14")
+    addresses = await resolve_public_host(httpx.URL("https://hooks.example.com/hook"))
+    assert [str(address) for address in addresses] == ["93.184.215.14"]
+
+
+def test_email_destinations_must_be_addresses():
+    validate_destination(NotificationType.EMAIL, "alerts@example.com")
+    for destination in ("not-an-email", "@example.com", "a@b@example.com"):
+        with pytest.raises(ValueError, match="email address"):
+            validate_destination(NotificationType.EMAIL, destination)
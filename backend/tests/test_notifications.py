@@ -0,0 +1,279 @@
+import contextlib
+import json
+import socket
+import uuid
+from datetime import UTC, datetime
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from app.connectors.http import close_http_client, get_http_client
+from app.core.config import settings
+from app.crud import notification as notification_crud
+from app.models.alert import NotificationStatus, NotificationType
+from app.notifications import dispatcher as dispatcher_module
+from app.notifications.dispatcher import NotificationDispatcher
+from app.notifications.senders import DeliveryError, send_emails, send_webhook
+
+PAYLOAD = {
+    "alert_name": "Budget",
+    "period": "day",
+    "period_start": "2026-01-01",
+    "service": None,
+    "total": 120.0,
+    "threshold": 100.0,
+    "currency": "USD",
+}
+
+
+def _email(address: str, attempts: int = 0) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        notification_type=NotificationType.EMAIL,
+        destination=address,
+        payload=PAYLOAD,
+        attempts=attempts,
+    )
+
+
+def _webhook(url: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        notification_type=NotificationType.WEBHOOK,
+        destination=url,
+        payload=PAYLOAD,
+        attempts=0,
+    )
+
+
+def _client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def _resend(rejected: set[str], requests: list | None = None):
+    """A stand-in for Resend's batch endpoint, rejecting a batch containing any of
+    `rejected` with 422 like the real one does.
+    """
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        emails = json.loads(request.content)
+        if requests is not None:
+            requests.append([email["to"][0] for email in emails])
+        if any(email["to"][0] in rejected for email in emails):
+            return httpx.Response(422, json={"message": "Invalid `to` field"})
+        return httpx.Response(200, json={"data": [{"id": "x"} for _ in emails]})
+
+    return handler
+
+
+@pytest.fixture(autouse=True)
+def resend_settings(monkeypatch):
+    monkeypatch.setattr(settings, "RESEND_API_KEY", "re_test")
+    monkeypatch.setattr(settings, "NOTIFICATION_EMAIL_FROM", "alerts@costhook.test")
+
+
+@pytest.fixture
+def outbox(monkeypatch):
+    """Records what the dispatcher writes back to the outbox instead of a database."""
+    calls = SimpleNamespace(failed=[], sent=[])
+
+    async def fail(db, notifications, error, *, permanent=False):
+        notifications = list(notifications)
+        calls.failed.append((notifications, error, permanent))
+        return [n.id for n in notifications if permanent]
+
+    async def mark_sent(db, notification_ids):
+        calls.sent.extend(notification_ids)
+
+    monkeypatch.setattr(dispatcher_module, "AsyncSessionLocal", contextlib.nullcontext)
+    monkeypatch.setattr(dispatcher_module.notification_crud, "fail", fail)
+    monkeypatch.setattr(dispatcher_module.notification_crud, "mark_sent", mark_sent)
+    return calls
+
+
+async def test_a_rejected_email_fails_alone():
+    batch = [_email(f"user{i}@example.com") for i in range(8)]
+    bad = batch[5]
+    requests = []
+
+    failures = await send_emails(_client(_resend({bad.destination}, requests)), batch)
+
+    assert list(failures) == [bad.id]
+    assert failures[bad.id].permanent
+    # Every other email went out exactly once
+    delivered = [to for sent in requests if bad.destination not in sent for to in sent]
+    assert sorted(delivered) == sorted(n.destination for n in batch if n is not bad)
+
+
+async def test_server_errors_fail_the_whole_batch_for_retry():
+    batch = [_email(f"user{i}@example.com") for i in range(3)]
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(503)
+
+    failures = await send_emails(_client(handler), batch)
+
+    assert len(requests) == 1
+    assert set(failures) == {n.id for n in batch}
+    assert not any(error.permanent for error in failures.values())
+
+
+async def test_dispatcher_dead_letters_only_rejected_emails(outbox):
+    batch = [_email(f"user{i}@example.com") for i in range(4)]
+    dispatcher = NotificationDispatcher(client=_client(_resend({batch[1].destination})))
+
+    await dispatcher._send(batch)
+
+    [(failed, error, permanent)] = outbox.failed
+    assert failed == [batch[1]] and permanent and "422" in error
+    assert sorted(outbox.sent) == sorted(n.id for n in batch if n is not batch[1])
+
+
+async def test_missing_resend_config_is_permanent(monkeypatch):
+    monkeypatch.setattr(settings, "RESEND_API_KEY", None)
+    with pytest.raises(DeliveryError) as exc_info:
+        await send_emails(_client(_resend(set())), [_email("user@example.com")])
+    assert exc_info.value.permanent
+
+
+async def test_unexpected_errors_are_retried_with_backoff(outbox):
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise RuntimeError("boom")
+
+    batch = [_email("user@example.com", attempts=2)]
+    await NotificationDispatcher(client=_client(handler))._send(batch)
+
+    [(failed, error, permanent)] = outbox.failed
+    assert failed == batch and not permanent and "boom" in error
+    assert not outbox.sent
+
+
+class FakeSession:
+    def __init__(self):
+        self.values = []
+
+    async def execute(self, statement, values):
+        self.values.extend(values)
+
+    async def commit(self):
+        pass
+
+
+async def test_fail_backs_off_and_dead_letters_the_last_attempt(monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_RETRY_BASE_SECONDS", 30.0)
+    monkeypatch.setattr(settings, "NOTIFICATION_RETRY_MAX_SECONDS", 3600.0)
+    monkeypatch.setattr(settings, "NOTIFICATION_MAX_ATTEMPTS", 4)
+    first = _email("a@example.com", attempts=0)
+    third = _email("b@example.com", attempts=2)
+    last = _email("c@example.com", attempts=3)
+    db = FakeSession()
+    before = datetime.now(UTC)
+
+    dead = await notification_crud.fail(db, [first, third, last], "Resend returned 503")
+
+    assert dead == [last.id]
+    values = {value["id"]: value for value in db.values}
+    assert [values[n.id]["status"] for n in (first, third, last)] == [
+        NotificationStatus.PENDING,
+        NotificationStatus.PENDING,
+        NotificationStatus.DEAD,
+    ]
+    # 30s doubling per attempt, with up to half of it taken off as jitter
+    first_delay = (values[first.id]["next_attempt_at"] - before).total_seconds()
+    third_delay = (values[third.id]["next_attempt_at"] - before).total_seconds()
+    assert 15 <= first_delay <= 31 and 60 <= third_delay <= 121
+
+
+async def test_permanent_failures_are_dead_lettered_at_once():
+    notification = _email("a@example.com")
+    dead = await notification_crud.fail(FakeSession(), [notification], "400", permanent=True)
+    assert dead == [notification.id]
+
+
+def test_retry_delay_is_capped(monkeypatch):
+    monkeypatch.setattr(settings, "NOTIFICATION_RETRY_MAX_SECONDS", 3600.0)
+    assert 1800 <= notification_crud.retry_delay(30) <= 3600
+
+
+def _resolving_to(monkeypatch, *addresses: str) -> None:
+    async def getaddrinfo(self, host, port, **kwargs):
+        if not addresses:
+            raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+        return [
+            (socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port)) for address in addresses
+        ]
+
+    monkeypatch.setattr("asyncio.BaseEventLoop.getaddrinfo", getaddrinfo)
+
+
+async def test_webhooks_are_sent_to_the_checked_address(monkeypatch):
+    _resolving_to(monkeypatch, "93.184.215.14")
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(204)
+
+    notification = _webhook("https://hooks.example.com:8443/costs?team=1")
+    await send_webhook(_client(handler), notification)
+
+    [request] = requests
+    assert str(request.url) == "https://93.184.215.14:8443/costs?team=1"
+    assert request.headers["Host"] == "hooks.example.com:8443"
+    assert request.extensions["sni_hostname"] == "hooks.example.com"
+    assert request.headers["Idempotency-Key"] == str(notification.id)
+
+
+async def test_webhooks_rebound_to_private_addresses_are_not_sent(monkeypatch):
+    _resolving_to(monkeypatch, "169.254.169.254")
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        raise AssertionError("request sent to a private address")
+
+    with pytest.raises(DeliveryError) as exc_info:
+        await send_webhook(_client(handler), _webhook("https://rebind.example.com/hook"))
+    assert exc_info.value.permanent
+
+
+async def test_unresolved_webhook_hosts_are_retried(monkeypatch):
+    _resolving_to(monkeypatch)
+    with pytest.raises(DeliveryError) as exc_info:
+        client = _client(lambda request: httpx.Response(204))
+        await send_webhook(client, _webhook("https://gone.example.com/hook"))
+    assert not exc_info.value.permanent
+
+
+@pytest.mark.parametrize(
+    ("status", "permanent"), [(400, True), (404, True), (408, False), (429, False), (502, False)]
+)
+async def test_webhook_responses_are_classified(monkeypatch, status, permanent):
+    _resolving_to(monkeypatch, "93.184.215.14")
+    client = _client(lambda request: httpx.Response(status))
+    with pytest.raises(DeliveryError) as exc_info:
+        await send_webhook(client, _webhook("https://hooks.example.com/hook"))
+    assert exc_info.value.permanent is permanent
+
+
+async def test_dispatcher_retries_failed_webhooks(monkeypatch, outbox):
+    _resolving_to(monkeypatch, "93.184.215.14")
+    notification = _webhook("https://hooks.example.com/hook")
+    client = _client(lambda request: httpx.Response(503))
+
+    await NotificationDispatcher(webhook_client=client)._send([notification])
+
+    [(failed, error, permanent)] = outbox.failed
+    assert failed == [notification] and not permanent and "503" in error
+
+
+async def test_webhooks_never_share_a_connection():
+    dispatcher = NotificationDispatcher()
+    # The connector client pools connections by address, which webhooks connect to
+    assert dispatcher.webhook_client is not get_http_client()
+    pool = dispatcher.webhook_client._transport._pool
+    assert pool._max_keepalive_connections == 0
+    await dispatcher.stop()
+    assert dispatcher.webhook_client.is_closed
+    await close_http_client()
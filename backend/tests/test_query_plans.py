@@ -0,0 +1,216 @@
+"""The cost queries must plan without sequential scans or explicit sorts.
+
+Seeds synthetic users, providers and daily cost records inside a transaction, runs every
+cost query through EXPLAIN and fails when a plan sequentially scans a cost table or
+sorts cost rows for an ORDER BY. The transaction is rolled back afterwards.
+"""
+
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.crud import cost as cost_crud
+from app.crud import cost_aggregate, cost_forecast, cost_rollup
+from app.models.provider import CostRecord, Provider
+from app.schemas.cost import CostCursor, CostFilters, CostGranularity
+
+COST_TABLES = {"cost_records", "cost_rollups_daily", "cost_rollups_monthly"}
+
+# Enough rows that the planner prefers the indexes it would use in production
+USERS = 200
+PROVIDERS = 3
+DAYS = 365
+SERVICES = 4
+
+
+def _is_cost_table(name: str | None) -> bool:
+    # Plans name the partitions of cost_records, e.g. cost_records_y2026m01
+    return name is not None and (name in COST_TABLES or name.startswith("cost_records_"))
+
+
+async def _seed(db: AsyncSession) -> None:
+    await db.execute(
+        text(
+            "INSERT INTO user_profiles (id, auth_user_id, timezone) "
+            "SELECT gen_random_uuid(), gen_random_uuid(), 'UTC' FROM generate_series(1, :users)"
+        ),
+        {"users": USERS},
+    )
+    await db.execute(
+        text(
+            "INSERT INTO providers (id, user_id, type, name, credentials_encrypted, status) "
+            "SELECT gen_random_uuid(), u.id, 'SUPABASE', 'provider ' || n, '', 'CONNECTED' "
+            "FROM user_profiles u, generate_series(1, :providers) n"
+        ),
+        {"providers": PROVIDERS},
+    )
+    await db.execute(
+        text(
+            "INSERT INTO cost_records (id, provider_id, amount, service, period_start, period_end) "
+            "SELECT gen_random_uuid(), p.id, random() * 10, 'service ' || s, d, "
+            "d + interval '1 day' "
+            "FROM providers p, generate_series(1, :services) s, "
+            "generate_series(date_trunc('day', now()) - make_interval(days => :days), now(), "
+            "interval '1 day') d"
+        ),
+        {"services": SERVICES, "days": DAYS},
+    )
+    await cost_rollup.rebuild(db)
+    for table in ("user_profiles", "providers", *sorted(COST_TABLES)):
+        await db.execute(text(f"ANALYZE {table}"))
+
+
+@contextmanager
+def _capture(conn: AsyncConnection) -> Iterator[list[tuple[str, dict]]]:
+    statements: list[tuple[str, dict]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(conn.sync_connection, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(conn.sync_connection, "before_cursor_execute", before_cursor_execute)
+
+
+def _reads_cost_rows(node: dict) -> bool:
+    if node["Node Type"] == "Aggregate":
+        return False
+    if _is_cost_table(node.get("Relation Name")):
+        return True
+    return any(_reads_cost_rows(child) for child in node.get("Plans", []))
+
+
+def _violations(
+    node: dict, allow_sort: bool, empty: set[str], parent: dict | None = None
+) -> list[str]:
+    found = []
+    # Scanning an empty partition (a future month, the default one) costs nothing
+    relation = node.get("Relation Name")
+    if node["Node Type"] == "Seq Scan" and _is_cost_table(relation) and relation not in empty:
+        found.append(f"seq scan on {node['Relation Name']}")
+    # Sorting as a grouping strategy for an aggregate is the planner's call; sorting cost
+    # rows to satisfy an ORDER BY means the index order went unused
+    feeds_aggregate = parent is not None and parent["Node Type"] == "Aggregate"
+    if (
+        node["Node Type"] == "Sort"
+        and not (allow_sort or feeds_aggregate)
+        and _reads_cost_rows(node)
+    ):
+        found.append(f"sort on {', '.join(node.get('Sort Key', []))}")
+    for child in node.get("Plans", []):
+        found.extend(_violations(child, allow_sort, empty, node))
+    return found
+
+
+def test_violations_flag_seq_scans_and_order_by_sorts():
+    scan = {"Node Type": "Seq Scan", "Relation Name": "cost_records_y2026m01"}
+    sort = {"Node Type": "Sort", "Sort Key": ["period_start DESC"], "Plans": [scan]}
+    assert _violations(sort, False, set()) == [
+        "sort on period_start DESC",
+        "seq scan on cost_records_y2026m01",
+    ]
+    assert _violations(sort, True, {"cost_records_y2026m01"}) == []
+    grouped = {"Node Type": "Aggregate", "Plans": [{**sort, "Plans": []}]}
+    assert _violations(grouped, False, set()) == []
+
+
+async def test_cost_queries_use_indexes(pg_engine):
+    async with pg_engine.connect() as conn:
+        await conn.begin()
+        db = AsyncSession(bind=conn, join_transaction_mode="create_savepoint")
+        await _seed(db)
+        partitions = await db.scalars(
+            text(
+                "SELECT inhrelid::regclass::text FROM pg_inherits "
+                "WHERE inhparent = 'cost_records'::regclass"
+            )
+        )
+        filled = await db.scalars(
+            text("SELECT DISTINCT tableoid::regclass::text FROM cost_records")
+        )
+        empty = set(partitions) - set(filled)
+
+        provider = (await db.execute(select(Provider).limit(1))).scalar_one()
+        user_id, provider_id = provider.user_id, provider.id
+        now = datetime.now(UTC)
+        single = CostFilters(provider_id=provider_id)
+        recent = CostFilters(
+            provider_id=provider_id, start_date=now - timedelta(days=90), end_date=now
+        )
+        last = (
+            await db.execute(
+                select(CostRecord)
+                .where(CostRecord.provider_id == provider_id)
+                .order_by(CostRecord.period_start.desc())
+                .offset(DAYS * SERVICES // 2)
+                .limit(1)
+            )
+        ).scalar_one()
+        cursor = CostCursor(period_start=last.period_start, id=last.id)
+        month = cost_aggregate.resolve_period("UTC")
+        year = cost_aggregate.resolve_period("UTC", now - timedelta(days=365), now)
+        local = cost_aggregate.resolve_period("Europe/Berlin", now - timedelta(days=30), now)
+
+        # (name, query, allow_sort). Listing across all of a user's providers merges one
+        # index range per provider, which needs a bounded top-N sort; everything else
+        # must come straight off an index.
+        cases: list[tuple[str, Callable[[], Awaitable], bool]] = [
+            ("list all providers", lambda: cost_crud.get_page(db, user_id), True),
+            ("list one provider", lambda: cost_crud.get_page(db, user_id, single), False),
+            (
+                "list one provider after cursor",
+                lambda: cost_crud.get_page(db, user_id, single, cursor=cursor),
+                False,
+            ),
+            (
+                "list one provider in date range",
+                lambda: cost_crud.get_page(db, user_id, recent),
+                False,
+            ),
+            ("summary", lambda: cost_aggregate.get_summary(db, user_id, month), False),
+            ("summary for a year", lambda: cost_aggregate.get_summary(db, user_id, year), False),
+            ("by provider", lambda: cost_aggregate.get_by_provider(db, user_id, year), False),
+            ("by service", lambda: cost_aggregate.get_by_service(db, user_id, year), False),
+            *(
+                (
+                    f"timeline by {granularity}",
+                    lambda granularity=granularity: cost_aggregate.get_timeline(
+                        db, user_id, year, granularity=granularity
+                    ),
+                    False,
+                )
+                for granularity in CostGranularity
+            ),
+            (
+                "timeline in local time",
+                lambda: cost_aggregate.get_timeline(db, user_id, local),
+                False,
+            ),
+            ("forecast", lambda: cost_forecast.get_forecast(db, user_id), False),
+        ]
+
+        failures = []
+        for name, query, allow_sort in cases:
+            with _capture(conn) as statements:
+                await query()
+            problems = []
+            for statement, parameters in statements:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (FORMAT JSON) {statement}", parameters
+                )
+                plan = result.scalar_one()[0]["Plan"]
+                problems.extend(_violations(plan, allow_sort, empty))
+            if problems:
+                plans = []
+                for statement, parameters in statements:
+                    result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                    plans.extend(f"    {line}" for line in result.scalars())
+                failures.append(f"{name}: {'; '.join(problems)}\n" + "\n".join(plans))
+
+        await conn.rollback()
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,158 @@
+import asyncio
+import json
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import httpx
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+from fastapi import HTTPException
+
+from app.core import security
+from app.core.config import settings
+from app.core.security import JWKSManager, verify_token
+
+JWKS_URL = "https://auth.test/.well-known/jwks.json"
+KID = "key-1"
+PRIVATE_KEY = ec.generate_private_key(ec.SECP256R1())
+JWKS = {
+    "keys": [
+        {
+            **json.loads(jwt.algorithms.ECAlgorithm.to_jwk(PRIVATE_KEY.public_key())),
+            "kid": KID,
+            "alg": "ES256",
+            "use": "sig",
+        }
+    ]
+}
+
+
+def _token(kid: str = KID) -> str:
+    now = datetime.now(UTC)
+    claims = {
+        "sub": str(uuid.uuid4()),
+        "aud": "authenticated",
+        "app_metadata": {"provider": "email"},
+        "iat": now,
+        "exp": now + timedelta(hours=1),
+    }
+    return jwt.encode(claims, PRIVATE_KEY, algorithm="ES256", headers={"kid": kid})
+
+
+def _manager(
+    responses: list[httpx.Response], latency: float = 0.0
+) -> tuple[JWKSManager, list[httpx.Request]]:
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if latency:
+            await asyncio.sleep(latency)
+        return responses.pop(0) if len(responses) > 1 else responses[0]
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return JWKSManager(JWKS_URL, client=client), requests
+
+
+async def test_unknown_key_after_failed_startup_is_fetched_on_demand(monkeypatch):
+    monkeypatch.setattr(settings, "JWKS_MIN_REFRESH_SECONDS", 0.0)
+    # Slow enough for concurrent lookups to pile up on one fetch
+    manager, requests = _manager(
+        [httpx.Response(503), httpx.Response(200, json=JWKS)], latency=0.01
+    )
+    # The fetch at startup fails
+    with pytest.raises(httpx.HTTPStatusError):
+        await manager.refresh()
+
+    keys = await asyncio.gather(*(manager.get_signing_key(KID) for _ in range(5)))
+
+    assert all(key is not None and key.key_id == KID for key in keys)
+    # One failed startup fetch, then one fetch shared by all five lookups
+    assert len(requests) == 2
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(200, text="<html>maintenance</html>"),
+        httpx.Response(200, json=["not", "a", "key set"]),
+        httpx.Response(200, json={"keys": "nope"}),
+        httpx.Response(200, json={"keys": [42]}),
+        httpx.Response(200, json={"keys": []}),
+    ],
+)
+async def test_malformed_key_sets_fail_the_refresh_and_keep_the_keys(monkeypatch, response):
+    monkeypatch.setattr(settings, "JWKS_MIN_REFRESH_SECONDS", 0.0)
+    manager, _ = _manager([response])
+    manager.load(JWKS)
+
+    # Startup survives it and retries in the background
+    await manager.start()
+    try:
+        assert manager._task is not None and not manager._task.done()
+        assert (await manager.get_signing_key(KID)).key_id == KID
+        assert await manager.get_signing_key("rotated") is None
+    finally:
+        await manager.stop()
+
+
+async def test_on_demand_fetches_are_rate_limited(monkeypatch):
+    monkeypatch.setattr(settings, "JWKS_MIN_REFRESH_SECONDS", 60.0)
+    manager, requests = _manager([httpx.Response(200, json=JWKS)])
+    await manager.start()
+    try:
+        assert await manager.get_signing_key("bogus") is None
+        assert await manager.get_signing_key("bogus") is None
+    finally:
+        await manager.stop()
+
+    assert len(requests) == 1
+
+
+async def test_failed_refreshes_back_off(monkeypatch):
+    sleeps = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        await real_sleep(0)
+
+    monkeypatch.setattr(settings, "JWKS_MIN_REFRESH_SECONDS", 5.0)
+    monkeypatch.setattr(settings, "JWKS_REFRESH_SECONDS", 30.0)
+    monkeypatch.setattr("app.core.security.asyncio.sleep", sleep)
+    manager, _ = _manager([httpx.Response(500)])
+    await manager.start()
+    while len(sleeps) < 5:
+        await real_sleep(0.01)
+    await manager.stop()
+
+    assert sleeps[:5] == [5.0, 10.0, 20.0, 30.0, 30.0]
+
+
+async def test_verified_payloads_are_copies(monkeypatch):
+    manager = JWKSManager(JWKS_URL)
+    manager.load(JWKS)
+    monkeypatch.setattr(security, "jwks_manager", manager)
+    token = _token()
+
+    first = await verify_token(token)
+    first["sub"] = "someone-else"
+    first["app_metadata"]["provider"] = "github"
+    second = await verify_token(token)
+
+    assert second["sub"] != "someone-else"
+    assert second["app_metadata"] == {"provider": "email"}
+
+
+async def test_token_with_unknown_key_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "JWKS_MIN_REFRESH_SECONDS", 60.0)
+    manager, _ = _manager([httpx.Response(200, json=JWKS)])
+    await manager.start()
+    monkeypatch.setattr(security, "jwks_manager", manager)
+    try:
+        with pytest.raises(HTTPException) as exc_info:
+            await verify_token(_token(kid="rotated-away"))
+    finally:
+        await manager.stop()
+    assert exc_info.value.status_code == 401
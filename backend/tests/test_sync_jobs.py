@@ -0,0 +1,53 @@
+import uuid
+from datetime import UTC, datetime, timedelta
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import sync_job as sync_job_crud
+from app.models.sync import SyncJob, SyncJobStatus
+
+
+async def test_jobs_nobody_touches_are_failed(pg_engine):
+    async with pg_engine.connect() as conn:
+        await conn.begin()
+        db = AsyncSession(
+            bind=conn, join_transaction_mode="create_savepoint", expire_on_commit=False
+        )
+        user_id, orphaned_provider, live_provider = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        await db.execute(
+            text(
+                "INSERT INTO user_profiles (id, auth_user_id, timezone) "
+                "VALUES (:id, gen_random_uuid(), 'UTC')"
+            ),
+            {"id": user_id},
+        )
+        for provider_id in (orphaned_provider, live_provider):
+            await db.execute(
+                text(
+                    "INSERT INTO providers (id, user_id, type, name, credentials_encrypted, "
+                    "status) VALUES (:id, :user_id, 'OPENAI', 'OpenAI', '', 'CONNECTED')"
+                ),
+                {"id": provider_id, "user_id": user_id},
+            )
+        # Both jobs were last touched by a process that has since crashed
+        crashed_at = datetime.now(UTC) - timedelta(hours=1)
+        orphaned = SyncJob(provider_id=orphaned_provider, updated_at=crashed_at)
+        live = SyncJob(
+            provider_id=live_provider, status=SyncJobStatus.RUNNING, updated_at=crashed_at
+        )
+        db.add_all([orphaned, live])
+        await db.commit()
+
+        # A live process still holds one of them
+        await sync_job_crud.touch(db, [live.id])
+        assert await sync_job_crud.fail_orphaned(db) == 1
+
+        await db.refresh(orphaned)
+        await db.refresh(live)
+        assert orphaned.status == SyncJobStatus.FAILED
+        assert live.status == SyncJobStatus.RUNNING
+        # The provider whose job was orphaned takes new requests again
+        job, created = await sync_job_crud.get_or_create_active(db, orphaned_provider)
+        assert created
+        await conn.rollback()
@@ -0,0 +1,167 @@
+import uuid
+from datetime import UTC, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select, text
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.models.provider import CostRecord, Provider, ProviderStatus, ProviderSyncState
+from app.schemas.cost import CostRecordCreate, CostUpsertResult
+from app.sync import runner
+from app.sync.runner import sync_range
+
+NOW = datetime(2026, 3, 10, 15, 42, 7, tzinfo=UTC)
+
+
+def test_first_sync_starts_at_midnight_utc():
+    start, end = sync_range(None, NOW)
+    assert start == datetime(2026, 3, 10, tzinfo=UTC) - timedelta(days=settings.SYNC_HISTORY_DAYS)
+    assert end == NOW
+
+
+def test_incremental_sync_start_is_floored_to_the_utc_day():
+    # Synced through a point that falls on the previous UTC day in UTC+2
+    synced_through = datetime(2026, 3, 9, 1, 30, tzinfo=timezone(timedelta(hours=2)))
+    state = ProviderSyncState(synced_through=synced_through)
+    start, _ = sync_range(state, NOW)
+    overlap = timedelta(days=settings.SYNC_OVERLAP_DAYS)
+    assert start == datetime(2026, 3, 8, tzinfo=UTC) - overlap
+    assert start.tzinfo == UTC
+
+
+def test_repeated_syncs_agree_on_the_start():
+    state = ProviderSyncState(synced_through=NOW)
+    assert sync_range(state, NOW)[0] == sync_range(state, NOW + timedelta(hours=3))[0]
+
+
+class FakeConnector:
+    """Three daily records, then whatever `after` does."""
+
+    after = None
+
+    def __init__(self, provider_id, credentials, *, cursor=None, etag=None):
+        self.provider_id = provider_id
+        self.cursor = cursor
+        self.etag = "etag-2"
+
+    async def records(self, start, end):
+        for day in range(3):
+            period_start = start + timedelta(days=day)
+            yield CostRecordCreate(
+                provider_id=self.provider_id,
+                amount=Decimal(day + 1),
+                service="gpt",
+                period_start=period_start,
+                period_end=period_start + timedelta(days=1),
+            )
+        if self.after:
+            await self.after()
+
+
+@pytest.fixture
+async def provider_id(pg_engine, monkeypatch):
+    """A provider committed for real, since a sync commits batch by batch."""
+    monkeypatch.setattr(runner, "get_connector_class", lambda _: FakeConnector)
+    monkeypatch.setattr(runner, "get_provider_credentials", lambda *_: {})
+    monkeypatch.setattr(settings, "COST_INGEST_BATCH_SIZE", 2)
+    monkeypatch.setattr(FakeConnector, "after", None)
+    user_id, provider_id = uuid.uuid4(), uuid.uuid4()
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            text(
+                "INSERT INTO user_profiles (id, auth_user_id, timezone) "
+                "VALUES (:id, gen_random_uuid(), 'UTC')"
+            ),
+            {"id": user_id},
+        )
+        await db.execute(
+            text(
+                "INSERT INTO providers (id, user_id, type, name, credentials_encrypted, "
+                "status) VALUES (:id, :user_id, 'OPENAI', 'OpenAI', '', 'CONNECTED')"
+            ),
+            {"id": provider_id, "user_id": user_id},
+        )
+        await db.commit()
+    yield provider_id
+    async with AsyncSessionLocal() as db:
+        await db.execute(text("DELETE FROM user_profiles WHERE id = :id"), {"id": user_id})
+        await db.commit()
+
+
+async def _load(provider_id):
+    async with AsyncSessionLocal() as db:
+        provider = await db.get(Provider, provider_id)
+        state = await db.get(ProviderSyncState, provider_id)
+        count = await db.scalar(select(func.count()).where(CostRecord.provider_id == provider_id))
+        return provider, state, count
+
+
+async def test_a_leased_provider_is_skipped_until_the_lease_expires(provider_id):
+    async with AsyncSessionLocal() as db:
+        assert await runner._acquire(db, provider_id, uuid.uuid4())
+    assert await runner.sync_provider(provider_id) is None
+
+    # The other worker died; its lease runs out
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            text(
+                "UPDATE provider_sync_states SET leased_until = now() - interval '1 second' "
+                "WHERE provider_id = :id"
+            ),
+            {"id": provider_id},
+        )
+        await db.commit()
+    result = await runner.sync_provider(provider_id)
+
+    assert result.inserted == 3
+    provider, state, count = await _load(provider_id)
+    assert count == 3
+    assert provider.status == ProviderStatus.CONNECTED
+    assert state.synced_through == provider.last_sync_at
+    assert state.etag == "etag-2"
+    assert state.lease_owner is None and state.leased_until is None
+
+
+async def test_a_failed_sync_keeps_its_batches_but_not_its_progress(provider_id):
+    async def fail():
+        provider, _, _ = await _load(provider_id)
+        # Visible to everyone while the sync runs
+        assert provider.status == ProviderStatus.SYNCING
+        raise RuntimeError("upstream down")
+
+    FakeConnector.after = staticmethod(fail)
+    progress = CostUpsertResult()
+    with pytest.raises(RuntimeError):
+        await runner.sync_provider(provider_id, progress=progress)
+
+    provider, state, count = await _load(provider_id)
+    # The first batch was committed; the failure came while the second was read
+    assert count == progress.inserted == 2
+    assert provider.status == ProviderStatus.ERROR
+    assert provider.last_error == "upstream down"
+    assert state.synced_through is None and state.etag is None
+    assert state.lease_owner is None
+
+
+async def test_a_sync_that_lost_its_lease_stops_writing(provider_id):
+    async def take_over():
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                text(
+                    "UPDATE provider_sync_states SET lease_owner = :owner WHERE provider_id = :id"
+                ),
+                {"owner": uuid.uuid4(), "id": provider_id},
+            )
+            await db.commit()
+
+    FakeConnector.after = staticmethod(take_over)
+    with pytest.raises(runner.LeaseLostError):
+        await runner.sync_provider(provider_id)
+
+    provider, state, count = await _load(provider_id)
+    assert count == 2
+    # Status and lease belong to whoever took over
+    assert provider.status == ProviderStatus.SYNCING
+    assert state.lease_owner is not None and state.synced_through is None
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+import uuid
+from datetime import UTC, datetime
+
+from app.core.config import settings
+from app.sync import scheduler as scheduler_module
+from app.sync.scheduler import SyncScheduler
+
+
+async def test_schedule_returns_while_enqueues_wait(monkeypatch):
+    providers = [(uuid.uuid4(), "ciphertext") for _ in range(5)]
+    decrypt_threads = []
+
+    async def get_due_providers(now: datetime) -> list[tuple[uuid.UUID, str]]:
+        return providers
+
+    def decrypt_many(due: list) -> dict:
+        decrypt_threads.append(threading.current_thread())
+        return {}
+
+    monkeypatch.setattr(scheduler_module, "get_due_providers", get_due_providers)
+    monkeypatch.setattr(scheduler_module, "decrypt_many", decrypt_many)
+    monkeypatch.setattr(settings, "SYNC_JITTER_SECONDS", 0)
+    # No workers are started, so the queue fills after one provider
+    scheduler = SyncScheduler(workers=1)
+
+    await asyncio.wait_for(scheduler._schedule(datetime.now(UTC)), timeout=1)
+    await asyncio.sleep(0.01)
+
+    assert decrypt_threads and decrypt_threads[0] is not threading.main_thread()
+    assert scheduler._queue.qsize() == 1
+    assert len(scheduler._delayed) == 4
+    assert scheduler._pending == {provider_id for provider_id, _ in providers}
+
+    # Providers already pending are not scheduled twice
+    await scheduler._schedule(datetime.now(UTC))
+    assert len(scheduler._delayed) == 4
+
+    await scheduler.stop()
+    assert not scheduler._delayed
+    assert scheduler._pending == {scheduler._queue.get_nowait()[0]}
@@ -70,9 +70,11 @@ export const api = {
       searchParams.set("provider_type", params.provider_type);
     if (params?.start_date) searchParams.set("start_date", params.start_date);
     if (params?.end_date) searchParams.set("end_date", params.end_date);
+    if (params?.limit) searchParams.set("limit", String(params.limit));
     const query = searchParams.toString();
     return request<CostRecord[]>(`/costs${query ? `?${query}` : ""}`);
   },
+  getCostSummary: () => request<CostSummary>("/costs/summary"),
 };
 
 // Types
@@ -127,10 +129,11 @@ export interface CostRecord {
   id: string;
   provider_id: string;
   amount: number;
+  currency: string;
   service: string;
   period_start: string;
   period_end: string;
-  metadata_json: string | null;
+  metadata_json: Record<string, unknown> | null;
   created_at: string;
 }
 
@@ -139,4 +142,21 @@ export interface CostFilters {
   provider_type?: ProviderType;
   start_date?: string;
   end_date?: string;
+  limit?: number;
+}
+
+export interface CostPeriod {
+  start: string;
+  end: string;
+  previous_start: string;
+  timezone: string;
+}
+
+export interface CostSummary {
+  total: number;
+  previous_total: number;
+  change: number;
+  change_percent: number | null;
+  period: CostPeriod;
+  record_count: number;
 }
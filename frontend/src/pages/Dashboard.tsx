@@ -1,10 +1,11 @@
 import { useState, useEffect } from "react";
 import { Link } from "react-router-dom";
-import { api, Provider, CostRecord } from "../lib/api";
+import { api, Provider, CostRecord, CostSummary } from "../lib/api";
 
 export default function Dashboard() {
   const [providers, setProviders] = useState<Provider[]>([]);
   const [costs, setCosts] = useState<CostRecord[]>([]);
+  const [summary, setSummary] = useState<CostSummary | null>(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
@@ -13,12 +14,14 @@ export default function Dashboard() {
 
   const loadData = async () => {
     try {
-      const [providersData, costsData] = await Promise.all([
+      const [providersData, costsData, summaryData] = await Promise.all([
         api.listProviders(),
-        api.listCosts(),
+        api.listCosts({ limit: 10 }),
+        api.getCostSummary(),
       ]);
       setProviders(providersData);
       setCosts(costsData);
+      setSummary(summaryData);
     } catch (err) {
       console.error("Failed to load dashboard data:", err);
     } finally {
@@ -26,7 +29,7 @@ export default function Dashboard() {
     }
   };
 
-  const totalCost = costs.reduce((sum, cost) => sum + cost.amount, 0);
+  const totalCost = summary?.total ?? 0;
 
   if (loading) {
     return <div className="page-container">Loading...</div>;
@@ -38,7 +41,7 @@ export default function Dashboard() {
 
       <div className="dashboard-grid">
         <div className="card stat-card">
-          <h3>Total Spend</h3>
+          <h3>Spend This Month</h3>
           <p className="stat-value">${totalCost.toFixed(2)}</p>
         </div>
 
@@ -49,7 +52,7 @@ export default function Dashboard() {
 
         <div className="card stat-card">
           <h3>Cost Records</h3>
-          <p className="stat-value">{costs.length}</p>
+          <p className="stat-value">{summary?.record_count ?? 0}</p>
         </div>
       </div>
 
@@ -76,7 +79,7 @@ export default function Dashboard() {
                 </tr>
               </thead>
               <tbody>
-                {costs.slice(0, 10).map((cost) => (
+                {costs.map((cost) => (
                   <tr key={cost.id}>
                     <td>{cost.service}</td>
                     <td>${cost.amount.toFixed(2)}</td>